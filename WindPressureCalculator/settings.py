@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    'core',
     'calculator',
     
     'home',
@@ -49,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,7 +67,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -72,6 +74,14 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept for the life of the process (and
+            # reset by the autoreloader when a template changes under DEBUG)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -82,12 +92,37 @@ WSGI_APPLICATION = 'WindPressureCalculator.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default, for development and the test suite. Production sets
+# DATABASE_ENGINE=postgresql and the other DATABASE_* variables; connections
+# are then kept open across requests and health-checked before reuse.
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite3')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'windpressure'),
+            'USER': os.environ.get('DATABASE_USER', 'windpressure'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', 'localhost'),
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            # Behind PgBouncer in transaction pooling mode a cursor cannot
+            # outlive its transaction, so the chunked CSV exports
+            # (core.exports) must not use server-side cursors
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DATABASE_POOLER') == 'pgbouncer',
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Seconds a writer waits for the write lock before "database is locked"
+            'OPTIONS': {'timeout': 20},
+        }
     }
-}
 
 
 # Password validation
@@ -129,7 +164,59 @@ STATICFILES_DIRS = [
     BASE_DIR / "calculator/static",
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Content-hashed static files with .gz/.br variants, built by manage.py build_assets (core.assets)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.assets.CompressedManifestStaticFilesStorage'},
+}
+
+# Serve STATIC_ROOT from Django with far-future caching when no front-end server does (core.assets.serve)
+SERVE_STATIC = True
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Background PDF exports (core.reports): number of rendering processes
+REPORT_WORKERS = 2
+# Seconds before a job that is still pending or running counts as failed
+REPORT_JOB_TIMEOUT = 600
+# Seconds a finished job is kept after it finishes
+REPORT_JOB_MAX_AGE = 24 * 60 * 60
+
+# Import WeasyPrint and latex2mathml at startup rather than on first export (core.export_backends)
+EXPORT_BACKENDS_PRELOAD = False
+
+# Content-addressed cache of rendered reports (core.report_cache)
+REPORT_CACHE_DIR = BASE_DIR / 'report_cache'
+REPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Convert every app's step formulas to MathML on the first conversion (core.mathml)
+MATHML_WARM_UP = True
+
+# Render formulas and step values as MathML on the server instead of with MathJax (core.templatetags.mathml)
+SERVER_MATHML = True
+
+# Compile every template into the cached loader at startup (core.template_cache)
+TEMPLATE_WARM_UP = True
+
+# Queue calculation records and bulk-insert them in the background (core.writebehind)
+WRITE_BEHIND = False
+WRITE_BEHIND_BATCH_SIZE = 200
+WRITE_BEHIND_INTERVAL = 0.5
+WRITE_BEHIND_MAX_PENDING = 10000
+
+# Largest batch accepted by the JSON calculator endpoints (core.api)
+API_MAX_CASES = 10000
+
+# Per-step timings in a Server-Timing header and core.timing.metrics() (core.timing)
+PIPELINE_TIMING = False
+
+# Static explanation fragments of the results pages kept per process (core.templatetags.fragments)
+FRAGMENT_CACHE_SIZE = 2048
+
+# Take q_p from the interpolated exposure profiles of core.profiles instead of
+# the exact formula, within profiles.error_bound() (core.engine)
+EXPOSURE_TABLES = False
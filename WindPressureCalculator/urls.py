@@ -1,5 +1,8 @@
+import re
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from core import assets
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,4 +13,10 @@ urlpatterns = [
     path('flatroof/', include('flatroof.urls')),
     path('duopitch/', include('duopitch.urls')),
     path('hipped_roof/', include('Wind_load_analysis_on_hipped_roof.urls')),
+    path('reports/', include('core.urls')),
 ]
+
+if settings.SERVE_STATIC:
+    urlpatterns.append(
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), assets.serve)
+    )
@@ -0,0 +1,14 @@
+from core.api import batch_view
+from core.records import tabulate
+from .calculations import NetPressure, RoofZone, calculate_wind_loads
+from .forms import WindLoadInputForm
+from .models import WindLoadCalculation
+
+def calculate_cases(cases):
+    """Results per case, with the zone and net pressure rows of all cases kept in two tables."""
+    results = [calculate_wind_loads(case) for case in cases]
+    tabulate(results, 'zones', RoofZone)
+    tabulate(results, 'W_net_results', NetPressure)
+    return results
+
+calculate = batch_view(WindLoadInputForm, calculate_cases, WindLoadCalculation)
@@ -0,0 +1,112 @@
+"""
+Numeric wind load calculations for hipped roofs.
+
+These are shared by the HTML/PDF/CSV view and the JSON API, so neither has to
+render templates to get at the numbers.
+"""
+from typing import Optional
+from core.engine import TERRAIN_CATEGORIES
+from core.records import Record, record
+from core.timing import timed
+
+# Turbulence intensity per terrain category for the simplified hipped roof profile
+TURBULENCE_INTENSITY = {
+    '0': 0.17,
+    'I': 0.19,
+    'II': 0.21,
+    'III': 0.23,
+    'IV': 0.26
+}
+
+@record
+class RoofZone(Record):
+    name: str
+    width: float
+    height: float
+    area: float
+    c_pe_suction: float
+    c_pe_pressure: Optional[float]
+
+@record
+class NetPressure(Record):
+    zone: str
+    type: str
+    c_pe: float
+    c_pi: float
+    w_net: float
+
+@timed('math')
+def calculate_wind_loads(data):
+    """Velocities, pressures, zones and net pressures for cleaned hipped roof inputs."""
+    vb0 = data['vb0']
+    c_direction = data['c_direction']
+    c_season = data['c_season']
+    rho = data['rho']
+    terrain_category = data['terrain_category']
+    h_e = data['h_e']
+    h_r = data['h_r']
+
+    # Calculate basic wind velocity
+    vb = vb0 * c_direction * c_season
+
+    # Calculate basic velocity pressure
+    qb = 0.5 * rho * vb0**2
+
+    # Calculate reference height
+    h = h_e + h_r
+
+    # Roughness length and terrain factor come from the shared engine;
+    # this simplified profile keeps its own turbulence intensities
+    z0, _, kr = TERRAIN_CATEGORIES[terrain_category]
+    turbulence_intensity = TURBULENCE_INTENSITY[terrain_category]
+
+    # Calculate mean wind velocity
+    vm = vb * kr * (h/10)**0.07
+
+    # Calculate peak velocity pressure
+    qp = 0.5 * rho * vm**2 * (1 + 7 * turbulence_intensity)
+
+    # Calculate external pressure coefficients for different zones
+    zones = []
+
+    # Zone A (windward)
+    zones.append(RoofZone('A', 2 * h, h, 2 * h * h, 0.8, 0.8))
+
+    # Zone B (leeward)
+    zones.append(RoofZone('B', 2 * h, h, 2 * h * h, -0.5, None))
+
+    # Zone C (side)
+    zones.append(RoofZone('C', h, h, h * h, -0.7, None))
+
+    # Calculate net wind pressures
+    W_net_results = []
+    c_pi = 0.2  # Internal pressure coefficient
+
+    for zone in zones:
+        # Suction case
+        W_net_suction = qp * (zone.c_pe_suction - c_pi)
+        W_net_results.append(NetPressure(zone.name, 'Suction', zone.c_pe_suction, c_pi, W_net_suction))
+
+        # Pressure case (if applicable)
+        if zone.c_pe_pressure is not None:
+            W_net_pressure = qp * (zone.c_pe_pressure - c_pi)
+            W_net_results.append(NetPressure(zone.name, 'Pressure', zone.c_pe_pressure, c_pi, W_net_pressure))
+
+    # Find maximum positive and negative pressures
+    max_positive_W_net = max(result.w_net for result in W_net_results)
+    min_negative_W_net = min(result.w_net for result in W_net_results)
+
+    return {
+        'vb': vb,
+        'qb': qb,
+        'h': h,
+        'z0': z0,
+        'kr': kr,
+        'turbulence_intensity': turbulence_intensity,
+        'vm': vm,
+        'qp': qp,
+        'zones': zones,
+        'W_net_results': W_net_results,
+        'max_positive_W_net': max_positive_W_net,
+        'min_negative_W_net': min_negative_W_net,
+    }
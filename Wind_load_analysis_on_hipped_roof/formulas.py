@@ -0,0 +1,15 @@
+"""LaTeX formula templates shown in the hipped roof calculation steps."""
+
+BASIC_WIND_VELOCITY = 'V_b = V_{b0} \\cdot C_{direction} \\cdot C_{season}'
+BASIC_VELOCITY_PRESSURE = 'q_b = \\frac{1}{2} \\cdot \\rho \\cdot V_{b0}^2'
+ROUGHNESS_FACTOR = 'k_r = 0.19 \\cdot (\\frac{z_0}{0.05})^{0.07}'
+MEAN_WIND_VELOCITY = 'V_m = V_b \\cdot k_r \\cdot (\\frac{h}{10})^{0.07}'
+PEAK_VELOCITY_PRESSURE = 'q_p = \\frac{1}{2} \\cdot \\rho \\cdot V_m^2 \\cdot (1 + 7 \\cdot I_v)'
+
+FORMULAS = (
+    BASIC_WIND_VELOCITY,
+    BASIC_VELOCITY_PRESSURE,
+    ROUGHNESS_FACTOR,
+    MEAN_WIND_VELOCITY,
+    PEAK_VELOCITY_PRESSURE,
+)
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Wind_load_analysis_on_hipped_roof', '0004_remove_windloadcalculation_cr_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='windloadcalculation',
+            index=models.Index(fields=['-created_at', '-id'], name='hipped_created_id_idx'),
+        ),
+    ]
@@ -101,6 +101,10 @@ class WindLoadCalculation(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the history pages (core.pagination)
+            models.Index(fields=['-created_at', '-id'], name='hipped_created_id_idx'),
+        ]
         verbose_name = "Wind Load Calculation"
         verbose_name_plural = "Wind Load Calculations"
 
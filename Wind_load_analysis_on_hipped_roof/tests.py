@@ -1,3 +1,24 @@
+import csv
+from unittest import mock
 from django.test import TestCase
+from django.urls import reverse
+from .calculations import calculate_wind_loads
+from .models import WindLoadCalculation
+from .views import INPUT_FIELDS
 
-# Create your tests here.
+
+class HistoryExportTests(TestCase):
+    def test_export_recomputes_from_the_input_fields(self):
+        calculation = WindLoadCalculation.objects.create(
+            calculation_name='Hip', vb0=27.0, c_direction=1.0, c_season=1.0, rho=1.25,
+            terrain_category='III', h_e=4.0, h_r=2.5
+        )
+        with mock.patch(
+            'Wind_load_analysis_on_hipped_roof.views.calculate_wind_loads', wraps=calculate_wind_loads
+        ) as calculate:
+            response = self.client.get(reverse('wind_load_export'))
+            rows = list(csv.reader(line.decode() for line in response.streaming_content))
+        self.assertEqual(set(calculate.call_args.args[0]), set(INPUT_FIELDS))
+        expected = calculate_wind_loads({name: getattr(calculation, name) for name in INPUT_FIELDS})
+        self.assertEqual(len(rows) - 1, len(expected['W_net_results']))
+        self.assertEqual(rows[1][-1], f"{expected['W_net_results'][0].w_net:.3f}")
@@ -5,9 +5,11 @@
 #     path('', views.wind_load_analysis_on_hipped_roof, name='wind_load_analysis_on_hipped_roof'),
 # ]
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.wind_load_analysis_on_hipped_roof, name='wind_load_analysis_on_hipped_roof'),
     path('history/', views.wind_load_history, name='wind_load_history'),
+    path('history/export.csv', views.wind_load_export, name='wind_load_export'),
+    path('api/calculate/', api.calculate, name='hipped_roof_api_calculate'),
 ]
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""
+Performance benchmarks for the calculators.
+
+Every calculator is measured on a fixed input corpus (benchmarks.corpora)
+along its hot paths: the pure calculation, the full form view, the
+per-calculation CSV and PDF exports, the history list and the streaming
+history export. Each benchmark reports ops/sec, p50/p99 latency and the
+peak Python heap of one operation, and a run can be saved as a baseline
+and later compared against it:
+
+    python manage.py benchmark --save benchmarks/baseline.json
+    python manage.py benchmark --compare benchmarks/baseline.json
+    python manage.py benchmark 'monopitch.*' --iterations 500
+
+Runs use a throwaway test database and report cache directory, never the
+project's own.
+"""
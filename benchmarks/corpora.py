@@ -0,0 +1,83 @@
+"""
+Fixed input corpora, one per calculator.
+
+Each corpus is a base case with a handful of inputs varied by a random
+generator seeded from the calculator's name, so every run (and every
+machine) measures exactly the same cases. Values are raw form data, as a
+browser or the JSON API would send them.
+"""
+import random
+
+CORPUS_SIZE = 200
+
+BASE_CASES = {
+    'wall': {
+        'height': 19.871, 'in_wind_depth': 30.6, 'width': 19.26, 'site_altitude': 0,
+        'terrain_category': 3, 'upwind_slope': 0, 'orographic_factor': 0, 'structural_factor': 1,
+        'windward_openings': 24, 'leeward_openings': 1, 'parallel_openings': 5,
+        'windward_area': 1.7514, 'leeward_area': 37.43, 'parallel_area': 1.7514,
+        'internal_pressure_coeff': 0.35, 'basic_wind_velocity': 22,
+    },
+    'flatroof': {
+        'terrain_category': 'II', 'basic_wind_velocity': 27.0, 'wind_direction_dimension': 10.0,
+        'crosswind_dimension': 20.0, 'building_height': 5.0, 'parapet_height': 0.0,
+        'loaded_area': '10', 'orography_factor': 1.0, 'dominant_face': False,
+        'c_pi_min': -0.3, 'c_pi_max': 0.2, 'air_density': 1.25,
+    },
+    'monopitch': {
+        'vb0': 21.0, 'c_direction': 1.0, 'c_season': 1.0, 'rho': 1.25, 'terrain_category': 'II',
+        'h_e': 3.0, 'h_r': 3.0, 'building_length': 30.0, 'building_width': 12.0, 'pitch_angle': 15.0,
+        'site_altitude': 0.0, 'upwind_slope': 0.0, 'horizontal_distance': 0.0, 'effective_height': 0.0,
+        'upwind_slope_length': 0.0, 'windward_openings_area': 0.0, 'leeward_openings_area': 0.0,
+        'parallel_openings_area': 0.0, 'structural_factor': 1.0, 'purlin_spacing': 1.2, 'truss_spacing': 6.0,
+    },
+    'duopitch': {
+        'vb0': 22.0, 'c_direction': 1.0, 'c_season': 1.0, 'rho': 1.25, 'terrain_category': 'II',
+        'ridge_height': 6.1, 'building_length': 30.0, 'building_width': 12.0, 'pitch_angle': 15.0,
+        'site_altitude': 1650.0, 'upwind_slope': 0.06, 'horizontal_distance': -200.0,
+        'effective_height': 30.0, 'upwind_slope_length': 500.0, 'windward_openings_area': 41.25,
+        'leeward_openings_area': 41.25, 'parallel_openings_area': 37.0, 'structural_factor': 1.0,
+        'purlin_spacing': 1.5525, 'truss_spacing': 3.0,
+    },
+    'hipped': {
+        'vb0': 22.0, 'c_direction': 1.0, 'c_season': 1.0, 'rho': 1.25, 'terrain_category': 'II',
+        'h_e': 4.0, 'h_r': 2.5,
+    },
+}
+
+ROUGHNESS = ['0', 'I', 'II', 'III', 'IV']
+
+# Inputs varied per calculator: a (low, high) range or a list of choices
+VARIED = {
+    'wall': {
+        'height': (3.0, 60.0), 'width': (6.0, 60.0), 'in_wind_depth': (6.0, 60.0),
+        'basic_wind_velocity': (18.0, 35.0), 'terrain_category': [1, 2, 3, 4],
+    },
+    'flatroof': {
+        'building_height': (3.0, 40.0), 'crosswind_dimension': (8.0, 60.0),
+        'wind_direction_dimension': (8.0, 60.0), 'parapet_height': (0.0, 1.5),
+        'basic_wind_velocity': (18.0, 35.0), 'terrain_category': ROUGHNESS,
+    },
+    'monopitch': {
+        'vb0': (18.0, 35.0), 'h_e': (2.5, 12.0), 'h_r': (1.0, 6.0),
+        'pitch_angle': (5.0, 30.0), 'terrain_category': ROUGHNESS,
+    },
+    'duopitch': {
+        'vb0': (18.0, 35.0), 'ridge_height': (4.0, 11.0), 'building_width': (12.0, 30.0),
+        'pitch_angle': (5.0, 45.0), 'terrain_category': ROUGHNESS,
+    },
+    'hipped': {
+        'vb0': (18.0, 35.0), 'h_e': (2.5, 12.0), 'h_r': (1.0, 6.0), 'terrain_category': ROUGHNESS,
+    },
+}
+
+def corpus(calculator, size=CORPUS_SIZE):
+    """``size`` cases for a calculator, identical on every call."""
+    rng = random.Random(f'benchmarks-{calculator}')
+    cases = []
+    for _ in range(size):
+        case = dict(BASE_CASES[calculator])
+        for name, spec in VARIED[calculator].items():
+            case[name] = rng.choice(spec) if isinstance(spec, list) else round(rng.uniform(*spec), 2)
+        cases.append(case)
+    return cases
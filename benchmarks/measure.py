@@ -0,0 +1,66 @@
+"""
+Timing and memory measurement of a single benchmark.
+"""
+import gc
+import math
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+# Operations traced for peak memory; tracing is slow, so it is kept out of the timed loop
+MEMORY_SAMPLES = 5
+
+@dataclass
+class Measurement:
+    name: str
+    iterations: int
+    ops_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    peak_kib: float
+
+    def as_dict(self):
+        return asdict(self)
+
+def percentile(samples, q):
+    """The q-th percentile (0-100) of sorted samples, by nearest rank."""
+    rank = max(0, math.ceil(q / 100 * len(samples)) - 1)
+    return samples[rank]
+
+def measure(name, operation, iterations, warmup=10):
+    """
+    Time ``operation(i)`` for i in range(iterations) after ``warmup`` untimed
+    calls, then trace the peak heap of a few more calls.
+    """
+    for i in range(warmup):
+        operation(i)
+
+    samples = []
+    gc.collect()
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter_ns()
+        operation(i)
+        samples.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    samples.sort()
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(min(iterations, MEMORY_SAMPLES)):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            operation(i)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(
+        name=name,
+        iterations=iterations,
+        ops_per_sec=iterations / elapsed if elapsed else float('inf'),
+        p50_ms=percentile(samples, 50) / 1e6,
+        p99_ms=percentile(samples, 99) / 1e6,
+        peak_kib=peak / 1024,
+    )
@@ -0,0 +1,96 @@
+"""
+Running a selection of benchmarks and comparing them with a saved baseline.
+"""
+import json
+import platform
+import tempfile
+from contextlib import contextmanager
+from fnmatch import fnmatch
+import django
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from .measure import Measurement, measure
+from .suites import BENCHMARKS, Skip, seed_history
+# Registers the worker startup benchmarks
+from . import startup
+
+def select(patterns):
+    """Benchmarks whose name matches any of the glob patterns (all of them if none)."""
+    return [b for b in BENCHMARKS if not patterns or any(fnmatch(b.name, pattern) for pattern in patterns)]
+
+@contextmanager
+def benchmark_environment():
+    """A throwaway test database, seeded with history, and a report cache that never hits."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                override_settings(REPORT_CACHE_DIR=cache_dir, REPORT_CACHE_MAX_BYTES=0):
+            seed_history()
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+def run(benchmarks, iterations, warmup, progress=None):
+    """
+    Measure each benchmark. Returns the measurements and {name: reason} for
+    the benchmarks that were skipped or failed; one failing path does not
+    stop the others from being measured.
+    """
+    measurements = []
+    skipped = {}
+    with benchmark_environment():
+        for b in benchmarks:
+            count = max(iterations // 10, 5) if b.heavy else iterations
+            try:
+                if b.measure is not None:
+                    measurement = b.measure(b.name, count)
+                else:
+                    measurement = measure(b.name, b.setup(), count, warmup=min(warmup, count))
+            except Skip as e:
+                skipped[b.name] = f'skipped: {e}'
+                continue
+            except Exception as e:
+                skipped[b.name] = f'failed: {type(e).__name__}: {e}'
+                continue
+            measurements.append(measurement)
+            if progress is not None:
+                progress(measurement)
+    return measurements, skipped
+
+def save_baseline(path, measurements):
+    payload = {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'machine': platform.machine(),
+        'benchmarks': {m.name: m.as_dict() for m in measurements},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    return {name: Measurement(**data) for name, data in payload['benchmarks'].items()}
+
+def regressions(measurements, baseline, tolerance):
+    """
+    (name, metric, baseline value, current value) for every benchmark whose
+    throughput fell, or whose peak memory grew, by more than ``tolerance``,
+    and for baseline benchmarks that did not run.
+    Latency percentiles are reported but too noisy to gate on.
+    """
+    found = []
+    current = {m.name for m in measurements}
+    for name in baseline.keys() - current:
+        found.append((name, 'did not run', baseline[name].ops_per_sec, 0.0))
+    for m in measurements:
+        base = baseline.get(m.name)
+        if base is None:
+            continue
+        if m.ops_per_sec < base.ops_per_sec * (1 - tolerance):
+            found.append((m.name, 'ops/sec', base.ops_per_sec, m.ops_per_sec))
+        if m.peak_kib > base.peak_kib * (1 + tolerance):
+            found.append((m.name, 'peak KiB', base.peak_kib, m.peak_kib))
+    return found
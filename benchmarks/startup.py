@@ -0,0 +1,87 @@
+"""
+Worker startup benchmarks.
+
+Each run starts a fresh interpreter that does what a WSGI worker does
+before its first request (set up Django, build the WSGI application, load
+the URLconf) and reports the wall time and resident memory that took.
+'startup.worker' measures the configured startup, where the export
+libraries load on first use; 'startup.preloaded' also imports them, as
+every worker did when they were imported at module level, so the two
+rows give the before and after of core.export_backends.
+
+'startup.mathml_warm_up' converts every step formula during startup, as
+CoreConfig.ready did before core.mathml deferred MATHML_WARM_UP to the
+first conversion; against 'startup.worker' it shows the import time and
+resident memory the warm-up (and latex2mathml) add to a worker.
+"""
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from .measure import Measurement, percentile
+from .suites import BENCHMARKS, Benchmark, Skip
+
+WORKER = '''
+import json, os, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+from core import export_backends
+if {preload}:
+    export_backends.preload()
+if {warm_up}:
+    from core import mathml
+    mathml.warm_up()
+elapsed = time.perf_counter() - started
+from benchmarks.startup import rss_kib
+print(json.dumps({{'seconds': elapsed, 'rss_kib': rss_kib(), 'loaded': export_backends.loaded()}}))
+'''
+
+def rss_kib():
+    """Resident memory of this process in KiB."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return float(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak / 1024 if sys.platform == 'darwin' else float(peak)
+
+def start_worker(preload=False, warm_up=False):
+    """Start one fresh worker; returns its {seconds, rss_kib, loaded} report."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        'DJANGO_SETTINGS_MODULE', 'WindPressureCalculator.settings'
+    ))
+    process = subprocess.run(
+        [sys.executable, '-c', WORKER.format(preload=preload, warm_up=warm_up)],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise Skip(f'worker did not start: {lines[-1] if lines else process.returncode}')
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+def startup_benchmark(preload=False, warm_up=False):
+    def measure_startup(name, runs):
+        reports = [start_worker(preload, warm_up) for _ in range(runs)]
+        samples = sorted(report['seconds'] * 1000 for report in reports)
+        return Measurement(
+            name=name,
+            iterations=runs,
+            ops_per_sec=runs / (sum(samples) / 1000),
+            p50_ms=percentile(samples, 50),
+            p99_ms=percentile(samples, 99),
+            peak_kib=max(report['rss_kib'] for report in reports),
+        )
+    return measure_startup
+
+BENCHMARKS.append(Benchmark('startup.worker', None, heavy=True, measure=startup_benchmark()))
+BENCHMARKS.append(Benchmark('startup.preloaded', None, heavy=True, measure=startup_benchmark(preload=True)))
+BENCHMARKS.append(Benchmark('startup.mathml_warm_up', None, heavy=True, measure=startup_benchmark(warm_up=True)))
@@ -0,0 +1,209 @@
+"""
+The benchmarks, one per calculator and hot path.
+
+A benchmark's setup prepares its inputs and returns the operation to time,
+called with the iteration number (the worker startup benchmarks, in
+startup, measure separate processes instead); it raises Skip when the path
+cannot run in this environment (e.g. WeasyPrint without its system
+libraries). Names
+are '<calculator>.<path>', so a run can be narrowed with 'monopitch.*' or
+'*.pdf'.
+"""
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Callable
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from core.api import clean_case
+from core.export_backends import weasyprint_html
+from core.models import ReportJob
+from core.results import store_results
+from duopitch.calculations import results_data
+from duopitch.models import WindLoadCalculation as DuopitchCalculation
+from monopitch.models import WindLoadCalculation as MonopitchCalculation
+from monopitch.views import detail_results
+from Wind_load_analysis_on_hipped_roof.models import WindLoadCalculation as HippedCalculation
+from .corpora import corpus
+
+# Saved calculations per model for the list, detail and export benchmarks
+HISTORY_ROWS = 1000
+
+# Distinct reports rendered by the PDF benchmarks
+PDF_CASES = 5
+
+# The JSON API module of each calculator; its calculate view carries the
+# form class and the numeric calculation
+API_MODULES = {
+    'wall': 'calculator.api',
+    'flatroof': 'flatroof.api',
+    'monopitch': 'monopitch.api',
+    'duopitch': 'duopitch.api',
+    'hipped': 'Wind_load_analysis_on_hipped_roof.api',
+}
+
+FORM_URLS = {
+    'wall': 'calculate',
+    'flatroof': 'flatroof_calculate',
+    'monopitch': 'monopitch:monopitch_calculate',
+    'duopitch': 'duopitch:wind_load_calculator',
+    'hipped': 'wind_load_analysis_on_hipped_roof',
+}
+
+# Models with a saved history, and the function persisting their results
+HISTORY_MODELS = {
+    'monopitch': (MonopitchCalculation, detail_results),
+    'duopitch': (DuopitchCalculation, results_data),
+    'hipped': (HippedCalculation, None),
+}
+
+LIST_URLS = {
+    'monopitch': 'monopitch:wind_load_list',
+    'duopitch': 'duopitch:wind_load_list',
+    'hipped': 'wind_load_history',
+}
+
+EXPORT_URLS = {
+    'monopitch': 'monopitch:wind_load_export',
+    'duopitch': 'duopitch:wind_load_export',
+    'hipped': 'wind_load_export',
+}
+
+DETAIL_URLS = {
+    'monopitch': 'monopitch:wind_load_detail',
+    'duopitch': 'duopitch:wind_load_detail',
+}
+
+class Skip(Exception):
+    """Raised by a benchmark's setup when it cannot run here."""
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[int], object]]
+    # Heavy benchmarks run a tenth of the iterations
+    heavy: bool = False
+    # Takes (name, iterations) and returns the Measurement itself, for
+    # benchmarks that cannot be timed in this process (see startup)
+    measure: Callable[[str, int], object] = None
+
+BENCHMARKS = []
+
+def benchmark(name, heavy=False):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, heavy))
+        return setup
+    return register
+
+def endpoint(calculator):
+    return import_module(API_MODULES[calculator]).calculate
+
+def cleaned_corpus(calculator):
+    form_class = endpoint(calculator).form_class
+    return [clean_case(form_class, case)[0] for case in corpus(calculator)]
+
+def form_data(calculator):
+    return [{name: value for name, value in case.items() if value is not None} for case in corpus(calculator)]
+
+def seed_history():
+    """Save HISTORY_ROWS calculations per model, with results persisted like the views do."""
+    for calculator, (model, store) in HISTORY_MODELS.items():
+        cases = cleaned_corpus(calculator)
+        instances = model.objects.bulk_create(
+            model(**dict(cases[i % len(cases)], calculation_name=f'Benchmark {i}'))
+            for i in range(HISTORY_ROWS)
+        )
+        if store is not None:
+            for instance in instances:
+                store_results(instance, store)
+
+def check(response, status=200):
+    if response.status_code != status:
+        raise RuntimeError(f'{response.request["PATH_INFO"]} answered {response.status_code}, expected {status}')
+    return response
+
+def queued_report_html(request):
+    """The HTML a view queues for PDF rendering, captured without running the worker."""
+    with transaction.atomic():
+        job = ReportJob.objects.get(pk=check(request(), 202).json()['id'])
+        # Rolling back drops the on_commit hook that would render it
+        transaction.set_rollback(True)
+    return job.html
+
+def pdf_renderer():
+    try:
+        return weasyprint_html()
+    except (ImportError, OSError) as e:
+        raise Skip(f'WeasyPrint is unavailable: {e}')
+
+def saved_pks(calculator):
+    model = HISTORY_MODELS[calculator][0]
+    return list(model.objects.order_by('pk').values_list('pk', flat=True)[:HISTORY_ROWS])
+
+def register_calculation(calculator):
+    @benchmark(f'{calculator}.calculate')
+    def calculation():
+        calculate = endpoint(calculator).calculate
+        cases = cleaned_corpus(calculator)
+        return lambda i: calculate([cases[i % len(cases)]])
+
+    @benchmark(f'{calculator}.view')
+    def view():
+        client, url, cases = Client(), reverse(FORM_URLS[calculator]), form_data(calculator)
+        check(client.post(url, cases[0]))
+        return lambda i: client.post(url, cases[i % len(cases)])
+
+for calculator in API_MODULES:
+    register_calculation(calculator)
+
+def register_history(calculator):
+    @benchmark(f'{calculator}.list')
+    def history_list():
+        client, url = Client(), reverse(LIST_URLS[calculator])
+        check(client.get(url))
+        return lambda i: client.get(url)
+
+    @benchmark(f'{calculator}.export', heavy=True)
+    def history_export():
+        client, url = Client(), reverse(EXPORT_URLS[calculator])
+        return lambda i: b''.join(check(client.get(url)).streaming_content)
+
+for calculator in LIST_URLS:
+    register_history(calculator)
+
+def register_detail(calculator):
+    @benchmark(f'{calculator}.detail')
+    def detail():
+        client, pks = Client(), saved_pks(calculator)
+        return lambda i: check(client.get(reverse(DETAIL_URLS[calculator], args=[pks[i % len(pks)]])))
+
+for calculator in DETAIL_URLS:
+    register_detail(calculator)
+
+def register_form_exports(calculator):
+    @benchmark(f'{calculator}.csv')
+    def csv_export():
+        # REPORT_CACHE_MAX_BYTES is 0 during runs, so every export is rendered
+        client, url, cases = Client(), reverse(FORM_URLS[calculator]) + '?format=csv', form_data(calculator)
+        check(client.post(url, cases[0]))
+        return lambda i: client.post(url, cases[i % len(cases)]).getvalue()
+
+    @benchmark(f'{calculator}.pdf', heavy=True)
+    def pdf_export():
+        HTML = pdf_renderer()
+        client, url, cases = Client(), reverse(FORM_URLS[calculator]) + '?format=pdf', form_data(calculator)
+        documents = [queued_report_html(lambda: client.post(url, case)) for case in cases[:PDF_CASES]]
+        return lambda i: HTML(string=documents[i % len(documents)]).write_pdf()
+
+for calculator in ('monopitch', 'hipped'):
+    register_form_exports(calculator)
+
+@benchmark('duopitch.pdf', heavy=True)
+def duopitch_pdf():
+    HTML = pdf_renderer()
+    client = Client()
+    documents = [
+        queued_report_html(lambda: client.get(reverse(DETAIL_URLS['duopitch'], args=[pk]) + '?format=pdf'))
+        for pk in saved_pks('duopitch')[:PDF_CASES]
+    ]
+    return lambda i: HTML(string=documents[i % len(documents)]).write_pdf()
@@ -0,0 +1,19 @@
+import numpy as np
+from core.api import batch_view
+from core.records import RecordTable
+from .forms import WindPressureForm
+from .services import BATCH_RESULT_DTYPE, REQUIRED_FIELDS, BatchWindLoadCalculator, ZoneResult
+
+def calculate_cases(cases):
+    """Zone results of every wall case, computed in one vectorised pass."""
+    if not cases:
+        return []
+    columns = {field: [case[field] for case in cases] for field in REQUIRED_FIELDS}
+    rows = BatchWindLoadCalculator(columns).calculate()
+
+    # Rows come case by case; each case's zones are a slice of one table
+    zones = RecordTable.from_columns(ZoneResult, [rows[name] for name in BATCH_RESULT_DTYPE.names[1:]])
+    bounds = np.searchsorted(rows['case'], np.arange(len(cases) + 1)).tolist()
+    return [{'zones': zones.rows(start, stop)} for start, stop in zip(bounds, bounds[1:])]
+
+calculate = batch_view(WindPressureForm, calculate_cases)
@@ -0,0 +1,8 @@
+"""
+LaTeX formula templates shown in the wall calculation steps.
+
+WindLoadCalculator.get_explanation() builds no steps yet, so there are no
+formulas to warm up; list them here once it does.
+"""
+
+FORMULAS = ()
@@ -1,9 +1,64 @@
 import math
 from django.core.exceptions import ValidationError
 import logging
+import numpy as np
+from core.engine import elementwise, exposure_factor, terrain
+from core.records import Record, record
+from core.timing import timed
 
 logger = logging.getLogger(__name__)
 
+# Terrain categories per ES EN 1991-1-4:2015 Table 4.1
+TERRAIN_DATA = {
+    1: terrain(0.01, 1),
+    2: terrain(0.05, 2),
+    3: terrain(0.3, 3),
+    4: terrain(1.0, 10)
+}
+
+# External pressure coefficients for vertical walls, keyed by h/d ratio
+CPE_DATA = {
+    5: {
+        'A': {'C_pe_10': -1.2, 'C_pe_1': -1.4},
+        'B': {'C_pe_10': -0.8, 'C_pe_1': -1.1},
+        'C': {'C_pe_10': -0.5, 'C_pe_1': -0.5},
+        'D': {'C_pe_10': 0.8, 'C_pe_1': 1.0},
+        'E': {'C_pe_10': -0.7, 'C_pe_1': -0.7}
+    },
+    2: {
+        'A': {'C_pe_10': -1.2, 'C_pe_1': -1.4},
+        'B': {'C_pe_10': -0.8, 'C_pe_1': -1.1},
+        'C': {'C_pe_10': -0.5, 'C_pe_1': -0.5},
+        'D': {'C_pe_10': 0.8, 'C_pe_1': 1.0},
+        'E': {'C_pe_10': -0.5, 'C_pe_1': -0.5}
+    },
+    0.25: {
+        'A': {'C_pe_10': -1.2, 'C_pe_1': -1.4},
+        'B': {'C_pe_10': -0.8, 'C_pe_1': -1.1},
+        'C': {'C_pe_10': -0.5, 'C_pe_1': -0.5},
+        'D': {'C_pe_10': 0.7, 'C_pe_1': 1.0},
+        'E': {'C_pe_10': -0.3, 'C_pe_1': -0.3}
+    }
+}
+
+REQUIRED_FIELDS = [
+    'height', 'in_wind_depth', 'width', 'site_altitude',
+    'terrain_category', 'upwind_slope', 'orographic_factor',
+    'structural_factor', 'windward_openings', 'leeward_openings',
+    'parallel_openings', 'windward_area', 'leeward_area',
+    'parallel_area', 'internal_pressure_coeff', 'basic_wind_velocity'
+]
+
+@record
+class ZoneResult(Record):
+    zone: str
+    area: float
+    C_pe: float
+    W_e: float
+    W_i: float
+    W_net: float
+    F_w: float
+
 class WindLoadCalculator:
     def __init__(self, data):
         self.data = data
@@ -11,15 +66,7 @@ class WindLoadCalculator:
         
     def validate_input(self):
         """Validate input data."""
-        required_fields = [
-            'height', 'in_wind_depth', 'width', 'site_altitude',
-            'terrain_category', 'upwind_slope', 'orographic_factor',
-            'structural_factor', 'windward_openings', 'leeward_openings',
-            'parallel_openings', 'windward_area', 'leeward_area',
-            'parallel_area', 'internal_pressure_coeff', 'basic_wind_velocity'
-        ]
-        
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             if field not in self.data:
                 raise ValidationError(f"Missing required field: {field}")
                 
@@ -63,22 +110,11 @@ class WindLoadCalculator:
         
     def calculate_terrain_parameters(self):
         """Calculate terrain parameters."""
-        Z_o_II = 0.05
-        terrain_data = {
-            1: {'Z_o': 0.01, 'Z_min': 1, 'K_r': 0.17},
-            2: {'Z_o': 0.05, 'Z_min': 2, 'K_r': 0.19},
-            3: {'Z_o': 0.3, 'Z_min': 3, 'K_r': 0.22},
-            4: {'Z_o': 1.0, 'Z_min': 10, 'K_r': 0.24}
-        }
-        
         T = int(self.data['terrain_category'])
-        if T not in terrain_data:
+        if T not in TERRAIN_DATA:
             raise ValidationError(f"Invalid terrain category: {T}")
             
-        Z_o = terrain_data[T]['Z_o']
-        Z_min = terrain_data[T]['Z_min']
-        K_r = 0.19 * (Z_o / Z_o_II) ** 0.07
-        
+        Z_o, Z_min, K_r = TERRAIN_DATA[T]
         return Z_o, Z_min, K_r
         
     def calculate_reference_height(self):
@@ -98,9 +134,6 @@ class WindLoadCalculator:
             
     def calculate_exposure_factor(self, Z_e, Z_o, Z_min, K_r):
         """Calculate exposure factor for a given reference height."""
-        # Calculate roughness factor
-        C_r = K_r * math.log(Z_e / Z_o) if Z_e >= Z_min else K_r * math.log(Z_min / Z_o)
-        
         # Calculate orographic factor
         phi = self.data['upwind_slope']
         s = self.data['orographic_factor']
@@ -113,7 +146,7 @@ class WindLoadCalculator:
             C_o = 1 + 0.6 * s
             
         # Calculate exposure factor
-        return C_o ** 2 * C_r ** 2 * (1 + (7 * K_r) / (C_o * C_r))
+        return exposure_factor(Z_e, Z_o, Z_min, K_r, C_o)
         
     def calculate_peak_velocity_pressure(self, q_b, C_e_z):
         """Calculate peak velocity pressure."""
@@ -144,30 +177,6 @@ class WindLoadCalculator:
         
     def calculate_pressure_coefficients(self, h_d_ratio, area):
         """Calculate pressure coefficients based on h/d ratio and area."""
-        cpe_data = {
-            5: {
-                'A': {'C_pe_10': -1.2, 'C_pe_1': -1.4},
-                'B': {'C_pe_10': -0.8, 'C_pe_1': -1.1},
-                'C': {'C_pe_10': -0.5, 'C_pe_1': -0.5},
-                'D': {'C_pe_10': 0.8, 'C_pe_1': 1.0},
-                'E': {'C_pe_10': -0.7, 'C_pe_1': -0.7}
-            },
-            2: {
-                'A': {'C_pe_10': -1.2, 'C_pe_1': -1.4},
-                'B': {'C_pe_10': -0.8, 'C_pe_1': -1.1},
-                'C': {'C_pe_10': -0.5, 'C_pe_1': -0.5},
-                'D': {'C_pe_10': 0.8, 'C_pe_1': 1.0},
-                'E': {'C_pe_10': -0.5, 'C_pe_1': -0.5}
-            },
-            0.25: {
-                'A': {'C_pe_10': -1.2, 'C_pe_1': -1.4},
-                'B': {'C_pe_10': -0.8, 'C_pe_1': -1.1},
-                'C': {'C_pe_10': -0.5, 'C_pe_1': -0.5},
-                'D': {'C_pe_10': 0.7, 'C_pe_1': 1.0},
-                'E': {'C_pe_10': -0.3, 'C_pe_1': -0.3}
-            }
-        }
-        
         if h_d_ratio > 2 and h_d_ratio < 5:
             h_d_key = 5
         elif h_d_ratio > 0.25 and h_d_ratio < 2:
@@ -178,8 +187,8 @@ class WindLoadCalculator:
             h_d_key = 5
             
         zone = 'D' if 'D' in area['zone'] else area['zone'][0]
-        cpe_10 = cpe_data[h_d_key][zone]['C_pe_10']
-        cpe_1 = cpe_data[h_d_key][zone]['C_pe_1']
+        cpe_10 = CPE_DATA[h_d_key][zone]['C_pe_10']
+        cpe_1 = CPE_DATA[h_d_key][zone]['C_pe_1']
         
         if area['area'] <= 1:
             return cpe_1
@@ -188,6 +197,7 @@ class WindLoadCalculator:
         else:
             return cpe_1 - (cpe_1 - cpe_10) * math.log10(area['area'])
             
+    @timed('math')
     def calculate(self):
         """Perform all calculations and return results."""
         try:
@@ -256,15 +266,7 @@ class WindLoadCalculator:
                 # Calculate wind force
                 F_w = self.data['structural_factor'] * W_net * zone['area']
                 
-                results.append({
-                    'zone': zone['zone'],
-                    'area': zone['area'],
-                    'C_pe': C_pe,
-                    'W_e': W_e,
-                    'W_i': W_i,
-                    'W_net': W_net,
-                    'F_w': F_w
-                })
+                results.append(ZoneResult(zone['zone'], zone['area'], C_pe, W_e, W_i, W_net, F_w))
                 
             return results
             
@@ -272,9 +274,226 @@ class WindLoadCalculator:
             logger.error(f"Error in wind load calculation: {str(e)}")
             raise
             
+    @timed('explain')
     def get_explanation(self):
         """Generate explanation for each calculation step."""
         # This method would generate detailed explanations for each step
         # Similar to the original code but organized by step
         # Implementation omitted for brevity
-        return [] 
\ No newline at end of file
+        return []
+
+
+# Zone order of WindLoadCalculator.calculate_zone_areas()
+WALL_ZONES = ['A', 'B', 'C', 'D (Lower)', 'D (Upper)', 'E']
+
+BATCH_RESULT_DTYPE = np.dtype([
+    ('case', np.int64),
+    ('zone', 'U9'),
+    ('area', np.float64),
+    ('C_pe', np.float64),
+    ('W_e', np.float64),
+    ('W_i', np.float64),
+    ('W_net', np.float64),
+    ('F_w', np.float64),
+])
+
+
+class BatchWindLoadCalculator:
+    """Column-oriented variant of WindLoadCalculator.
+
+    Takes one array (or broadcastable scalar) per input field and evaluates
+    every case at once. Results are bit-identical to running
+    WindLoadCalculator(data).calculate() on each row.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.validate_input()
+
+    def validate_input(self):
+        """Validate and broadcast input columns."""
+        for field in REQUIRED_FIELDS:
+            if field not in self.columns:
+                raise ValidationError(f"Missing required field: {field}")
+
+        arrays = np.broadcast_arrays(*[
+            np.atleast_1d(np.asarray(self.columns[field], dtype=np.float64))
+            for field in REQUIRED_FIELDS
+        ])
+        self.data = {field: array for field, array in zip(REQUIRED_FIELDS, arrays)}
+        self.size = arrays[0].size
+
+        if np.any(self.data['height'] <= 0):
+            raise ValidationError("Building height must be positive")
+        if np.any(self.data['in_wind_depth'] <= 0):
+            raise ValidationError("In-wind depth must be positive")
+        if np.any(self.data['width'] <= 0):
+            raise ValidationError("Building width must be positive")
+
+        categories = self.data['terrain_category']
+        invalid = ~np.isin(categories, list(TERRAIN_DATA))
+        if np.any(invalid):
+            raise ValidationError(f"Invalid terrain category: {int(categories[invalid][0])}")
+
+    def calculate_air_density(self):
+        """Calculate air density based on altitude for every case."""
+        h_o_total = self.data['site_altitude'] + self.data['height']
+        return np.select(
+            [
+                h_o_total == 0,
+                h_o_total == 500,
+                (0 < h_o_total) & (h_o_total < 500),
+                h_o_total == 1000,
+                (500 < h_o_total) & (h_o_total < 1000),
+                h_o_total == 1500,
+                (1000 < h_o_total) & (h_o_total < 1500),
+                h_o_total == 2000,
+                (1500 < h_o_total) & (h_o_total < 2000),
+            ],
+            [
+                1.2,
+                1.12,
+                1.2 + (1.12 - 1.2) * (h_o_total / 500),
+                1.06,
+                1.12 + (1.06 - 1.12) * ((h_o_total - 500) / 500),
+                1.00,
+                1.06 + (1.00 - 1.06) * ((h_o_total - 1000) / 500),
+                0.94,
+                1.00 + (0.94 - 1.00) * ((h_o_total - 1500) / 500),
+            ],
+            default=0.94
+        )
+
+    def calculate_basic_wind_velocity(self):
+        """Calculate basic wind velocity for every case."""
+        C_dir = 1.0
+        C_seasonal = 1.0
+        return C_dir * C_seasonal * self.data['basic_wind_velocity']
+
+    def calculate_terrain_parameters(self):
+        """Look up terrain parameters for every case."""
+        categories = sorted(TERRAIN_DATA)
+        index = np.searchsorted(categories, self.data['terrain_category'])
+        Z_o, Z_min, K_r = np.array([TERRAIN_DATA[T] for T in categories], dtype=np.float64).T
+        return Z_o[index], Z_min[index], K_r[index]
+
+    def calculate_reference_heights(self):
+        """Return reference heights for the lower and upper parts of each case.
+
+        The upper height only differs from the lower one where b < h < 2b.
+        """
+        h = self.data['height']
+        b = self.data['in_wind_depth']
+        split = (b < h) & (h < 2 * b)
+        return np.where(split, b, h), h, split
+
+    def calculate_exposure_factor(self, Z_e, Z_o, Z_min, K_r):
+        """Calculate exposure factor for arrays of reference heights."""
+        # Calculate roughness factor
+        C_r = K_r * elementwise(math.log, np.where(Z_e >= Z_min, Z_e, Z_min) / Z_o)
+
+        # Calculate orographic factor
+        phi = self.data['upwind_slope']
+        s = self.data['orographic_factor']
+        C_o = np.select(
+            [phi < 0.05, phi < 0.3],
+            [1.0, 1 + 2 * s * phi],
+            default=1 + 0.6 * s
+        )
+
+        # Calculate exposure factor
+        return elementwise(pow, C_o, 2) * elementwise(pow, C_r, 2) * (1 + (7 * K_r) / (C_o * C_r))
+
+    def calculate_zone_areas(self):
+        """Calculate areas for each zone, one column per entry in WALL_ZONES."""
+        h = self.data['height']
+        b = self.data['in_wind_depth']
+        d = self.data['width']
+        e = np.minimum(b, 2 * h)
+        split = (b < h) & (h < 2 * b)
+
+        return np.column_stack([
+            (e / 5) * h,
+            (4 / 5 * e) * h,
+            (d - e) * h,
+            np.where(split, b * b, b * h),
+            np.where(split, b * (h - b), 0.0),
+            b * h
+        ])
+
+    def calculate_pressure_coefficients(self, h_d_ratio, areas):
+        """Calculate pressure coefficients for every case and zone."""
+        h_d_key = np.select(
+            [
+                (h_d_ratio > 2) & (h_d_ratio < 5),
+                (h_d_ratio > 0.25) & (h_d_ratio < 2),
+                h_d_ratio <= 0.25,
+            ],
+            [5, 2, 0.25],
+            default=5
+        )
+
+        cpe_10 = np.empty_like(areas)
+        cpe_1 = np.empty_like(areas)
+        for column, zone_name in enumerate(WALL_ZONES):
+            zone = 'D' if 'D' in zone_name else zone_name[0]
+            for key, table in CPE_DATA.items():
+                rows = h_d_key == key
+                cpe_10[rows, column] = table[zone]['C_pe_10']
+                cpe_1[rows, column] = table[zone]['C_pe_1']
+
+        interpolate = (areas > 1) & (areas < 10)
+        log_area = np.zeros_like(areas)
+        log_area[interpolate] = elementwise(math.log10, areas[interpolate])
+        return np.where(
+            areas <= 1,
+            cpe_1,
+            np.where(areas >= 10, cpe_10, cpe_1 - (cpe_1 - cpe_10) * log_area)
+        )
+
+    @timed('math')
+    def calculate(self):
+        """Perform all calculations and return a structured array of zone results.
+
+        Rows follow the same order as WindLoadCalculator.calculate(): case by
+        case, zones in WALL_ZONES order, skipping zones with zero area.
+        """
+        try:
+            rho = self.calculate_air_density()
+            V_b = self.calculate_basic_wind_velocity()
+            q_b = 0.5 * rho * elementwise(pow, V_b, 2) * 1e-3
+
+            Z_o, Z_min, K_r = self.calculate_terrain_parameters()
+            Z_e_lower, Z_e_upper, split = self.calculate_reference_heights()
+
+            q_p_lower = q_b * self.calculate_exposure_factor(Z_e_lower, Z_o, Z_min, K_r)
+            q_p_upper = q_b * self.calculate_exposure_factor(Z_e_upper, Z_o, Z_min, K_r)
+
+            h_d_ratio = self.data['height'] / self.data['width']
+            areas = self.calculate_zone_areas()
+            C_pe = self.calculate_pressure_coefficients(h_d_ratio, areas)
+
+            q_p = np.repeat(q_p_lower[:, np.newaxis], len(WALL_ZONES), axis=1)
+            upper = WALL_ZONES.index('D (Upper)')
+            q_p[split, upper] = q_p_upper[split]
+
+            W_e = q_p * C_pe
+            W_i = q_p * self.data['internal_pressure_coeff'][:, np.newaxis]
+            W_net = W_e - W_i
+            F_w = self.data['structural_factor'][:, np.newaxis] * W_net * areas
+
+            applicable = areas != 0
+            results = np.empty(int(applicable.sum()), dtype=BATCH_RESULT_DTYPE)
+            results['case'] = np.broadcast_to(np.arange(self.size)[:, np.newaxis], areas.shape)[applicable]
+            results['zone'] = np.broadcast_to(np.array(WALL_ZONES), areas.shape)[applicable]
+            results['area'] = areas[applicable]
+            results['C_pe'] = C_pe[applicable]
+            results['W_e'] = W_e[applicable]
+            results['W_i'] = W_i[applicable]
+            results['W_net'] = W_net[applicable]
+            results['F_w'] = F_w[applicable]
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in batch wind load calculation: {str(e)}")
+            raise
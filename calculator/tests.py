@@ -1,5 +1,6 @@
 from django.test import TestCase
-from .services import WindLoadCalculator
+import itertools
+from .services import WindLoadCalculator, BatchWindLoadCalculator
 from django.core.exceptions import ValidationError
 
 class WindLoadCalculatorTests(TestCase):
@@ -137,3 +138,93 @@ class WindLoadCalculatorTests(TestCase):
             self.assertGreaterEqual(result['area'], 0)
             self.assertGreaterEqual(result['W_net'], -10)  # Net pressure shouldn't be too negative
             self.assertLessEqual(result['W_net'], 10)  # Net pressure shouldn't be too positive
+
+
+class BatchWindLoadCalculatorTests(TestCase):
+    def setUp(self):
+        self.base_data = {
+            'height': 19.871,
+            'in_wind_depth': 30.6,
+            'width': 19.26,
+            'site_altitude': 0,
+            'terrain_category': 3,
+            'upwind_slope': 0,
+            'orographic_factor': 0,
+            'structural_factor': 1,
+            'windward_openings': 24,
+            'leeward_openings': 1,
+            'parallel_openings': 5,
+            'windward_area': 1.7514,
+            'leeward_area': 37.43,
+            'parallel_area': 1.7514,
+            'internal_pressure_coeff': 0.35,
+            'basic_wind_velocity': 22
+        }
+        self.cases = []
+        for height, depth, width, altitude, terrain, slope in itertools.product(
+            [0.8, 4.2, 19.871, 40, 75.5],
+            [1.1, 30.6],
+            [0.3, 19.26, 250],
+            [0, 480, 500, 1234.5, 1650, 2600],
+            [1, 2, 3, 4],
+            [0, 0.1, 0.4]
+        ):
+            data = self.base_data.copy()
+            data.update({
+                'height': height,
+                'in_wind_depth': depth,
+                'width': width,
+                'site_altitude': altitude,
+                'terrain_category': terrain,
+                'upwind_slope': slope,
+                'orographic_factor': 0.5
+            })
+            self.cases.append(data)
+
+    def _columns(self, cases):
+        return {field: [case[field] for case in cases] for field in self.base_data}
+
+    def test_matches_scalar_calculation(self):
+        """Batch results are bit-identical to the scalar path."""
+        results = BatchWindLoadCalculator(self._columns(self.cases)).calculate()
+
+        expected = []
+        for index, data in enumerate(self.cases):
+            for row in WindLoadCalculator(data).calculate():
+                expected.append((index, row))
+        self.assertEqual(len(results), len(expected))
+
+        for record, (index, row) in zip(results, expected):
+            self.assertEqual(record['case'], index)
+            self.assertEqual(record['zone'], row['zone'])
+            for field in ('area', 'C_pe', 'W_e', 'W_i', 'W_net', 'F_w'):
+                self.assertEqual(float(record[field]), row[field], (index, row['zone'], field))
+
+    def test_air_density_matches_scalar(self):
+        """Air density is computed per case."""
+        rho = BatchWindLoadCalculator(self._columns(self.cases)).calculate_air_density()
+        for value, data in zip(rho, self.cases):
+            self.assertEqual(float(value), WindLoadCalculator(data).calculate_air_density())
+
+    def test_scalar_columns_broadcast(self):
+        """Scalar inputs are broadcast against array columns."""
+        columns = dict(self.base_data, height=[10.0, 19.871])
+        results = BatchWindLoadCalculator(columns).calculate()
+        self.assertEqual(set(results['case']), {0, 1})
+
+    def test_validation(self):
+        """Invalid rows are rejected for the whole batch."""
+        columns = self._columns(self.cases[:3])
+        del columns['height']
+        with self.assertRaises(ValidationError):
+            BatchWindLoadCalculator(columns)
+
+        columns = self._columns(self.cases[:3])
+        columns['in_wind_depth'][1] = 0
+        with self.assertRaises(ValidationError):
+            BatchWindLoadCalculator(columns)
+
+        columns = self._columns(self.cases[:3])
+        columns['terrain_category'][2] = 5
+        with self.assertRaises(ValidationError):
+            BatchWindLoadCalculator(columns)
@@ -1,7 +1,8 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.calculate, name='calculate'),
+    path('api/calculate/', api.calculate, name='wall_api_calculate'),
    
 ]
\ No newline at end of file
@@ -2,6 +2,7 @@ from django.shortcuts import render
 from django.core.exceptions import ValidationError
 from .forms import WindPressureForm
 from .services import WindLoadCalculator
+from core import timing
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,11 +24,12 @@ def calculate(request):
                 # Add explanation for each step
                 explanation = calculator.get_explanation()
                 
-                return render(request, 'calculator/results.html', {
-                    'form': form,
-                    'results': results,
-                    'explanation': explanation
-                })
+                with timing.step('render'):
+                    return render(request, 'calculator/results.html', {
+                        'form': form,
+                        'results': results,
+                        'explanation': explanation
+                    })
                 
             except ValidationError as e:
                 logger.error(f"Validation error in wind load calculation: {str(e)}")
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import CalculationResult, ReportJob
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'status', 'created_at', 'updated_at')
+    list_filter = ('status', 'created_at')
+    readonly_fields = ('id', 'created_at', 'updated_at')
+    exclude = ('html', 'pdf')
+
+
+@admin.register(CalculationResult)
+class CalculationResultAdmin(admin.ModelAdmin):
+    list_display = ('model', 'object_id', 'engine_version', 'computed_at')
+    list_filter = ('model', 'engine_version')
+    readonly_fields = ('computed_at',)
@@ -0,0 +1,107 @@
+"""
+JSON batch endpoints for the calculators.
+
+Each calculator exposes a POST endpoint taking many cases at once:
+
+    {"cases": [{"vb0": 22, "terrain_category": "II", ...}, ...], "save": false}
+
+and answering with numeric results only, one entry per case, in order:
+
+    {"results": [{...}, ...]}
+
+Cases are validated with the calculator's own form fields and cross-field
+clean(), but without instantiating the form, so no widgets are copied and
+no templates are rendered. Nothing is written to the database unless
+"save" is true and the calculator is backed by a model. Any invalid case
+rejects the whole batch with a 400 listing the errors by case index.
+"""
+import json
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from .records import json_response
+from .results import bulk_store_results
+
+def max_cases():
+    return getattr(settings, 'API_MAX_CASES', 10000)
+
+def clean_case(form_class, case):
+    """Cleaned data and field errors for one case, validated like form_class would."""
+    # Skip __init__: the shared base_fields are enough to clean values, and
+    # copying every field and widget per case is what makes forms slow here
+    form = form_class.__new__(form_class)
+    form.cleaned_data = {}
+    errors = {}
+    for name, field in form_class.base_fields.items():
+        try:
+            form.cleaned_data[name] = field.clean(case.get(name))
+        except ValidationError as e:
+            errors[name] = e.messages
+    if not errors:
+        try:
+            form.cleaned_data = form.clean()
+        except ValidationError as e:
+            errors['__all__'] = e.messages
+    return form.cleaned_data, errors
+
+def error_response(message, status=400, **extra):
+    return JsonResponse({'error': message, **extra}, status=status)
+
+def batch_view(form_class, calculate, model=None, store=None):
+    """
+    View running calculate(cleaned_cases) -> list of JSON-ready results.
+
+    For model-backed calculators, "save": true creates one model row per case
+    and, when a store function is given, persists its results with
+    core.results so the detail page does not recompute them.
+    """
+    @csrf_exempt
+    @require_POST
+    def view(request):
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return error_response('Request body is not valid JSON.')
+
+        cases = payload.get('cases') if isinstance(payload, dict) else None
+        if not isinstance(cases, list) or not all(isinstance(case, dict) for case in cases):
+            return error_response('Expected {"cases": [{...}, ...]}.')
+        if len(cases) > max_cases():
+            return error_response(f'At most {max_cases()} cases per request.', status=413)
+        save = bool(payload.get('save', False))
+        if save and model is None:
+            return error_response('This calculator does not store calculations.')
+
+        cleaned_cases = []
+        errors = []
+        for index, case in enumerate(cases):
+            cleaned, case_errors = clean_case(form_class, case)
+            if case_errors:
+                errors.append({'case': index, 'errors': case_errors})
+            cleaned_cases.append(cleaned)
+        if errors:
+            return error_response('Invalid cases.', errors=errors)
+
+        try:
+            results = calculate(cleaned_cases)
+        except ValidationError as e:
+            return error_response(' '.join(e.messages))
+
+        if save:
+            with transaction.atomic():
+                instances = model.objects.bulk_create([model(**cleaned) for cleaned in cleaned_cases])
+                if store is not None:
+                    # Store functions compute from the instances alone: one insert for every row
+                    bulk_store_results(instances, [store(instance) for instance in instances])
+            for instance, result in zip(instances, results):
+                result['id'] = instance.pk
+        # Results hold record rows; written as JSON without converting them to dicts
+        return json_response({'results': results})
+
+    # Exposed for callers running the same calculation outside a request
+    view.form_class = form_class
+    view.calculate = calculate
+    return view
@@ -0,0 +1,24 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        if getattr(settings, 'EXPORT_BACKENDS_PRELOAD', False):
+            from .export_backends import preload
+            preload()
+        from . import reports, results
+        results.connect()
+        reports.connect()
+        from django.db.backends.signals import connection_created
+        from .db import configure_sqlite
+        connection_created.connect(configure_sqlite)
+        if getattr(settings, 'TEMPLATE_WARM_UP', False):
+            from .template_cache import warm_up
+            warm_up()
+        if getattr(settings, 'WRITE_BEHIND', False):
+            from .writebehind import start
+            start()
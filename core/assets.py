@@ -0,0 +1,164 @@
+"""
+Static asset pipeline.
+
+``manage.py build_assets`` downloads the third-party CSS, JS and fonts
+listed in VENDORED into core/static/vendor, then runs collectstatic. The
+storage below (settings.STORAGES) stores every asset under a content-hashed
+name and writes .gz and .br siblings of the text formats. serve() answers
+STATIC_URL from STATIC_ROOT with the smallest variant the client accepts,
+and marks hashed names immutable for a year, so repeat page loads request
+no assets at all. (A front-end server can do the same with gzip_static,
+brotli_static and a far-future expiry on hashed names.)
+
+Templates link third-party files with {% vendor 'path' %}, which points at
+the local copy once it has been vendored and at the CDN until then.
+"""
+import gzip
+import mimetypes
+from functools import lru_cache
+from pathlib import Path
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Local path under static/vendor -> the CDN URL it is downloaded from
+VENDORED = {
+    'bootstrap/5.3.0/css/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'bootstrap/5.3.0/js/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'bootstrap-icons/1.10.5/bootstrap-icons.css': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/bootstrap-icons.css',
+    'bootstrap-icons/1.10.5/fonts/bootstrap-icons.woff': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/fonts/bootstrap-icons.woff',
+    'bootstrap-icons/1.10.5/fonts/bootstrap-icons.woff2': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/fonts/bootstrap-icons.woff2',
+    'font-awesome/6.0.0/css/all.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+    'animate.css/4.1.1/animate.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/animate.css/4.1.1/animate.min.css',
+    'html2pdf.js/0.9.2/html2pdf.bundle.min.js': 'https://cdnjs.cloudflare.com/ajax/libs/html2pdf.js/0.9.2/html2pdf.bundle.min.js',
+}
+for font in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility'):
+    for extension in ('woff2', 'ttf'):
+        VENDORED[f'font-awesome/6.0.0/webfonts/{font}.{extension}'] = (
+            f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/webfonts/{font}.{extension}'
+        )
+
+VENDOR_DIR = Path(__file__).resolve().parent / 'static' / 'vendor'
+
+# Formats worth compressing; images and woff/woff2 fonts already are
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.map', '.txt', '.xml', '.html', '.ttf', '.otf', '.eot'}
+
+# Served compressed variants, best first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+def vendor_url(path):
+    """URL of a vendored file: the local copy when present, the CDN otherwise."""
+    if _vendored(path):
+        return staticfiles_storage.url(f'vendor/{path}')
+    return VENDORED[path]
+
+@lru_cache(maxsize=None)
+def _vendored(path):
+    return finders.find(f'vendor/{path}') is not None
+
+@receiver(setting_changed)
+def _setting_changed(setting, **kwargs):
+    if setting in ('STATICFILES_DIRS', 'STATICFILES_FINDERS', 'INSTALLED_APPS'):
+        _vendored.cache_clear()
+
+def compress(path):
+    """Write .gz (and with Brotli installed, .br) siblings of a file where they pay off."""
+    data = path.read_bytes()
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(data) * 0.95:
+            path.with_name(path.name + suffix).write_bytes(compressed)
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Content-hashed static files with precompressed variants of the text formats."""
+
+    # Links to files that are not collected (e.g. missing images) stay
+    # unhashed instead of failing the page
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(hashed):
+            if Path(name).suffix.lower() in COMPRESSIBLE:
+                compress(Path(self.path(name)))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+def accepted_encodings(request):
+    """Content codings the client accepts (q > 0)."""
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+@lru_cache(maxsize=1)
+def _hashed_names(manifest, mtime):
+    hashed_files, _ = staticfiles_storage.load_manifest()
+    return frozenset(hashed_files.values())
+
+def is_hashed(name):
+    """Whether a name is the hashed name of a collected file (re-read when the manifest changes)."""
+    try:
+        manifest = Path(settings.STATIC_ROOT) / staticfiles_storage.manifest_name
+        mtime = manifest.stat().st_mtime
+    except (AttributeError, OSError, TypeError):
+        return False
+    return name in _hashed_names(manifest, mtime)
+
+def serve(request, path):
+    """A collected static file, precompressed where possible, with far-future caching of hashed names."""
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404('Not found')
+    if not fullpath.is_file():
+        raise Http404('Not found')
+
+    content_type, _ = mimetypes.guess_type(fullpath.name)
+    stat = fullpath.stat()
+    response = get_conditional_response(request, last_modified=int(stat.st_mtime))
+    if response is None:
+        accepted = accepted_encodings(request)
+        served, encoding = fullpath, None
+        if Path(path).suffix.lower() in COMPRESSIBLE:
+            for coding, suffix in ENCODINGS:
+                variant = fullpath.with_name(fullpath.name + suffix)
+                if coding in accepted and variant.is_file():
+                    served, encoding = variant, coding
+                    break
+        response = FileResponse(open(served, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ['Accept-Encoding'])
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = IMMUTABLE if is_hashed(path) else 'public, max-age=0, must-revalidate'
+    return response
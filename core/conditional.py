@@ -0,0 +1,60 @@
+"""
+Conditional GET for the saved-calculation detail pages.
+
+A detail page is fully determined by its calculation row, the ENGINE_VERSION
+its stored results come from, its templates and SERVER_MATHML. The page's
+ETag hashes all of them and its Last-Modified is the row's updated_at, so
+a repeat view, or a reverse proxy revalidating its copy, is answered with
+304 Not Modified after one indexed lookup instead of loading results and
+rendering. Responses carry Cache-Control: no-cache, so caches may keep the
+page but must revalidate it before reuse. Requests with a query string
+(PDF exports, single sections) are left to the view.
+"""
+import hashlib
+import json
+from functools import wraps
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from . import mathml
+from .engine import ENGINE_VERSION
+from .report_cache import template_version
+
+def calculation_validators(model, template_name):
+    """(etag_func, last_modified_func) for a detail view taking the calculation's pk."""
+    def last_modified(request, pk):
+        if request.GET:
+            return None
+        # Both validators need the row; look it up once per request
+        if not hasattr(request, '_calculation_updated_at'):
+            request._calculation_updated_at = (
+                model.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+            )
+        return request._calculation_updated_at
+
+    def etag(request, pk):
+        updated_at = last_modified(request, pk)
+        if updated_at is None:
+            return None
+        payload = json.dumps([
+            model._meta.label_lower, pk, updated_at.isoformat(), ENGINE_VERSION,
+            template_version(template_name), mathml.server_side(),
+        ])
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    return etag, last_modified
+
+def conditional_detail(model, template_name):
+    """Decorator adding ETag/Last-Modified and 304 responses to a calculation detail view."""
+    etag, last_modified = calculation_validators(model, template_name)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('ETag') and not request.GET:
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,19 @@
+"""
+Per-connection database tuning.
+
+SQLite allows one writer at a time, and in its default rollback-journal mode
+a writer also blocks every reader. ``configure_sqlite`` switches file
+databases to write-ahead logging, where readers never wait for the writer
+and commits only append to the log, so concurrent calculation submissions
+and the PDF workers queue briefly on the write lock instead of on each
+other's reads. Client/server databases are configured in settings.
+"""
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver enabling WAL on SQLite file databases."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        # Safe with WAL: a power loss may drop the last commits, never corrupt the file
+        cursor.execute('PRAGMA synchronous=NORMAL')
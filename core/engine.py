@@ -0,0 +1,180 @@
+"""
+Shared EN 1991-1-4 wind engine.
+
+Every roof and wall calculator derives the peak velocity pressure q_p(z)
+through the same chain: q_b -> k_r -> c_r -> I_v -> q_p. The terrain
+constants (z_0, z_min and the terrain factor k_r) are computed once at import
+so a request only pays for one logarithm.
+
+Results are memoised in a bounded LRU cache shared by every app in the
+process, since most design checks reuse a handful of terrain categories,
+wind speeds and heights. Hit/miss counters are available through
+cache_info().
+
+peak_velocity_pressures() runs the same chain over NumPy columns, for
+sweeps and batches, with results bit-identical to the scalar function.
+
+With EXPOSURE_TABLES on, both take q_p from the interpolated exposure
+profiles of core.profiles instead, within profiles.error_bound() of the
+exact value; the intermediate values returned alongside it stay exact.
+"""
+import math
+from functools import lru_cache
+from typing import NamedTuple
+import numpy as np
+from django.conf import settings
+from django.core.signals import setting_changed
+
+# Bump whenever a formula, table or rounding rule changes: results persisted
+# by core.results under an older version are recomputed on next read
+ENGINE_VERSION = 1
+
+Z_0_II = 0.05  # Roughness length of terrain category II (m)
+
+# Maximum number of memoised results per cached function
+CACHE_SIZE = 4096
+
+
+class Terrain(NamedTuple):
+    z_0: float
+    z_min: float
+    k_r: float
+
+
+def terrain(z_0, z_min):
+    """Build a terrain record with its precomputed terrain factor k_r (Eq. 4.5)."""
+    return Terrain(z_0, z_min, 0.19 * (z_0 / Z_0_II) ** 0.07)
+
+
+# EN 1991-1-4 Table 4.1
+TERRAIN_CATEGORIES = {
+    '0': terrain(0.003, 1),
+    'I': terrain(0.01, 1),
+    'II': terrain(0.05, 2),
+    'III': terrain(0.3, 5),
+    'IV': terrain(1.0, 10),
+}
+
+
+class PeakVelocityPressure(NamedTuple):
+    z_0: float
+    z_min: float
+    k_r: float
+    c_r: float
+    v_m: float
+    I_v: float
+    q_p: float
+
+
+def basic_velocity_pressure(v_b, rho):
+    """Basic velocity pressure q_b in kN/m² (Eq. 4.10)."""
+    return 0.5 * rho * v_b ** 2 / 1000
+
+
+def roughness_factor(z, z_0, z_min, k_r):
+    """Roughness factor c_r(z) (Eq. 4.4)."""
+    return k_r * math.log(max(z, z_min) / z_0)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def exposure_factor(z, z_0, z_min, k_r, c_0=1.0):
+    """Exposure factor c_e(z) = q_p(z) / q_b with k_I = 1 (Eq. 4.8)."""
+    c_r = roughness_factor(z, z_0, z_min, k_r)
+    return c_0 ** 2 * c_r ** 2 * (1 + (7 * k_r) / (c_0 * c_r))
+
+
+def exposure_tables():
+    """Whether q_p comes from the tabulated exposure profiles (EXPOSURE_TABLES)."""
+    return getattr(settings, 'EXPOSURE_TABLES', False)
+
+
+def exact_peak_velocity_pressure(terrain_category, z, v_b, rho, c_0=1.0, k_i=1.0):
+    """peak_velocity_pressure() computed from the formulas, never from the tables nor the cache."""
+    z_0, z_min, k_r = TERRAIN_CATEGORIES[terrain_category]
+    ln_z = math.log(max(z, z_min) / z_0)
+    c_r = k_r * ln_z
+    v_m = c_r * c_0 * v_b
+    I_v = k_i / (c_0 * ln_z)
+    q_p = (1 + 7 * I_v) * 0.5 * rho * v_m ** 2 / 1000
+    return PeakVelocityPressure(z_0, z_min, k_r, c_r, v_m, I_v, q_p)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def peak_velocity_pressure(terrain_category, z, v_b, rho, c_0=1.0, k_i=1.0):
+    """
+    Peak velocity pressure q_p(z) in kN/m² at reference height z (Eq. 4.8).
+    Returns the intermediate terrain and turbulence values alongside q_p so
+    callers can build their explanation steps without recomputing them.
+    """
+    result = exact_peak_velocity_pressure(terrain_category, z, v_b, rho, c_0, k_i)
+    if exposure_tables():
+        from . import profiles
+        result = result._replace(q_p=profiles.peak_velocity_pressure(terrain_category, z, v_b, rho, c_0, k_i))
+    return result
+
+
+def elementwise(func, values, *args):
+    """Apply a scalar math function to every element of an array.
+
+    NumPy's vectorised log/pow kernels may differ from libm in the last ulp,
+    so transcendental steps go through the same calls as the scalar path.
+    Only the distinct values are evaluated.
+    """
+    unique, inverse = np.unique(values, return_inverse=True)
+    mapped = np.fromiter(
+        (func(value, *args) for value in unique.tolist()),
+        dtype=np.float64,
+        count=unique.size
+    )
+    return mapped[inverse].reshape(values.shape)
+
+
+def peak_velocity_pressures(terrain_categories, z, v_b, rho, c_0=1.0, k_i=1.0):
+    """
+    peak_velocity_pressure() for columns of inputs (arrays, or scalars that
+    broadcast), returning a PeakVelocityPressure of arrays.
+    """
+    names = sorted(TERRAIN_CATEGORIES)
+    categories, z, v_b, rho, c_0, k_i = np.broadcast_arrays(
+        np.asarray(terrain_categories, dtype=str),
+        *(np.asarray(column, dtype=np.float64) for column in (z, v_b, rho, c_0, k_i))
+    )
+    index = np.searchsorted(names, categories)
+    z_0, z_min, k_r = np.array([TERRAIN_CATEGORIES[name] for name in names]).T[:, index]
+    ln_z = elementwise(math.log, np.maximum(z, z_min) / z_0)
+    c_r = k_r * ln_z
+    v_m = c_r * c_0 * v_b
+    I_v = k_i / (c_0 * ln_z)
+    if exposure_tables():
+        from . import profiles
+        q_p = profiles.exposure_factors(categories, z, c_0, k_i) * 0.5 * rho * v_b * v_b / 1000
+        # Heights above the tables keep the exact value
+        above = np.isnan(q_p)
+        if above.any():
+            q_p[above] = (1 + 7 * I_v[above]) * 0.5 * rho[above] * elementwise(pow, v_m[above], 2) / 1000
+    else:
+        q_p = (1 + 7 * I_v) * 0.5 * rho * elementwise(pow, v_m, 2) / 1000
+    return PeakVelocityPressure(z_0, z_min, k_r, c_r, v_m, I_v, q_p)
+
+
+def cache_info():
+    """Hit/miss counters of the shared engine caches, keyed by function name."""
+    return {
+        'peak_velocity_pressure': peak_velocity_pressure.cache_info()._asdict(),
+        'exposure_factor': exposure_factor.cache_info()._asdict(),
+    }
+
+
+def cache_clear():
+    """Drop every memoised engine result and reset the counters."""
+    peak_velocity_pressure.cache_clear()
+    exposure_factor.cache_clear()
+
+
+def _setting_changed(setting, **kwargs):
+    # Memoised q_p values depend on the mode
+    if setting == 'EXPOSURE_TABLES':
+        peak_velocity_pressure.cache_clear()
+
+
+setting_changed.connect(_setting_changed)
@@ -0,0 +1,50 @@
+"""
+Export libraries, imported on first use.
+
+WeasyPrint (with its Pango and cairo stack) is only needed to render PDFs
+and latex2mathml only to convert formulas, but importing them at module
+level made every worker load them while importing the URLconf. Code that
+exports goes through these accessors instead, so a worker imports each
+library the first time it actually needs it, and a worker that never
+renders a PDF never loads WeasyPrint.
+
+With EXPORT_BACKENDS_PRELOAD on, CoreConfig.ready imports them all at
+startup instead: the better choice for a pre-forking server started with
+--preload, whose workers then share the master's copy of the libraries.
+"""
+import sys
+import time
+
+# Module imported by each backend
+LIBRARIES = {
+    'pdf': 'weasyprint',
+    'mathml': 'latex2mathml',
+}
+
+def weasyprint_html():
+    """WeasyPrint's HTML class."""
+    from weasyprint import HTML
+    return HTML
+
+def write_pdf(html):
+    """PDF bytes for an HTML document."""
+    return weasyprint_html()(string=html).write_pdf()
+
+def timed_write_pdf(html):
+    """write_pdf() and the seconds it took, for core.reports' rendering processes."""
+    started = time.perf_counter()
+    pdf = write_pdf(html)
+    return pdf, time.perf_counter() - started
+
+def mathml_converter():
+    """latex2mathml's converter module."""
+    from latex2mathml import converter
+    return converter
+
+def loaded():
+    """{backend: whether its library has been imported by this process}."""
+    return {backend: module in sys.modules for backend, module in LIBRARIES.items()}
+
+def preload():
+    weasyprint_html()
+    mathml_converter()
@@ -0,0 +1,33 @@
+"""
+Streaming CSV exports of whole calculation histories.
+
+Rows are produced by a generator and written out one at a time through
+StreamingHttpResponse, and the querysets feeding them are read with
+.iterator(chunk_size=EXPORT_CHUNK_SIZE), so neither the rows nor the model
+instances are ever all held in memory.
+"""
+import csv
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+class Echo:
+    """File-like object whose write() returns the value instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+def csv_rows(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+def history(queryset):
+    """Iterate a calculation queryset newest first, in chunks."""
+    return queryset.order_by('-created_at', '-id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+def streaming_csv_response(filename, header, rows):
+    response = StreamingHttpResponse(csv_rows(header, rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
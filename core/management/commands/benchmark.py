@@ -0,0 +1,64 @@
+"""
+Run the performance benchmarks (see the benchmarks package).
+
+    python manage.py benchmark                       # everything
+    python manage.py benchmark 'monopitch.*' '*.pdf' # a selection
+    python manage.py benchmark --save benchmarks/baseline.json
+    python manage.py benchmark --compare benchmarks/baseline.json --tolerance 0.2
+
+With --compare the command fails when any benchmark's throughput drops, or
+its peak memory grows, by more than the tolerance.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.runner import load_baseline, regressions, run, save_baseline, select
+
+ROW = '{:<22} {:>6} {:>11} {:>9} {:>9} {:>10} {:>9}'
+
+class Command(BaseCommand):
+    help = 'Measure ops/sec, p50/p99 latency and peak memory of every calculator hot path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('patterns', nargs='*', help="Benchmark names or globs, e.g. 'monopitch.*'")
+        parser.add_argument('--iterations', type=int, default=200, help='Timed operations per benchmark')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed operations before timing')
+        parser.add_argument('--save', metavar='PATH', help='Write the results as a baseline')
+        parser.add_argument('--compare', metavar='PATH', help='Compare against a saved baseline')
+        parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed relative regression (default 0.15)')
+
+    def handle(self, patterns, iterations=200, warmup=10, save=None, compare=None, tolerance=0.15, **options):
+        benchmarks = select(patterns)
+        if not benchmarks:
+            raise CommandError(f'No benchmark matches {" ".join(patterns)}.')
+        if iterations < 1 or warmup < 0:
+            raise CommandError('--iterations must be at least 1 and --warmup at least 0.')
+        try:
+            baseline = load_baseline(compare) if compare else {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise CommandError(f'Cannot read baseline {compare}: {e}')
+        selected = {b.name for b in benchmarks}
+        baseline = {name: m for name, m in baseline.items() if name in selected}
+
+        self.stdout.write(ROW.format('benchmark', 'iter', 'ops/sec', 'p50 ms', 'p99 ms', 'peak KiB', 'vs base'))
+
+        def progress(m):
+            base = baseline.get(m.name)
+            change = f'{m.ops_per_sec / base.ops_per_sec - 1:+.1%}' if base else ''
+            self.stdout.write(ROW.format(
+                m.name, m.iterations, f'{m.ops_per_sec:,.1f}', f'{m.p50_ms:.3f}', f'{m.p99_ms:.3f}',
+                f'{m.peak_kib:,.1f}', change
+            ))
+
+        measurements, skipped = run(benchmarks, iterations, warmup, progress)
+        for name, reason in skipped.items():
+            self.stdout.write(f'{name}: {reason}')
+
+        if save:
+            save_baseline(save, measurements)
+            self.stdout.write(f'Baseline written to {save}')
+        if compare:
+            found = regressions(measurements, baseline, tolerance)
+            for name, metric, before, after in found:
+                self.stderr.write(f'{name}: {metric} {before:,.1f} -> {after:,.1f}')
+            if found:
+                raise CommandError(f'{len(found)} regression(s) beyond {tolerance:.0%} of {compare}.')
+            self.stdout.write(self.style.SUCCESS(f'No regressions beyond {tolerance:.0%} of {compare}.'))
@@ -0,0 +1,117 @@
+"""
+Run a file of calculator cases across a pool of worker processes.
+
+    python manage.py run_wind_batch monopitch cases.csv -o results.jsonl --workers 8
+
+Cases are read from CSV (a header row of form field names) or JSON lines, in
+chunks, and each chunk is validated and calculated in a worker by the same
+code as the JSON API (<app>.api.calculate). Results are written as JSON
+lines in input order while later chunks are still running, so neither the
+input nor the output is held in memory. Throughput is reported on stderr.
+"""
+import csv
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core import records
+from core.api import clean_case
+
+ROOF_TYPES = {
+    'wall': 'calculator.api',
+    'flatroof': 'flatroof.api',
+    'monopitch': 'monopitch.api',
+    'duopitch': 'duopitch.api',
+    'hipped': 'Wind_load_analysis_on_hipped_roof.api',
+}
+
+def init_worker():
+    # Already configured when the pool forks; spawned workers start fresh
+    django.setup()
+
+def run_chunk(roof, chunk):
+    """[(index, {"results": ...} or {"errors": ...}), ...] for one chunk of (index, case)."""
+    endpoint = import_module(ROOF_TYPES[roof]).calculate
+    outcomes = {}
+    valid = []
+    for index, case in chunk:
+        cleaned, errors = clean_case(endpoint.form_class, case)
+        if errors:
+            outcomes[index] = {'errors': errors}
+        else:
+            valid.append((index, cleaned))
+    if valid:
+        results = endpoint.calculate([cleaned for _, cleaned in valid])
+        for (index, _), result in zip(valid, results):
+            outcomes[index] = {'results': result}
+    return [(index, outcomes[index]) for index, _ in chunk]
+
+def read_cases(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+def chunks(cases, size):
+    numbered = enumerate(cases)
+    while chunk := list(itertools.islice(numbered, size)):
+        yield chunk
+
+def ordered(pool, roof, chunk_iter, workers):
+    """Yield chunk results in input order, keeping at most 2 chunks per worker in flight."""
+    pending = deque()
+    for chunk in chunk_iter:
+        pending.append(pool.submit(run_chunk, roof, chunk))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+class Command(BaseCommand):
+    help = 'Calculate a CSV or JSON-lines file of cases for one roof type on a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roof', choices=sorted(ROOF_TYPES))
+        parser.add_argument('input', help='CSV with a header row of field names, or JSON lines (.jsonl)')
+        parser.add_argument('-o', '--output', help='JSON-lines output file (default: stdout)')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from the file extension)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Cases sent to a worker at a time')
+
+    def handle(self, roof, input, output=None, format=None, workers=None, chunk_size=500, **options):
+        fmt = format or ('csv' if input.lower().endswith('.csv') else 'jsonl')
+        if workers < 1 or chunk_size < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1.')
+        try:
+            source = open(input, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'Cannot read {input}: {e}')
+        target = open(output, 'w', encoding='utf-8') if output else self.stdout
+
+        total = invalid = 0
+        start = time.perf_counter()
+        # Workers never touch the database; don't hand them open connections
+        connections.close_all()
+        with source, ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+            for outcomes in ordered(pool, roof, chunks(read_cases(source, fmt), chunk_size), workers):
+                for index, outcome in outcomes:
+                    target.write(records.dumps({'case': index, **outcome}) + '\n')
+                    total += 1
+                    invalid += 'errors' in outcome
+        if output:
+            target.close()
+
+        elapsed = time.perf_counter() - start
+        rate = total / elapsed if elapsed else float('inf')
+        self.stderr.write(
+            f'{total} {roof} cases ({invalid} invalid) in {elapsed:.2f} s: '
+            f'{rate:,.0f} cases/s on {workers} workers'
+        )
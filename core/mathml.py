@@ -0,0 +1,96 @@
+"""
+Process-wide LaTeX to MathML conversion cache.
+
+Step formulas are static strings, so each one only needs converting once per
+process. Apps list theirs in a ``formulas`` module exposing ``FORMULAS``, and
+with MATHML_WARM_UP enabled ``warm_up`` converts them all on the first
+render, so latex2mathml is still only imported once a page needs it.
+
+With SERVER_MATHML on, the results pages render every formula and every
+values/result string through the ``mathml`` template filter (see
+core.templatetags.mathml) instead of shipping LaTeX for MathJax to typeset
+in the browser. The value-bearing strings change with every calculation
+but share the LRU cache with the formulas, which stay in it because every
+page uses them.
+"""
+import re
+from functools import lru_cache
+from importlib import import_module
+from django.apps import apps
+from django.conf import settings
+from django.utils.html import escape
+from django.utils.module_loading import module_has_submodule
+from django.utils.safestring import mark_safe
+from .export_backends import mathml_converter
+
+CACHE_SIZE = 4096
+
+# Whether warm_up() has run in this process
+_warmed = False
+
+# \( inline \) and \[ display \] math within text
+DELIMITED = re.compile(r'\\\((.*?)\\\)|\\\[(.*?)\\\]', re.S)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def to_mathml(latex, display='inline'):
+    """MathML markup for a LaTeX formula, converted once per process."""
+    return mathml_converter().convert(latex, display=display)
+
+def server_side():
+    return getattr(settings, 'SERVER_MATHML', False)
+
+def render(text, display=None):
+    """
+    HTML for text containing \\( inline \\) and \\[ display \\] LaTeX, with
+    each expression converted to MathML and the rest escaped. With
+    ``display`` ('inline' or 'block') the whole text is one bare expression.
+    """
+    if not _warmed and getattr(settings, 'MATHML_WARM_UP', False):
+        warm_up()
+    text = str(text)
+    if display is not None:
+        return mark_safe(to_mathml(text.strip(), display))
+    parts = []
+    end = 0
+    for match in DELIMITED.finditer(text):
+        inline, block = match.groups()
+        parts.append(escape(text[end:match.start()]))
+        if inline is not None:
+            parts.append(to_mathml(inline.strip(), 'inline'))
+        else:
+            parts.append(to_mathml(block.strip(), 'block'))
+        end = match.end()
+    parts.append(escape(text[end:]))
+    return mark_safe(''.join(parts))
+
+def known_formulas():
+    """Formula templates listed in the ``formulas`` module of every installed app."""
+    formulas = []
+    for app_config in apps.get_app_configs():
+        if module_has_submodule(app_config.module, 'formulas'):
+            module = import_module(f'{app_config.name}.formulas')
+            formulas.extend(getattr(module, 'FORMULAS', ()))
+    return formulas
+
+def formula(latex):
+    """
+    HTML for a step formula as warm_up() converts it: delimited math within
+    text, or a bare formula as display math. PDF exports use this so they
+    hit the warmed cache entries.
+    """
+    if DELIMITED.search(latex):
+        return render(latex)
+    return render(latex, 'block')
+
+def warm_up():
+    """Convert every known formula so later results pages find them cached."""
+    global _warmed
+    _warmed = True
+    for latex in known_formulas():
+        formula(latex)
+
+def cache_info():
+    return to_mathml.cache_info()
+
+def cache_clear():
+    to_mathml.cache_clear()
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, help_text='core.report_cache key the finished PDF is stored under', max_length=64),
+        ),
+    ]
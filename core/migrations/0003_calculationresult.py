@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_reportjob_cache_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalculationResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='app_label.model_name of the calculation', max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('engine_version', models.PositiveIntegerField()),
+                ('data', models.JSONField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Calculation Result',
+                'verbose_name_plural': 'Calculation Results',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='calculationresult',
+            constraint=models.UniqueConstraint(fields=('model', 'object_id'), name='core_result_per_calculation'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_calculationresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calculationresult',
+            name='source_updated_at',
+            field=models.DateTimeField(blank=True, help_text='updated_at of the calculation when its results were computed', null=True),
+        ),
+    ]
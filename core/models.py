@@ -0,0 +1,67 @@
+import uuid
+from django.db import models
+
+class ReportJob(models.Model):
+    """A PDF export rendered off the request thread by core.reports."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed')
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    filename = models.CharField(max_length=255)
+    html = models.TextField(help_text="Rendered HTML source of the report")
+    pdf = models.BinaryField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    cache_key = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="core.report_cache key the finished PDF is stored under"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Report Job"
+        verbose_name_plural = "Report Jobs"
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class CalculationResult(models.Model):
+    """Computed results of a saved calculation, stored by core.results."""
+    model = models.CharField(max_length=100, help_text="app_label.model_name of the calculation")
+    object_id = models.PositiveBigIntegerField()
+    engine_version = models.PositiveIntegerField()
+    source_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="updated_at of the calculation when its results were computed"
+    )
+    data = models.JSONField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'object_id'], name='core_result_per_calculation'),
+        ]
+        verbose_name = "Calculation Result"
+        verbose_name_plural = "Calculation Results"
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} (engine v{self.engine_version})"
@@ -0,0 +1,74 @@
+"""
+Keyset (cursor) pagination for the calculation history pages.
+
+Pages are ordered newest first on (created_at, id) and each one is fetched
+with a range condition on that pair instead of an OFFSET, so the cost of a
+page does not grow with its distance from the start of the table. The
+models carry a matching composite index.
+"""
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from django.db.models import Q
+from django.http import Http404
+
+PAGE_SIZE = 50
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None
+    previous_cursor: str | None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return bool(self.next_cursor or self.previous_cursor)
+
+def encode_cursor(obj, direction):
+    raw = f'{direction}|{obj.created_at.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(direction, created_at, pk) for a cursor, raising Http404 if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, created_at, pk = raw.split('|')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        raise Http404('Invalid page cursor')
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    """
+    One page of ``queryset``, newest first, starting after (or before) the row
+    encoded in ``cursor``.
+    """
+    if not cursor:
+        rows = list(queryset.order_by('-created_at', '-id')[:page_size + 1])
+        has_more, has_newer = len(rows) > page_size, False
+        rows = rows[:page_size]
+    else:
+        direction, created_at, pk = decode_cursor(cursor)
+        if direction == 'next':
+            older = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            rows = list(queryset.filter(older).order_by('-created_at', '-id')[:page_size + 1])
+            has_more, has_newer = len(rows) > page_size, True
+            rows = rows[:page_size]
+        else:
+            newer = Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            rows = list(queryset.filter(newer).order_by('created_at', 'id')[:page_size + 1])
+            has_more, has_newer = True, len(rows) > page_size
+            rows = rows[:page_size][::-1]
+
+    return KeysetPage(
+        object_list=rows,
+        next_cursor=encode_cursor(rows[-1], 'next') if rows and has_more else None,
+        previous_cursor=encode_cursor(rows[0], 'prev') if rows and has_newer else None,
+    )
@@ -0,0 +1,171 @@
+"""
+Tabulated exposure profiles c_e(z) for fast peak velocity pressures.
+
+For each terrain category the two height-dependent parts of c_e(z) are
+sampled on a uniform height grid when the module is imported:
+
+    c_e(z) = c_0² · c_r(z)² + 7 · k_I · c_0 · k_r · c_r(z)
+
+so q_p(z) = c_e(z) · q_b needs one index computation and two linear
+interpolations instead of a logarithm and powers. Linear interpolation of a
+function f on a grid of step h is off by at most h²/8 · max|f''|; these bounds
+are computed per category and exposed through error_bound().
+
+core.engine uses these tables when the EXPOSURE_TABLES setting is on.
+
+Run ``python -m core.profiles`` to verify the tables against the exact engine
+and time both paths.
+"""
+import math
+from array import array
+
+import numpy as np
+
+from .engine import TERRAIN_CATEGORIES, basic_velocity_pressure, exact_peak_velocity_pressure
+
+GRID_STEP = 0.05  # Height grid spacing (m)
+Z_MAX = 200.0  # Highest tabulated reference height (m); above it the exact formula is used
+
+
+class ExposureProfile:
+    """Tabulated c_r(z)² and k_r·c_r(z) for one terrain category."""
+
+    __slots__ = ('z_0', 'z_min', 'k_r', 'step', 'c_r_sq', 'k_r_c_r', 'c_r_sq_bound', 'k_r_c_r_bound')
+
+    def __init__(self, z_0, z_min, k_r, step=GRID_STEP, z_max=Z_MAX):
+        self.z_0 = z_0
+        self.z_min = z_min
+        self.k_r = k_r
+        self.step = step
+
+        heights = [z_min + i * step for i in range(int(math.ceil((z_max - z_min) / step)) + 1)]
+        logs = [math.log(z / z_0) for z in heights]
+        self.c_r_sq = array('d', ((k_r * ln_z) ** 2 for ln_z in logs))
+        self.k_r_c_r = array('d', (k_r * k_r * ln_z for ln_z in logs))
+
+        # Second derivatives: (c_r²)'' = 2 k_r² (1 - ln(z/z_0)) / z², (k_r c_r)'' = -k_r² / z².
+        # Both magnitudes decrease with height, so the largest node value bounds the interval.
+        c_r_sq_curvature = max(2 * k_r ** 2 * abs(1 - ln_z) / z ** 2 for z, ln_z in zip(heights, logs))
+        k_r_c_r_curvature = k_r ** 2 / z_min ** 2
+        self.c_r_sq_bound = step ** 2 / 8 * c_r_sq_curvature
+        self.k_r_c_r_bound = step ** 2 / 8 * k_r_c_r_curvature
+
+    @property
+    def z_max(self):
+        return self.z_min + (len(self.c_r_sq) - 1) * self.step
+
+    def exposure_factor(self, z, c_0=1.0, k_i=1.0):
+        """Interpolated exposure factor c_e(z), or None above the tabulated range."""
+        position = (z - self.z_min) / self.step if z > self.z_min else 0.0
+        index = int(position)
+        c_r_sq = self.c_r_sq
+        if index >= len(c_r_sq) - 1:
+            if z > self.z_max:
+                return None
+            index = len(c_r_sq) - 2
+        fraction = position - index
+        k_r_c_r = self.k_r_c_r
+
+        lower = c_r_sq[index]
+        c_r_sq_z = lower + fraction * (c_r_sq[index + 1] - lower)
+        lower = k_r_c_r[index]
+        k_r_c_r_z = lower + fraction * (k_r_c_r[index + 1] - lower)
+        return c_0 * c_0 * c_r_sq_z + 7 * k_i * c_0 * k_r_c_r_z
+
+    def error_bound(self, c_0=1.0, k_i=1.0):
+        """Upper bound on |c_e(z) interpolated - c_e(z) exact| over the table."""
+        return c_0 ** 2 * self.c_r_sq_bound + 7 * k_i * abs(c_0) * self.k_r_c_r_bound
+
+
+PROFILES = {
+    category: ExposureProfile(*terrain)
+    for category, terrain in TERRAIN_CATEGORIES.items()
+}
+
+
+def peak_velocity_pressure(terrain_category, z, v_b, rho, c_0=1.0, k_i=1.0):
+    """
+    Peak velocity pressure q_p(z) in kN/m² from the tabulated profile.
+    Heights above the table fall back to the exact engine.
+    """
+    c_e = PROFILES[terrain_category].exposure_factor(z, c_0, k_i)
+    if c_e is None:
+        return exact_peak_velocity_pressure(terrain_category, z, v_b, rho, c_0=c_0, k_i=k_i).q_p
+    return c_e * 0.5 * rho * v_b * v_b / 1000
+
+
+def exposure_factors(terrain_categories, z, c_0=1.0, k_i=1.0):
+    """
+    ExposureProfile.exposure_factor() for broadcast columns of inputs, with
+    NaN above the tabulated range.
+    """
+    categories, z, c_0, k_i = np.broadcast_arrays(
+        np.asarray(terrain_categories, dtype=str),
+        *(np.asarray(column, dtype=np.float64) for column in (z, c_0, k_i))
+    )
+    c_e = np.full(z.shape, np.nan)
+    for category in np.unique(categories).tolist():
+        profile = PROFILES[category]
+        rows = categories == category
+        z_rows = z[rows]
+        c_r_sq = np.frombuffer(profile.c_r_sq)
+        k_r_c_r = np.frombuffer(profile.k_r_c_r)
+        position = np.where(z_rows > profile.z_min, (z_rows - profile.z_min) / profile.step, 0.0)
+        index = np.minimum(position.astype(np.intp), len(c_r_sq) - 2)
+        fraction = position - index
+
+        lower = c_r_sq[index]
+        c_r_sq_z = lower + fraction * (c_r_sq[index + 1] - lower)
+        lower = k_r_c_r[index]
+        k_r_c_r_z = lower + fraction * (k_r_c_r[index + 1] - lower)
+        c_0_rows = c_0[rows]
+        values = c_0_rows * c_0_rows * c_r_sq_z + 7 * k_i[rows] * c_0_rows * k_r_c_r_z
+        c_e[rows] = np.where(z_rows > profile.z_max, np.nan, values)
+    return c_e
+
+
+def error_bound(terrain_category, v_b, rho, c_0=1.0, k_i=1.0):
+    """Upper bound on the q_p(z) interpolation error in kN/m²."""
+    return PROFILES[terrain_category].error_bound(c_0, k_i) * basic_velocity_pressure(v_b, rho)
+
+
+def verify(samples=20000, cases=((22.0, 1.25, 1.0), (27.0, 1.25, 1.15))):
+    """
+    Compare the tables with the exact engine on a dense height sweep.
+    The default cases mirror duopitch.calculations.calculate_wind_loads
+    (c_0 = 1) and flatroof.views.flatroof_calculate (user supplied c_0).
+    Returns rows of (category, v_b, rho, c_0, max error, error bound).
+    """
+    report = []
+    for category, profile in PROFILES.items():
+        for v_b, rho, c_0 in cases:
+            worst = 0.0
+            for i in range(samples):
+                z = 0.5 + (profile.z_max - 0.5) * i / (samples - 1)
+                exact = exact_peak_velocity_pressure(category, z, v_b, rho, c_0=c_0).q_p
+                worst = max(worst, abs(peak_velocity_pressure(category, z, v_b, rho, c_0=c_0) - exact))
+            report.append((category, v_b, rho, c_0, worst, error_bound(category, v_b, rho, c_0)))
+    return report
+
+
+def main():
+    import timeit
+
+    print(f"{'Terrain':<8} {'v_b':>6} {'rho':>5} {'c_0':>5} {'max error':>12} {'bound':>12}")
+    for category, v_b, rho, c_0, worst, bound in verify():
+        print(f"{category:<8} {v_b:>6.1f} {rho:>5.2f} {c_0:>5.2f} {worst:>12.3e} {bound:>12.3e}")
+
+    heights = [1.0 + 0.37 * i for i in range(500)]
+    exact = exact_peak_velocity_pressure
+    exact_time = min(timeit.repeat(
+        lambda: [exact('III', z, 27.0, 1.25, c_0=1.1) for z in heights], number=20, repeat=5
+    ))
+    table_time = min(timeit.repeat(
+        lambda: [peak_velocity_pressure('III', z, 27.0, 1.25, c_0=1.1) for z in heights], number=20, repeat=5
+    ))
+    calls = 20 * len(heights)
+    print(f"exact: {exact_time / calls * 1e9:.0f} ns/call, table: {table_time / calls * 1e9:.0f} ns/call")
+
+
+if __name__ == '__main__':
+    main()
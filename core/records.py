@@ -0,0 +1,230 @@
+"""
+Compact result records.
+
+Zone results used to be plain dicts, a hash table per row holding its own
+key references. A record type is a slotted dataclass declared with
+@record: its rows keep their values in fixed slots with no per-instance
+__dict__. Records also read like the dicts they replace (record['w_e'],
+'w_e' in record, record.get(), record.items()), so templates, CSV writers
+and dict-style callers work unchanged.
+
+Batches keep their rows in a RecordTable instead: one column per field,
+with float fields packed in array('d'). tabulate() moves the rows of every
+case of a batch into one table, built a whole column at a time, and leaves
+each case a RecordRows view of its slice; a row only becomes a record
+again when it is indexed.
+
+dumps() writes JSON straight from record slots and table columns, with
+the same text json.dumps gives for the equivalent dicts, so API and batch
+output build no per-row dict.
+"""
+import dataclasses
+import json
+import math
+from array import array
+from collections.abc import Sequence
+from itertools import chain
+from operator import attrgetter
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    from _json import encode_basestring_ascii
+except ImportError:
+    from json.encoder import encode_basestring_ascii
+
+class Record:
+    """Base of @record types: dict-style reads over the dataclass fields."""
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        values = self._values(self)
+        return values if len(self._fields) > 1 else (values,)
+
+    def items(self):
+        return zip(self._fields, self.values())
+
+    def as_dict(self):
+        """The row as a dict, for storing in a JSONField."""
+        return dict(zip(self._fields, self.values()))
+
+    def json(self):
+        return _json_row(self._json_keys, self.values())
+
+def record(cls):
+    """Make a Record subclass a slotted dataclass with its field metadata."""
+    cls = dataclasses.dataclass(slots=True)(cls)
+    fields = dataclasses.fields(cls)
+    cls._fields = tuple(field.name for field in fields)
+    cls._values = attrgetter(*cls._fields)
+    # Columns of non-optional float fields pack into array('d') in a RecordTable
+    cls._packed = tuple(field.type in (float, 'float') for field in fields)
+    cls._json_keys = tuple(encode_basestring_ascii(name) + ': ' for name in cls._fields)
+    return cls
+
+class RecordTable(Sequence):
+    """Rows of one record type stored column by column."""
+
+    def __init__(self, record_type):
+        self.record_type = record_type
+        self.columns = tuple([array('d') if packed else [] for packed in record_type._packed])
+
+    @classmethod
+    def from_columns(cls, record_type, columns):
+        """A table over whole columns, given per field in field order (e.g. NumPy arrays)."""
+        table = cls(record_type)
+        for column, values in zip(table.columns, columns):
+            column.extend(values.tolist() if hasattr(values, 'tolist') else values)
+        return table
+
+    @classmethod
+    def from_rows(cls, record_type, rows):
+        """A table of records, built one whole column at a time."""
+        rows = list(rows)
+        getters = [attrgetter(name) for name in record_type._fields]
+        return cls.from_columns(record_type, [map(getter, rows) for getter in getters])
+
+    def rows(self, start=0, stop=None):
+        return RecordRows(self, start, len(self) if stop is None else stop)
+
+    def column(self, name):
+        return self.columns[self.record_type._fields.index(name)]
+
+    def value_rows(self, start=0, stop=None):
+        """Each row as a tuple of values, e.g. for csv.writer."""
+        return zip(*(column[start:stop] for column in self.columns))
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError('RecordTable slices must be contiguous.')
+            return self.rows(start, max(start, stop))
+        return self.record_type(*(column[index] for column in self.columns))
+
+    def json(self, start=0, stop=None):
+        keys = self.record_type._json_keys
+        return '[' + ', '.join(_json_row(keys, row) for row in self.value_rows(start, stop)) + ']'
+
+class RecordRows(Sequence):
+    """A contiguous run of rows of a RecordTable, e.g. one case of a batch."""
+    __slots__ = ('table', 'start', 'stop')
+
+    def __init__(self, table, start, stop):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('row index out of range')
+        return self.table[self.start + index]
+
+    def value_rows(self):
+        return self.table.value_rows(self.start, self.stop)
+
+    def json(self):
+        return self.table.json(self.start, self.stop)
+
+    def __reduce__(self):
+        # Pickle on its own (e.g. to a worker's parent) without the whole table
+        table = RecordTable(self.table.record_type)
+        for column, values in zip(table.columns, self.table.columns):
+            column.extend(values[self.start:self.stop])
+        return RecordRows, (table, 0, len(self))
+
+def tabulate(results, key, record_type):
+    """
+    Move the record lists results[i][key] of a batch into one table, leaving
+    each case a RecordRows view of its rows. Returns the table.
+    """
+    table = RecordTable.from_rows(record_type, chain.from_iterable(result[key] for result in results))
+    start = 0
+    for result in results:
+        stop = start + len(result[key])
+        result[key] = table.rows(start, stop)
+        start = stop
+    return table
+
+def _float(value):
+    # As json.dumps writes floats
+    if math.isfinite(value):
+        return float.__repr__(value)
+    if value != value:
+        return 'NaN'
+    return 'Infinity' if value > 0 else '-Infinity'
+
+def _scalar(value):
+    kind = value.__class__
+    if kind is float:
+        return _float(value)
+    if kind is str:
+        return encode_basestring_ascii(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if kind is int:
+        return int.__repr__(value)
+    return json.dumps(value, cls=DjangoJSONEncoder)
+
+def _key(key):
+    # json.dumps writes non-string keys as their JSON text, quoted
+    return encode_basestring_ascii(key if key.__class__ is str else _scalar(key))
+
+def _json_row(keys, values):
+    return '{' + ', '.join([key + _scalar(value) for key, value in zip(keys, values)]) + '}'
+
+def iter_json(value):
+    """JSON text of value in chunks; records, tables and row views are written from their fields."""
+    if isinstance(value, (Record, RecordTable, RecordRows)):
+        yield value.json()
+    elif isinstance(value, dict):
+        yield '{'
+        for index, (key, item) in enumerate(value.items()):
+            yield (', ' if index else '') + _key(key) + ': '
+            yield from iter_json(item)
+        yield '}'
+    elif isinstance(value, (list, tuple)):
+        yield '['
+        for index, item in enumerate(value):
+            if index:
+                yield ', '
+            yield from iter_json(item)
+        yield ']'
+    else:
+        yield _scalar(value)
+
+def dumps(value):
+    return ''.join(iter_json(value))
+
+def json_response(data, status=200):
+    """JsonResponse for data that may contain records."""
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
@@ -0,0 +1,134 @@
+"""
+Content-addressed cache of rendered PDF and CSV reports.
+
+A report is identified by a SHA-256 over its format, a version string for the
+template (or CSV layout) that produced it, the ENGINE_VERSION of the
+numbers in it and the calculation inputs. The
+bytes live under REPORT_CACHE_DIR and the least recently served files are
+evicted once the directory grows past REPORT_CACHE_MAX_BYTES. Repeat exports
+are answered straight from disk with ETag/Last-Modified headers, and
+conditional requests get a 304.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse
+from django.template import Context
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .engine import ENGINE_VERSION
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'csv': 'text/csv',
+}
+
+def cache_dir():
+    return Path(getattr(settings, 'REPORT_CACHE_DIR', settings.BASE_DIR / 'report_cache'))
+
+def max_bytes():
+    return getattr(settings, 'REPORT_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+
+@lru_cache(maxsize=None)
+def template_version(template_name):
+    """
+    Short hash of a template's source and those of the templates it extends,
+    so editing any of them invalidates its reports.
+    """
+    digest = hashlib.sha256()
+    name = template_name
+    while name:
+        template = get_template(name).template
+        digest.update(template.source.encode())
+        name = _parent_name(template)
+    return digest.hexdigest()[:16]
+
+def _parent_name(template):
+    """Name of the template a template extends, when it is a literal."""
+    for node in template.nodelist:
+        if isinstance(node, ExtendsNode):
+            return node.parent_name.resolve(Context())
+    return None
+
+def report_key(fmt, version, inputs):
+    """Cache key for a report of the given format, template version and inputs."""
+    payload = json.dumps([fmt, version, ENGINE_VERSION, inputs], sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _path(key, fmt):
+    return cache_dir() / key[:2] / f'{key}.{fmt}'
+
+def store(key, fmt, data):
+    """Write report bytes to the cache and evict old entries if over budget."""
+    path = _path(key, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    evict()
+    return path
+
+def evict():
+    """Delete the least recently served reports until the cache fits its budget."""
+    entries = []
+    total = 0
+    for path in cache_dir().glob('*/*.*'):
+        if path.suffix == '.tmp':
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_atime, stat.st_size, path))
+        total += stat.st_size
+
+    limit = max_bytes()
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+def cached_response(request, key, fmt, filename):
+    """
+    Serve a cached report, a 304 for a matching conditional request, or
+    None when the report is not cached yet.
+    """
+    path = _path(key, fmt)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    # Record the hit in atime for eviction order; mtime stays the render time
+    os.utime(path, (time.time(), stat.st_mtime))
+
+    etag = f'"{key}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(
+            open(path, 'rb'), content_type=CONTENT_TYPES[fmt], as_attachment=True, filename=filename
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+def store_response(request, key, fmt, data, filename):
+    """Cache freshly rendered report bytes and serve them."""
+    store(key, fmt, data)
+    response = cached_response(request, key, fmt, filename)
+    if response is None:
+        # Evicted straight away: the report alone is over the cache budget
+        response = FileResponse(
+            io.BytesIO(data), content_type=CONTENT_TYPES[fmt], as_attachment=True, filename=filename
+        )
+    return response
@@ -0,0 +1,201 @@
+"""
+Background PDF rendering.
+
+Views render their report HTML as before, then hand it to submit_pdf(), which
+stores a ReportJob and renders it with WeasyPrint in a pool of
+REPORT_WORKERS child processes, so CPU-bound rendering never holds the
+web process's GIL. The children only turn HTML into PDF bytes; the job
+rows are read and written by the web process. The request returns straight
+away with the job id; clients poll report_status and fetch report_download
+once the job is done. Browsers are redirected to the HTML status page
+instead, which refreshes itself until the download starts.
+
+Jobs still pending from before the process started (queued just before a
+restart) are requeued when it serves its first request. A job still pending
+or running REPORT_JOB_TIMEOUT seconds after it was last touched is failed
+rather than waited on, and finished jobs are deleted REPORT_JOB_MAX_AGE
+seconds after they finish; the PDF itself stays in core.report_cache.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from functools import partial
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+from django.http import HttpResponseRedirect, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from . import report_cache, timing
+from .export_backends import timed_write_pdf
+from .models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+# When this process started; older pending jobs were queued by its predecessor
+STARTED = timezone.now()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+IN_FLIGHT = [ReportJob.STATUS_PENDING, ReportJob.STATUS_RUNNING]
+FINISHED = [ReportJob.STATUS_DONE, ReportJob.STATUS_FAILED]
+
+TIMED_OUT = 'Rendering did not finish in time; please export the report again.'
+
+def _ago(setting, default):
+    return timezone.now() - timedelta(seconds=getattr(settings, setting, default))
+
+def expire_jobs():
+    """Fail in-flight jobs past REPORT_JOB_TIMEOUT and delete finished jobs past REPORT_JOB_MAX_AGE."""
+    ReportJob.objects.filter(
+        status__in=IN_FLIGHT, updated_at__lt=_ago('REPORT_JOB_TIMEOUT', 600)
+    ).update(status=ReportJob.STATUS_FAILED, error=TIMED_OUT, updated_at=timezone.now())
+    ReportJob.objects.filter(
+        status__in=FINISHED, updated_at__lt=_ago('REPORT_JOB_MAX_AGE', 24 * 60 * 60)
+    ).delete()
+
+def check_timeout(job):
+    """Fail a job that has been in flight for longer than REPORT_JOB_TIMEOUT."""
+    if job.status in IN_FLIGHT and job.updated_at < _ago('REPORT_JOB_TIMEOUT', 600):
+        updated = ReportJob.objects.filter(pk=job.pk, status=job.status).update(
+            status=ReportJob.STATUS_FAILED, error=TIMED_OUT, updated_at=timezone.now()
+        )
+        if updated:
+            job.status, job.error = ReportJob.STATUS_FAILED, TIMED_OUT
+    return job
+
+def _new_pool():
+    # Spawned rather than forked: the web process runs threads of its own
+    return ProcessPoolExecutor(
+        max_workers=getattr(settings, 'REPORT_WORKERS', 2),
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+def _submit(html):
+    """Render HTML in the process pool, started on first use and replaced if a child died."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _new_pool()
+        try:
+            return _executor.submit(timed_write_pdf, html)
+        except BrokenProcessPool:
+            _executor = _new_pool()
+            return _executor.submit(timed_write_pdf, html)
+
+def render_pdf(job_id):
+    """Claim a queued job and send its HTML to the process pool."""
+    updated = ReportJob.objects.filter(
+        pk=job_id, status=ReportJob.STATUS_PENDING
+    ).update(status=ReportJob.STATUS_RUNNING, updated_at=timezone.now())
+    if not updated:
+        return
+    html = ReportJob.objects.values_list('html', flat=True).get(pk=job_id)
+    try:
+        future = _submit(html)
+    except RuntimeError as e:
+        finish_pdf(job_id, error=e)
+        return
+    future.add_done_callback(partial(_rendered, job_id))
+
+def _rendered(job_id, future):
+    # Runs on the pool's management thread of the web process
+    try:
+        pdf, seconds = future.result()
+    except Exception as e:
+        finish_pdf(job_id, error=e)
+    else:
+        if timing.enabled():
+            timing.record('core.render_pdf', {'weasyprint': seconds, 'total': seconds})
+        finish_pdf(job_id, pdf=pdf)
+
+def finish_pdf(job_id, pdf=None, error=None):
+    """Store a rendered PDF, or the error that stopped it, on its job."""
+    close_old_connections()
+    try:
+        job = ReportJob.objects.defer('html').get(pk=job_id)
+        if error is None:
+            job.pdf = pdf
+            job.status = ReportJob.STATUS_DONE
+            if job.cache_key:
+                report_cache.store(job.cache_key, 'pdf', pdf)
+        else:
+            logger.error(f"Error rendering report {job_id}: {str(error)}")
+            job.status = ReportJob.STATUS_FAILED
+            job.error = str(error)
+        # The source is only kept for jobs that still need it
+        job.html = ''
+        job.save(update_fields=['html', 'pdf', 'status', 'error', 'updated_at'])
+    except ReportJob.DoesNotExist:
+        pass
+    finally:
+        close_old_connections()
+
+def requeue_jobs():
+    """Render again the jobs left pending by the process this one replaced."""
+    pending = list(ReportJob.objects.filter(
+        status=ReportJob.STATUS_PENDING, created_at__lt=STARTED
+    ).values_list('pk', flat=True))
+    for job_id in pending:
+        render_pdf(job_id)
+    return pending
+
+def _requeue_on_first_request(**kwargs):
+    request_started.disconnect(_requeue_on_first_request)
+    try:
+        requeue_jobs()
+    except Exception:
+        logger.exception('Could not requeue pending reports')
+
+def connect():
+    """Requeue pending jobs once this process serves its first request (called by CoreConfig.ready)."""
+    request_started.connect(_requeue_on_first_request)
+
+@timing.timed('pdf')
+def submit_pdf(html_string, filename, cache_key=''):
+    """
+    Queue an HTML document for PDF rendering and return its ReportJob.
+    A job already in flight for the same cache key is reused, unless it has
+    timed out.
+    """
+    expire_jobs()
+    if cache_key:
+        job = ReportJob.objects.filter(
+            cache_key=cache_key, status__in=IN_FLIGHT
+        ).defer('html', 'pdf').first()
+        if job is not None:
+            return job
+    job = ReportJob.objects.create(filename=filename, html=html_string, cache_key=cache_key)
+    transaction.on_commit(lambda: render_pdf(job.pk))
+    return job
+
+def job_payload(job):
+    """JSON description of a job, with the URLs to poll and download it."""
+    return {
+        'id': str(job.pk),
+        'status': job.status,
+        'filename': job.filename,
+        'error': job.error,
+        'status_url': reverse('core:report_status', args=[job.pk]),
+        'download_url': reverse('core:report_download', args=[job.pk])
+    }
+
+def wants_html(request):
+    """Whether the client is a browser following a link rather than an API client."""
+    return 'text/html' in request.headers.get('Accept', '')
+
+def accepted_response(job, request=None):
+    """
+    202 Accepted response pointing the client at the queued job, or for
+    browsers a redirect to the job's status page.
+    """
+    payload = job_payload(job)
+    if request is not None and wants_html(request):
+        return HttpResponseRedirect(payload['status_url'], status=303)
+    response = JsonResponse(payload, status=202)
+    response['Location'] = payload['status_url']
+    return response
@@ -0,0 +1,96 @@
+"""
+Persisted results of saved calculations.
+
+Detail pages used to rerun the whole EN 1991-1-4 pipeline from the stored
+inputs on every view. Results are now computed once, when the calculation
+is saved, and kept as JSON in CalculationResult together with the
+ENGINE_VERSION that produced them and the calculation's updated_at at the
+time. A detail view is a single indexed read; rows written by an older
+engine, for an older edit of the calculation, or before results were
+persisted are recomputed and stored again on first read. Rows of deleted
+calculations are removed by a post_delete receiver (connect()).
+"""
+from itertools import islice
+from django.apps import apps
+from django.db.models.signals import post_delete
+from .engine import ENGINE_VERSION
+from .models import CalculationResult
+from .timing import timed
+
+# Calculation models whose results are persisted here
+STORED_MODELS = ('monopitch.WindLoadCalculation', 'duopitch.WindLoadCalculation')
+
+def _lookup(instance):
+    return {'model': instance._meta.label_lower, 'object_id': instance.pk}
+
+def _version(instance):
+    """The edit of the calculation the results belong to."""
+    return getattr(instance, 'updated_at', None)
+
+@timed('save')
+def store_results(instance, compute):
+    """Compute the results of a saved calculation and persist them."""
+    data = compute(instance)
+    CalculationResult.objects.update_or_create(
+        **_lookup(instance),
+        defaults={'engine_version': ENGINE_VERSION, 'source_updated_at': _version(instance), 'data': data}
+    )
+    return data
+
+def bulk_store_results(instances, data):
+    """Persist precomputed results of newly created calculations in one query."""
+    CalculationResult.objects.bulk_create([
+        CalculationResult(
+            **_lookup(instance), engine_version=ENGINE_VERSION, source_updated_at=_version(instance), data=item
+        )
+        for instance, item in zip(instances, data)
+    ])
+
+def _current(row, instance):
+    return row is not None and row.engine_version == ENGINE_VERSION and row.source_updated_at == _version(instance)
+
+@timed('load')
+def load_results(instance, compute):
+    """Stored results of a calculation, recomputed if missing, stale or from an older edit."""
+    row = CalculationResult.objects.filter(**_lookup(instance)).only(
+        'engine_version', 'source_updated_at', 'data'
+    ).first()
+    if _current(row, instance):
+        return row.data
+    return store_results(instance, compute)
+
+def iter_results(instances, compute, batch_size=500):
+    """
+    (instance, results) for each calculation of an iterable, e.g. a history
+    export, with the stored results of every batch_size instances read in
+    one query. Instances loaded with .only() must include updated_at; the
+    rest of their fields are loaded only when results are recomputed.
+    """
+    instances = iter(instances)
+    while batch := list(islice(instances, batch_size)):
+        rows = {
+            row.object_id: row
+            for row in CalculationResult.objects.filter(
+                model=batch[0]._meta.label_lower, object_id__in=[instance.pk for instance in batch]
+            ).only('object_id', 'engine_version', 'source_updated_at', 'data')
+        }
+        for instance in batch:
+            row = rows.get(instance.pk)
+            if _current(row, instance):
+                yield instance, row.data
+                continue
+            deferred = instance.get_deferred_fields()
+            if deferred:
+                instance.refresh_from_db(fields=list(deferred))
+            yield instance, store_results(instance, compute)
+
+def discard_results(instance):
+    CalculationResult.objects.filter(**_lookup(instance)).delete()
+
+def _discard_deleted(sender, instance, **kwargs):
+    discard_results(instance)
+
+def connect():
+    """Drop stored results whenever a calculation is deleted, by any path (views, admin, querysets)."""
+    for label in STORED_MODELS:
+        post_delete.connect(_discard_deleted, sender=apps.get_model(label), dispatch_uid=f'core.results.{label}')
@@ -0,0 +1,167 @@
+"""
+Parametric sweeps over calculator inputs.
+
+A sweep takes a base case and one or more axes, each a list of values or an
+inclusive {"start", "stop", "step"} range over any form field, and evaluates
+the calculator at every point of the grid. The result is the design
+envelope: per zone, the largest positive and most negative net pressure and
+the swept inputs that produce them.
+
+Grid points are validated like the app's form, with each field value
+cleaned only once (the base once, each axis value once) and the form's
+cross-field clean() run per point. The whole grid is then evaluated in one
+column-wise NumPy pass: each app's
+net_pressure_columns(cases) returns the net pressure of every zone as an
+array with one row per point (core.engine.peak_velocity_pressures runs the
+q_p chain over columns), and the envelope is an argmax/argmin per zone.
+
+    POST <app>/api/sweep/
+    {"base": {...}, "axes": {"h_r": {"start": 2, "stop": 10, "step": 0.5},
+                             "terrain_category": ["0", "II", "IV"]}}
+"""
+import itertools
+import json
+import math
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from .api import error_response, max_cases
+
+def axis_values(spec):
+    """Values of one sweep axis: a list, or an inclusive start/stop/step range."""
+    if isinstance(spec, list):
+        values = spec
+    elif isinstance(spec, dict) and {'start', 'stop', 'step'} <= spec.keys():
+        start, stop, step = (float(spec[key]) for key in ('start', 'stop', 'step'))
+        if step <= 0 or stop < start:
+            raise ValueError('A range needs step > 0 and stop >= start.')
+        # Tolerate rounding in (stop - start) / step so stop itself is included
+        count = math.floor((stop - start) / step + 1e-9) + 1
+        values = [start + i * step for i in range(count)]
+    else:
+        raise ValueError('An axis is a list of values or {"start", "stop", "step"}.')
+    if not values:
+        raise ValueError('An axis needs at least one value.')
+    return values
+
+def _clean(field, value):
+    try:
+        return field.clean(value), None
+    except ValidationError as e:
+        return None, e.messages
+
+def clean_grid(form_class, base, axes):
+    """
+    Every combination of the axis values on top of the base case, cleaned
+    as core.api.clean_case() would clean each point. Returns (cleaned_cases,
+    errors); errors are keyed by grid index.
+    """
+    fields = form_class.base_fields
+    names = list(axes)
+    cleaned_base = {name: _clean(field, base.get(name)) for name, field in fields.items() if name not in axes}
+    cleaned_axes = [[(value, _clean(fields[name], value)) for value in axes[name]] for name in names]
+    form = form_class.__new__(form_class)
+    cleaned_cases = []
+    errors = []
+    for index, point in enumerate(itertools.product(*cleaned_axes)):
+        values = dict(cleaned_base, **{name: cleaned for name, (_, cleaned) in zip(names, point)})
+        form.cleaned_data = {name: values[name][0] for name in fields}
+        case_errors = {name: values[name][1] for name in fields if values[name][1] is not None}
+        if not case_errors:
+            try:
+                form.cleaned_data = form.clean()
+            except ValidationError as e:
+                case_errors['__all__'] = e.messages
+        if case_errors:
+            inputs = {name: value for name, (value, _) in zip(names, point)}
+            errors.append({'case': index, 'inputs': inputs, 'errors': case_errors})
+        cleaned_cases.append(form.cleaned_data)
+    return cleaned_cases, errors
+
+def envelope(zones, pressures, inputs):
+    """
+    Governing net pressures per zone from a (points, columns) array of net
+    pressures, where zones names the zone of each column (a zone may have
+    more than one) and inputs[i] are the swept inputs of point i.
+
+    The first point reaching an extreme wins ties, so the reported inputs are
+    the earliest in grid order.
+    """
+    pressures = np.asarray(pressures, dtype=np.float64)
+    result = {}
+    for zone in dict.fromkeys(zones):
+        columns = [index for index, name in enumerate(zones) if name == zone]
+        # Row-major: point by point, then the zone's columns in order
+        values = pressures[:, columns].ravel()
+        entry = {'max_positive': None, 'min_negative': None}
+        if values.size:
+            index = np.where(values > 0, values, -np.inf).argmax()
+            if values[index] > 0:
+                entry['max_positive'] = {'w_net': float(values[index]), 'inputs': inputs[index // len(columns)]}
+            index = np.where(values < 0, values, np.inf).argmin()
+            if values[index] < 0:
+                entry['min_negative'] = {'w_net': float(values[index]), 'inputs': inputs[index // len(columns)]}
+        result[zone] = entry
+    return result
+
+class SweptInputs:
+    """The swept inputs of each grid point, built only for the governing ones."""
+
+    def __init__(self, cleaned_cases, names):
+        self.cleaned_cases = cleaned_cases
+        self.names = names
+
+    def __getitem__(self, index):
+        return {name: self.cleaned_cases[index][name] for name in self.names}
+
+def sweep(form_class, pressure_columns, base, axes):
+    """
+    Validate every grid point like form_class, evaluate the grid with
+    pressure_columns(cleaned_cases) -> (zones, pressures) and reduce it to
+    the envelope. Returns (envelope, errors); errors are keyed by grid index.
+    """
+    cleaned_cases, errors = clean_grid(form_class, base, axes)
+    if errors:
+        return None, errors
+
+    zones, pressures = pressure_columns(cleaned_cases)
+    return envelope(zones, pressures, SweptInputs(cleaned_cases, list(axes))), []
+
+def sweep_view(form_class, pressure_columns):
+    """
+    JSON view sweeping a calculator: pressure_columns(cleaned_cases) returns
+    the zone of each column and a (cases, columns) array of net pressures.
+    """
+    @csrf_exempt
+    @require_POST
+    def view(request):
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return error_response('Request body is not valid JSON.')
+        if not isinstance(payload, dict):
+            return error_response('Expected {"base": {...}, "axes": {...}}.')
+
+        base = payload.get('base', {})
+        axes = payload.get('axes')
+        if not isinstance(base, dict) or not isinstance(axes, dict) or not axes:
+            return error_response('Expected {"base": {...}, "axes": {...}}.')
+        unknown = sorted(set(axes) - set(form_class.base_fields))
+        if unknown:
+            return error_response(f'Unknown fields: {", ".join(unknown)}.')
+        try:
+            axes = {name: axis_values(spec) for name, spec in axes.items()}
+        except (TypeError, ValueError) as e:
+            return error_response(str(e))
+
+        size = math.prod(len(values) for values in axes.values())
+        if size > max_cases():
+            return error_response(f'At most {max_cases()} grid points per request.', status=413)
+
+        zones, errors = sweep(form_class, pressure_columns, base, axes)
+        if errors:
+            return error_response('Invalid grid points.', errors=errors)
+        return JsonResponse({'cases': size, 'envelope': zones})
+    return view
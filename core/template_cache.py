@@ -0,0 +1,50 @@
+"""
+Startup compilation of the project's templates.
+
+settings.TEMPLATES wraps the filesystem and app directory loaders in the
+cached loader, which keeps every compiled template for the life of the
+process. ``warm_up`` compiles every project template when TEMPLATE_WARM_UP
+is enabled, so the first results page or PDF export after a deploy does not
+pay for parsing the heavy step-by-step templates. A template that fails to compile
+is logged and left out; requests for it raise the same error as before.
+"""
+import logging
+from pathlib import Path
+from django.apps import apps
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+def template_dirs(engine):
+    """The engine's DIRS and the templates directory of every project app."""
+    dirs = [Path(directory) for directory in engine.dirs]
+    for app_config in apps.get_app_configs():
+        if not app_config.name.startswith('django.'):
+            dirs.append(Path(app_config.path) / 'templates')
+    return dirs
+
+def template_names(engine):
+    """Names of every .html template in the project's template directories."""
+    names = []
+    for directory in template_dirs(engine):
+        for path in sorted(directory.rglob('*.html')):
+            name = path.relative_to(directory).as_posix()
+            if name not in names:
+                names.append(name)
+    return names
+
+def warm_up():
+    """Compile every project template into the cached loader; returns the names compiled."""
+    compiled = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except TemplateSyntaxError as e:
+                logger.info(f"Template {name} not precompiled: {str(e)}")
+            else:
+                compiled.append(name)
+    return compiled
@@ -0,0 +1,20 @@
+"""
+Third-party assets served from this site once vendored.
+
+    {% load assets %}
+    <link rel="stylesheet" href="{% vendor 'bootstrap/5.3.0/css/bootstrap.min.css' %}">
+
+Paths are keys of core.assets.VENDORED. The tag emits the hashed local
+static URL when ``manage.py build_assets`` has downloaded the file, and the
+CDN URL it comes from otherwise.
+"""
+from django import template
+from core.assets import VENDORED, vendor_url
+
+register = template.Library()
+
+@register.simple_tag
+def vendor(path):
+    if path not in VENDORED:
+        raise template.TemplateSyntaxError(f'{path!r} is not a vendored asset.')
+    return vendor_url(path)
@@ -0,0 +1,89 @@
+"""
+Process-wide caching of the static parts of the results templates.
+
+    {% load fragments %}
+    {% for step in explanation %}
+        {% fragment 'step-prose' forloop.counter step.title %}
+            ...markup that only depends on the step number and title...
+        {% endfragment %}
+        {{ step.values_latex|safe }}
+    {% endfor %}
+
+A fragment is rendered once per process for each combination of its
+vary-on values and served from memory afterwards. Keys also carry the
+template's name and a hash of its source taken when it is compiled, so an
+edited template never serves fragments cached from its old version. Only
+wrap markup that is fully determined by the vary-on values: explanation
+prose, formulas, references and figures, never the per-calculation numbers.
+"""
+import hashlib
+from django import template
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+register = template.Library()
+
+_fragments = {}
+
+def cache_size():
+    return getattr(settings, 'FRAGMENT_CACHE_SIZE', 2048)
+
+def cache_clear():
+    _fragments.clear()
+
+@receiver(setting_changed)
+def _setting_changed(**kwargs):
+    # Fragments may depend on settings, e.g. SERVER_MATHML
+    cache_clear()
+
+def source_version(origin):
+    """
+    Short hash of the source of the template being compiled. Templates built
+    from strings have no loader to read it from and get a version of their
+    own, so their fragments are only shared by that compiled template.
+    """
+    try:
+        source = origin.loader.get_contents(origin)
+    except (AttributeError, template.TemplateDoesNotExist):
+        return object()
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, prefix, vary_on):
+        self.nodelist = nodelist
+        self.prefix = prefix
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = (self.prefix, context.autoescape, *(var.resolve(context) for var in self.vary_on))
+        try:
+            value = _fragments.get(key)
+        except TypeError:
+            # An unhashable vary-on value; render without caching
+            return self.nodelist.render(context)
+        if value is None:
+            value = self.nodelist.render(context)
+            if len(_fragments) >= cache_size():
+                # Drop the oldest fragment
+                _fragments.pop(next(iter(_fragments)), None)
+            _fragments[key] = value
+        return value
+
+@register.tag('fragment')
+def do_fragment(parser, token):
+    """
+    Cache the enclosed markup per process, keyed by fragment name, template
+    version and the vary-on values:
+
+        {% fragment 'name' [var1 var2 ...] %} ... {% endfragment %}
+    """
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    name = bits[1].strip('\'"')
+    origin = parser.origin
+    prefix = (getattr(origin, 'template_name', None), name, source_version(origin))
+    return FragmentNode(nodelist, prefix, [parser.compile_filter(bit) for bit in bits[2:]])
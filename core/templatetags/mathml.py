@@ -0,0 +1,47 @@
+"""
+Server-side MathML for the results pages.
+
+    {% load mathml %}
+    {{ step.formula|mathml }}            text with \( \) / \[ \] LaTeX
+    {{ step.formula|mathml:'block' }}    one bare LaTeX expression
+    {% mathjax %}<script src="...mathjax..."></script>{% endmathjax %}
+
+With SERVER_MATHML on, the filter emits cached MathML (core.mathml) and the
+mathjax block is dropped, so a page is readable as soon as it arrives. With
+it off, the filter emits the LaTeX with its delimiters for MathJax to
+typeset in the browser, as the templates did before.
+"""
+from django import template
+from django.utils.html import conditional_escape, format_html
+from core import mathml as conversion
+
+register = template.Library()
+
+CLIENT_DELIMITERS = {'inline': ('\\(', '\\)'), 'block': ('\\[', '\\]')}
+
+@register.filter
+def mathml(value, display=None):
+    if value in (None, ''):
+        return ''
+    if display is not None and display not in CLIENT_DELIMITERS:
+        raise template.TemplateSyntaxError(f"mathml display must be 'inline' or 'block', not {display!r}.")
+    if conversion.server_side():
+        return conversion.render(value, display)
+    if display is None:
+        return conditional_escape(value)
+    opening, closing = CLIENT_DELIMITERS[display]
+    return format_html('{} {} {}', opening, value, closing)
+
+class MathJaxNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        return '' if conversion.server_side() else self.nodelist.render(context)
+
+@register.tag('mathjax')
+def do_mathjax(parser, token):
+    """Markup that loads MathJax, left out when formulas are rendered server-side."""
+    nodelist = parser.parse(('endmathjax',))
+    parser.delete_first_token()
+    return MathJaxNode(nodelist)
@@ -0,0 +1,1027 @@
+import array
+import json
+import math
+import os
+import pickle
+import random
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template, engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from latex2mathml import converter
+from benchmarks import corpora, startup
+from benchmarks.measure import Measurement, percentile
+from benchmarks.runner import regressions
+from benchmarks.suites import cleaned_corpus, endpoint
+from django.http import Http404
+from django.utils import timezone
+from duopitch.calculations import (
+    calculate_wind_loads as duopitch_wind_loads, net_pressure_columns as duopitch_pressure_columns
+)
+from duopitch.forms import WindLoadCalculationForm as DuopitchForm
+from duopitch.models import WindLoadCalculation as DuopitchCalculation
+from calculator import formulas as calculator_formulas
+from duopitch import formulas as duopitch_formulas
+from flatroof import formulas as flatroof_formulas
+from monopitch import formulas as monopitch_formulas
+from Wind_load_analysis_on_hipped_roof import formulas as hipped_formulas
+from Wind_load_analysis_on_hipped_roof.models import WindLoadCalculation as HippedCalculation
+from calculator.forms import WindPressureForm
+from calculator.services import WindLoadCalculator
+from flatroof.calculations import (
+    ZoneResult as FlatZoneResult, calculate_wind_loads as flatroof_wind_loads,
+    net_pressure_columns as flatroof_pressure_columns
+)
+from monopitch.calculations import (
+    ZoneResult as MonopitchZoneResult, calculate_wind_loads as monopitch_wind_loads,
+    net_pressure_columns as monopitch_pressure_columns
+)
+from monopitch.forms import WindLoadInputForm as MonopitchForm
+from monopitch.models import WindLoadCalculation as MonopitchCalculation
+from monopitch.views import detail_results as monopitch_detail_results
+from . import assets, mathml, profiles, records, report_cache, reports, template_cache, timing, writebehind
+from .pagination import keyset_page
+from .records import RecordTable, tabulate
+from .results import load_results, store_results
+from .sweep import axis_values, envelope
+from .templatetags import fragments
+from .api import clean_case
+from .models import CalculationResult, ReportJob
+from .reports import accepted_response, expire_jobs, render_pdf, requeue_jobs, submit_pdf
+from .views import POLL_INTERVAL
+from .engine import (
+    ENGINE_VERSION, TERRAIN_CATEGORIES, basic_velocity_pressure, cache_clear, cache_info,
+    exact_peak_velocity_pressure, exposure_factor, peak_velocity_pressure, peak_velocity_pressures
+)
+
+
+class PeakVelocityPressureTests(SimpleTestCase):
+    """The engine reproduces the inline pipelines it replaced bit for bit."""
+
+    def reference(self, terrain_category, z, v_b, rho, c_0=1.0, k_i=1.0):
+        terrain_params = {'0': (0.003, 1), 'I': (0.01, 1), 'II': (0.05, 2), 'III': (0.3, 5), 'IV': (1.0, 10)}
+        z_0, z_min = terrain_params[terrain_category]
+        k_r = 0.19 * (z_0 / 0.05) ** 0.07
+        c_r = k_r * math.log(z / z_0) if z >= z_min else k_r * math.log(z_min / z_0)
+        v_m = c_r * c_0 * v_b
+        I_v = k_i / (c_0 * math.log(z / z_0)) if z >= z_min else k_i / (c_0 * math.log(z_min / z_0))
+        q_p = (1 + 7 * I_v) * 0.5 * rho * v_m ** 2 / 1000
+        return z_0, z_min, k_r, c_r, v_m, I_v, q_p
+
+    def test_matches_reference_pipeline(self):
+        for terrain_category in TERRAIN_CATEGORIES:
+            for z in (0.5, 1, 3.7, 6.1, 12.0, 48.25, 150):
+                for v_b, rho, c_0 in ((22.0, 1.25, 1.0), (27.0, 1.2, 1.15), (38.5, 1.06, 0.9)):
+                    with self.subTest(terrain=terrain_category, z=z, v_b=v_b, c_0=c_0):
+                        self.assertEqual(
+                            tuple(peak_velocity_pressure(terrain_category, z, v_b, rho, c_0=c_0)),
+                            self.reference(terrain_category, z, v_b, rho, c_0=c_0)
+                        )
+
+    def test_exposure_factor_is_ratio_of_pressures(self):
+        z_0, z_min, k_r = TERRAIN_CATEGORIES['III']
+        q_b = basic_velocity_pressure(22.0, 1.25)
+        q_p = peak_velocity_pressure('III', 12.0, 22.0, 1.25).q_p
+        self.assertAlmostEqual(exposure_factor(12.0, z_0, z_min, k_r), q_p / q_b, places=12)
+
+    def test_below_minimum_height_uses_z_min(self):
+        self.assertEqual(
+            peak_velocity_pressure('IV', 3.0, 22.0, 1.25),
+            peak_velocity_pressure('IV', 10.0, 22.0, 1.25)
+        )
+
+
+class EngineCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache_clear()
+
+    def tearDown(self):
+        cache_clear()
+
+    def test_repeated_inputs_hit_cache(self):
+        first = peak_velocity_pressure('II', 6.1, 22.0, 1.25)
+        second = peak_velocity_pressure('II', 6.1, 22.0, 1.25)
+        peak_velocity_pressure('III', 6.1, 22.0, 1.25)
+
+        self.assertIs(first, second)
+        stats = cache_info()['peak_velocity_pressure']
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+
+    def test_cache_clear_resets_counters(self):
+        z_0, z_min, k_r = TERRAIN_CATEGORIES['I']
+        exposure_factor(10.0, z_0, z_min, k_r)
+        exposure_factor(10.0, z_0, z_min, k_r)
+        cache_clear()
+        self.assertEqual(cache_info()['exposure_factor']['hits'], 0)
+        self.assertEqual(cache_info()['exposure_factor']['currsize'], 0)
+
+
+class ExposureProfileTests(SimpleTestCase):
+    def test_interpolation_within_error_bound(self):
+        for category, v_b, rho, c_0, worst, bound in profiles.verify(samples=2000):
+            with self.subTest(terrain=category, c_0=c_0):
+                self.assertLessEqual(worst, bound)
+
+    def test_below_minimum_height_uses_z_min(self):
+        exact = peak_velocity_pressure('III', 5.0, 22.0, 1.25).q_p
+        self.assertAlmostEqual(profiles.peak_velocity_pressure('III', 1.0, 22.0, 1.25), exact, places=12)
+
+    def test_above_table_falls_back_to_exact(self):
+        exact = peak_velocity_pressure('II', 350.0, 22.0, 1.25).q_p
+        self.assertEqual(profiles.peak_velocity_pressure('II', 350.0, 22.0, 1.25), exact)
+
+
+class ExposureTablesSettingTests(SimpleTestCase):
+    heights = [0.5, 1.0, 2.0, 7.3, 12.5, 48.9, 150.0, 199.99, 350.0]
+
+    def test_exact_by_default(self):
+        for category in TERRAIN_CATEGORIES:
+            for z in self.heights:
+                exact = exact_peak_velocity_pressure(category, z, 27.0, 1.25, 1.1)
+                self.assertEqual(peak_velocity_pressure(category, z, 27.0, 1.25, 1.1), exact)
+                columns = peak_velocity_pressures(category, [z], 27.0, 1.25, 1.1)
+                self.assertEqual(columns.q_p[0], exact.q_p)
+
+    @override_settings(EXPOSURE_TABLES=True)
+    def test_tables_within_error_bound(self):
+        cases = [(category, z) for category in TERRAIN_CATEGORIES for z in self.heights]
+        columns = peak_velocity_pressures(*zip(*cases), 27.0, 1.25, 1.1)
+        for i, (category, z) in enumerate(cases):
+            with self.subTest(terrain=category, z=z):
+                exact = exact_peak_velocity_pressure(category, z, 27.0, 1.25, 1.1)
+                result = peak_velocity_pressure(category, z, 27.0, 1.25, 1.1)
+                bound = profiles.error_bound(category, 27.0, 1.25, 1.1)
+                self.assertLessEqual(abs(result.q_p - exact.q_p), bound)
+                self.assertEqual(result.c_r, exact.c_r)
+                self.assertEqual(columns.q_p[i], result.q_p)
+
+    @override_settings(EXPOSURE_TABLES=True)
+    def test_tables_above_range_are_exact(self):
+        exact = exact_peak_velocity_pressure('II', 350.0, 22.0, 1.25).q_p
+        self.assertEqual(peak_velocity_pressure('II', 350.0, 22.0, 1.25).q_p, exact)
+        self.assertEqual(peak_velocity_pressures('II', [350.0], 22.0, 1.25).q_p[0], exact)
+
+    def test_toggling_clears_cache(self):
+        exact = peak_velocity_pressure('III', 12.5, 27.0, 1.25, 1.1).q_p
+        with self.settings(EXPOSURE_TABLES=True):
+            self.assertNotEqual(peak_velocity_pressure('III', 12.5, 27.0, 1.25, 1.1).q_p, exact)
+        self.assertEqual(peak_velocity_pressure('III', 12.5, 27.0, 1.25, 1.1).q_p, exact)
+
+
+class ReportJobTests(TestCase):
+    def test_submit_queues_job_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = submit_pdf('<p>Report</p>', 'report.pdf')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(job.status, ReportJob.STATUS_PENDING)
+
+    def test_status_and_download_while_pending(self):
+        job = ReportJob.objects.create(filename='report.pdf', html='<p>Report</p>')
+        response = self.client.get(reverse('core:report_status', args=[job.pk]))
+        self.assertEqual(response.json()['status'], ReportJob.STATUS_PENDING)
+
+        response = self.client.get(reverse('core:report_download', args=[job.pk]))
+        self.assertEqual(response.status_code, 202)
+
+    def test_download_finished_job(self):
+        job = ReportJob.objects.create(
+            filename='report.pdf', html='<p>Report</p>', pdf=b'%PDF-1.7', status=ReportJob.STATUS_DONE
+        )
+        response = self.client.get(reverse('core:report_download', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'%PDF-1.7')
+
+    def test_browsers_are_sent_to_the_status_page(self):
+        job = ReportJob.objects.create(filename='report.pdf', html='<p>Report</p>')
+        status_url = reverse('core:report_status', args=[job.pk])
+        response = accepted_response(job, RequestFactory().get('/', HTTP_ACCEPT='text/html'))
+        self.assertEqual((response.status_code, response['Location']), (303, status_url))
+
+        response = self.client.get(status_url, HTTP_ACCEPT='text/html,*/*;q=0.8')
+        self.assertContains(response, f'<meta http-equiv="refresh" content="{POLL_INTERVAL}">')
+
+        ReportJob.objects.filter(pk=job.pk).update(status=ReportJob.STATUS_DONE, pdf=b'%PDF-1.7')
+        response = self.client.get(status_url, HTTP_ACCEPT='text/html')
+        download_url = reverse('core:report_download', args=[job.pk])
+        self.assertContains(response, f'content="0; url={download_url}"')
+
+    def test_timed_out_jobs_fail_and_are_not_reused(self):
+        job = ReportJob.objects.create(filename='report.pdf', html='<p>Report</p>', cache_key='k' * 64)
+        ReportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timezone.timedelta(hours=1))
+
+        response = self.client.get(reverse('core:report_status', args=[job.pk]))
+        self.assertEqual(response.json()['status'], ReportJob.STATUS_FAILED)
+
+        with self.captureOnCommitCallbacks():
+            fresh = submit_pdf('<p>Report</p>', 'report.pdf', cache_key='k' * 64)
+        self.assertNotEqual(fresh.pk, job.pk)
+
+    def render(self, job, result):
+        future = Future()
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+        # The callback runs on the pool's thread, which has its own connection
+        with mock.patch('core.reports._submit', return_value=future) as submit, \
+                mock.patch('core.reports.close_old_connections'):
+            render_pdf(job.pk)
+        submit.assert_called_once_with('<p>Report</p>')
+        job.refresh_from_db()
+        return job
+
+    def test_rendered_pdf_is_stored_on_the_job(self):
+        job = ReportJob.objects.create(filename='report.pdf', html='<p>Report</p>')
+        job = self.render(job, (b'%PDF-1.7', 0.5))
+        self.assertEqual((job.status, bytes(job.pdf), job.html), (ReportJob.STATUS_DONE, b'%PDF-1.7', ''))
+
+    def test_rendering_errors_fail_the_job(self):
+        job = ReportJob.objects.create(filename='report.pdf', html='<p>Report</p>')
+        job = self.render(job, OSError('cannot load library'))
+        self.assertEqual((job.status, job.error), (ReportJob.STATUS_FAILED, 'cannot load library'))
+
+    def test_renders_in_a_separate_process(self):
+        future = reports._submit('<p>Report</p>')
+        self.assertIsInstance(reports._executor, ProcessPoolExecutor)
+        # Finishes whether or not WeasyPrint can load here
+        future.exception(timeout=60)
+
+    def test_pending_jobs_from_before_startup_are_requeued(self):
+        before = reports.STARTED - timezone.timedelta(hours=1)
+        job = ReportJob.objects.create(filename='report.pdf', html='<p>Report</p>')
+        ReportJob.objects.filter(pk=job.pk).update(created_at=before, updated_at=before)
+        ReportJob.objects.create(filename='new.pdf', html='<p>Report</p>')
+        with mock.patch('core.reports.render_pdf') as render:
+            self.assertEqual(requeue_jobs(), [job.pk])
+        render.assert_called_once_with(job.pk)
+
+    @override_settings(REPORT_JOB_MAX_AGE=60)
+    def test_finished_jobs_expire(self):
+        old = ReportJob.objects.create(filename='old.pdf', html='', pdf=b'%PDF', status=ReportJob.STATUS_DONE)
+        ReportJob.objects.filter(pk=old.pk).update(updated_at=timezone.now() - timezone.timedelta(minutes=5))
+        recent = ReportJob.objects.create(filename='new.pdf', html='', pdf=b'%PDF', status=ReportJob.STATUS_DONE)
+        expire_jobs()
+        self.assertEqual(list(ReportJob.objects.values_list('pk', flat=True)), [recent.pk])
+
+
+class ReportCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = override_settings(REPORT_CACHE_DIR=tmp.name, REPORT_CACHE_MAX_BYTES=1024)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.factory = RequestFactory()
+
+    def test_key_depends_on_inputs_version_and_format(self):
+        key = report_cache.report_key('csv', 'v1', {'h': 10, 'b': 5})
+        self.assertEqual(key, report_cache.report_key('csv', 'v1', {'b': 5, 'h': 10}))
+        self.assertNotEqual(key, report_cache.report_key('csv', 'v2', {'h': 10, 'b': 5}))
+        self.assertNotEqual(key, report_cache.report_key('pdf', 'v1', {'h': 10, 'b': 5}))
+        self.assertNotEqual(key, report_cache.report_key('csv', 'v1', {'h': 11, 'b': 5}))
+
+    def test_key_depends_on_engine_version(self):
+        key = report_cache.report_key('csv', 'v1', {'h': 10})
+        with mock.patch('core.report_cache.ENGINE_VERSION', 'next'):
+            self.assertNotEqual(key, report_cache.report_key('csv', 'v1', {'h': 10}))
+
+    def test_store_and_serve_with_validators(self):
+        key = report_cache.report_key('csv', 'v1', {'h': 10})
+        request = self.factory.get('/')
+        self.assertIsNone(report_cache.cached_response(request, key, 'csv', 'report.csv'))
+
+        response = report_cache.store_response(request, key, 'csv', b'a,b\n', 'report.csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'a,b\n')
+        self.assertEqual(response['ETag'], f'"{key}"')
+        self.assertIn('Last-Modified', response)
+        response.close()
+
+        request = self.factory.get('/', HTTP_IF_NONE_MATCH=f'"{key}"')
+        response = report_cache.cached_response(request, key, 'csv', 'report.csv')
+        self.assertEqual(response.status_code, 304)
+
+    def test_evicts_least_recently_served(self):
+        keys = [report_cache.report_key('pdf', 'v1', i) for i in range(3)]
+        for age, key in enumerate(keys):
+            path = report_cache.store(key, 'pdf', b'x' * 400)
+            os.utime(path, (1000 + age, 1000 + age))
+        # Three 400-byte reports exceed the 1 KiB budget: the oldest goes
+        self.assertFalse(os.path.exists(report_cache._path(keys[0], 'pdf')))
+        self.assertTrue(os.path.exists(report_cache._path(keys[1], 'pdf')))
+        self.assertTrue(os.path.exists(report_cache._path(keys[2], 'pdf')))
+
+
+class RepeatExportTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = override_settings(REPORT_CACHE_DIR=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def assert_every_export_saved(self, url, data, model, app):
+        first = self.client.post(url + '?format=csv', data)
+        self.assertEqual(first.status_code, 200)
+        with mock.patch(f'{app}.views.store_response') as store:
+            repeat = self.client.post(url + '?format=csv', data)
+        # The repeat is served from the report cache but still recorded
+        store.assert_not_called()
+        self.assertEqual(b''.join(repeat.streaming_content), b''.join(first.streaming_content))
+        self.assertEqual(model.objects.count(), 2)
+
+    def test_monopitch_repeat_export_is_saved(self):
+        self.assert_every_export_saved(
+            reverse('monopitch:monopitch_calculate'), corpora.BASE_CASES['monopitch'], MonopitchCalculation,
+            'monopitch'
+        )
+
+    def test_hipped_repeat_export_is_saved(self):
+        self.assert_every_export_saved(
+            reverse('wind_load_analysis_on_hipped_roof'), corpora.BASE_CASES['hipped'], HippedCalculation,
+            'Wind_load_analysis_on_hipped_roof'
+        )
+
+
+class MathMLCacheTests(SimpleTestCase):
+    def setUp(self):
+        mathml.cache_clear()
+        self.addCleanup(mathml.cache_clear)
+
+    def test_matches_converter_and_converts_once(self):
+        latex = monopitch_formulas.NET_WIND_PRESSURE
+        self.assertEqual(mathml.to_mathml(latex), converter.convert(latex))
+        mathml.to_mathml(latex)
+        info = mathml.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_warm_up_converts_every_app_formula(self):
+        formulas = mathml.known_formulas()
+        for module in (monopitch_formulas, duopitch_formulas, flatroof_formulas, hipped_formulas, calculator_formulas):
+            self.assertTrue(set(module.FORMULAS) <= set(formulas), module.__name__)
+        mathml.warm_up()
+        self.assertEqual(mathml.cache_info().currsize, len(set(formulas)))
+
+        # The duopitch and flat roof steps render {{ step.formula|mathml }} from the warmed entries
+        misses = mathml.cache_info().misses
+        for latex in duopitch_formulas.FORMULAS + flatroof_formulas.FORMULAS:
+            mathml.render(latex)
+        self.assertEqual(mathml.cache_info().misses, misses)
+
+    @override_settings(MATHML_WARM_UP=True)
+    def test_first_render_warms_up(self):
+        with mock.patch.object(mathml, '_warmed', False):
+            mathml.render('\\( x_1 \\)')
+            self.assertEqual(mathml.cache_info().currsize, len(set(mathml.known_formulas())) + 1)
+            mathml.render('\\( x_2 \\)')
+            self.assertEqual(mathml.cache_info().currsize, len(set(mathml.known_formulas())) + 2)
+
+    @override_settings(MATHML_WARM_UP=False)
+    def test_no_warm_up_when_disabled(self):
+        with mock.patch.object(mathml, '_warmed', False):
+            mathml.render('\\( x_1 \\)')
+            self.assertEqual(mathml.cache_info().currsize, 1)
+
+    def test_render_converts_delimited_math_and_escapes_text(self):
+        html = mathml.render('a < b: \\( x_1 \\) then \\[ y \\]')
+        self.assertEqual(html, 'a &lt; b: ' + converter.convert('x_1') + ' then ' + converter.convert('y', display='block'))
+        self.assertEqual(mathml.render(' y ', 'block'), converter.convert('y', display='block'))
+
+    def test_template_filter_and_mathjax_block(self):
+        source = "{% load mathml %}{{ f|mathml }}|{{ g|mathml:'inline' }}|{% mathjax %}<script>{% endmathjax %}"
+        context = {'f': '\\( a < b \\)', 'g': 'c_1'}
+        with override_settings(SERVER_MATHML=False):
+            self.assertEqual(Template(source).render(Context(context)), '\\( a &lt; b \\)|\\( c_1 \\)|<script>')
+        with override_settings(SERVER_MATHML=True):
+            self.assertEqual(
+                Template(source).render(Context(context)),
+                converter.convert('a < b') + '|' + converter.convert('c_1') + '|'
+            )
+
+class WarmPdfFormulaTests(TestCase):
+    def setUp(self):
+        mathml.cache_clear()
+        self.addCleanup(mathml.cache_clear)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = override_settings(REPORT_CACHE_DIR=tmp.name, SERVER_MATHML=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_pdf_export_formulas_hit_the_warm_up(self):
+        mathml.warm_up()
+        before = mathml.cache_info()
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(
+                reverse('monopitch:monopitch_calculate') + '?format=pdf', corpora.BASE_CASES['monopitch']
+            )
+        self.assertEqual(response.status_code, 202)
+        info = mathml.cache_info()
+        self.assertEqual(info.misses, before.misses)
+        self.assertEqual(info.hits - before.hits, len(monopitch_formulas.FORMULAS))
+
+
+class ServerMathMLPageTests(TestCase):
+    def render(self):
+        response = self.client.post(reverse('monopitch:monopitch_calculate'), corpora.BASE_CASES['monopitch'])
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    @override_settings(SERVER_MATHML=True)
+    def test_results_page_ships_mathml(self):
+        html = self.render()
+        self.assertIn('<math', html)
+        self.assertNotIn('\\(', html)
+        self.assertNotIn('MathJax-script', html)
+
+    @override_settings(SERVER_MATHML=False)
+    def test_results_page_ships_latex_for_mathjax(self):
+        html = self.render()
+        self.assertNotIn('<math', html)
+        self.assertIn('\\( V_b = ', html)
+        self.assertIn('MathJax-script', html)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(7):
+            MonopitchCalculation.objects.create(calculation_name=f'Calc {i}')
+        # Two rows share a timestamp so the id tie-breaker is exercised
+        now = timezone.now()
+        MonopitchCalculation.objects.update(created_at=now)
+        MonopitchCalculation.objects.filter(calculation_name__in=['Calc 0', 'Calc 1']).update(
+            created_at=now - timezone.timedelta(hours=1)
+        )
+        cls.expected = list(MonopitchCalculation.objects.order_by('-created_at', '-id'))
+
+    def test_walks_forward_and_back_without_gaps(self):
+        queryset = MonopitchCalculation.objects.all()
+        pages = [keyset_page(queryset, page_size=3)]
+        while pages[-1].next_cursor:
+            pages.append(keyset_page(queryset, pages[-1].next_cursor, page_size=3))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([obj for page in pages for obj in page], self.expected)
+        self.assertIsNone(pages[0].previous_cursor)
+
+        back = keyset_page(queryset, pages[-1].previous_cursor, page_size=3)
+        self.assertEqual(back.object_list, pages[1].object_list)
+        self.assertEqual(back.next_cursor, pages[1].next_cursor)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(Http404):
+            keyset_page(MonopitchCalculation.objects.all(), 'not-a-cursor')
+
+    def test_list_view(self):
+        response = self.client.get(reverse('monopitch:wind_load_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Calc 6')
+
+
+class CalculationResultTests(TestCase):
+    def setUp(self):
+        self.calculation = MonopitchCalculation.objects.create()
+        self.calls = 0
+
+    def compute(self, calculation):
+        self.calls += 1
+        return {'q_p': 0.5 * self.calls}
+
+    def test_reads_stored_results(self):
+        store_results(self.calculation, self.compute)
+        self.assertEqual(load_results(self.calculation, self.compute), {'q_p': 0.5})
+        self.assertEqual(self.calls, 1)
+
+    def test_recomputes_missing_and_stale_results(self):
+        self.assertEqual(load_results(self.calculation, self.compute), {'q_p': 0.5})
+        CalculationResult.objects.update(engine_version=0)
+        self.assertEqual(load_results(self.calculation, self.compute), {'q_p': 1.0})
+        self.assertEqual(CalculationResult.objects.get().engine_version, ENGINE_VERSION)
+
+    def test_editing_the_calculation_recomputes(self):
+        calculation = MonopitchForm(data=corpora.BASE_CASES['monopitch']).save()
+        store_results(calculation, monopitch_detail_results)
+        calculation.vb0 *= 2
+        calculation.save()
+        q_b = load_results(MonopitchCalculation.objects.get(pk=calculation.pk), monopitch_detail_results)['explanation'][1]['result']
+        self.assertAlmostEqual(q_b, 0.5 * calculation.rho * (calculation.c_direction * calculation.c_season * calculation.vb0) ** 2 / 1000)
+
+    def test_deleting_the_calculation_discards_results(self):
+        store_results(self.calculation, self.compute)
+        MonopitchCalculation.objects.filter(pk=self.calculation.pk).delete()
+        self.assertFalse(CalculationResult.objects.exists())
+
+
+def initial_case(form_class):
+    return {name: field.initial for name, field in form_class.base_fields.items()}
+
+class BatchApiTests(TestCase):
+    def post(self, url, payload):
+        return self.client.post(url, json.dumps(payload), content_type='application/json')
+
+    def test_wall_batch_matches_scalar_calculator(self):
+        cases = [dict(initial_case(WindPressureForm), height=height) for height in (5.0, 19.871, 40.0)]
+        response = self.post(reverse('wall_api_calculate'), {'cases': cases})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), len(cases))
+        for case, result in zip(cases, results):
+            data = dict(case, terrain_category=int(case['terrain_category']))
+            expected = WindLoadCalculator(data).calculate()
+            self.assertEqual(result['zones'], [zone.as_dict() for zone in expected])
+
+    def test_invalid_cases_reject_the_batch(self):
+        valid = initial_case(MonopitchForm)
+        response = self.post(reverse('monopitch:api_calculate'), {
+            'cases': [valid, dict(valid, vb0='fast'), dict(valid, h_e=150, h_r=60)]
+        })
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['case'] for error in errors], [1, 2])
+        self.assertIn('vb0', errors[0]['errors'])
+        self.assertIn('__all__', errors[1]['errors'])
+
+    def test_malformed_requests(self):
+        url = reverse('flatroof_api_calculate')
+        self.assertEqual(self.client.post(url, 'nope', content_type='application/json').status_code, 400)
+        self.assertEqual(self.post(url, {'cases': 'nope'}).status_code, 400)
+        self.assertEqual(self.post(url, {'cases': [], 'save': True}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    def test_saves_only_when_asked(self):
+        url = reverse('monopitch:api_calculate')
+        cases = [initial_case(MonopitchForm)] * 3
+        response = self.post(url, {'cases': cases})
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertFalse(MonopitchCalculation.objects.exists())
+
+        response = self.post(url, {'cases': cases, 'save': True})
+        ids = [result['id'] for result in response.json()['results']]
+        self.assertEqual(sorted(ids), sorted(MonopitchCalculation.objects.values_list('pk', flat=True)))
+        self.assertEqual(CalculationResult.objects.count(), 3)
+        # Stored current: the detail page does not recompute them
+        compute = mock.Mock()
+        for calculation in MonopitchCalculation.objects.all():
+            load_results(calculation, compute)
+        compute.assert_not_called()
+
+    def test_save_costs_the_same_queries_for_any_batch_size(self):
+        url = reverse('duopitch:api_calculate')
+        counts = []
+        for size in (1, 10):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(url, {'cases': [initial_case(DuopitchForm)] * size, 'save': True})
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(CalculationResult.objects.count(), 11)
+
+
+class SweepTests(TestCase):
+    def test_axis_values(self):
+        self.assertEqual(axis_values(['0', 'II']), ['0', 'II'])
+        self.assertEqual(axis_values({'start': 0.1, 'stop': 0.3, 'step': 0.1}), [0.1, 0.2, 0.30000000000000004])
+        with self.assertRaises(ValueError):
+            axis_values({'start': 2, 'stop': 1, 'step': 1})
+
+    def test_envelope_keeps_governing_inputs(self):
+        # Columns F, G and a second G column, for points h_r = 1, 2, 3
+        zones = envelope(('F', 'G', 'G'), [
+            [-1.0, 0.5, -0.2],
+            [-3.0, 0.2, 0.5],
+            [-3.0, -0.1, -0.2],
+        ], [{'h_r': 1}, {'h_r': 2}, {'h_r': 3}])
+        self.assertEqual(zones['F']['min_negative'], {'w_net': -3.0, 'inputs': {'h_r': 2}})
+        self.assertIsNone(zones['F']['max_positive'])
+        self.assertEqual(zones['G']['max_positive'], {'w_net': 0.5, 'inputs': {'h_r': 1}})
+        self.assertEqual(zones['G']['min_negative'], {'w_net': -0.2, 'inputs': {'h_r': 1}})
+
+    def test_pressure_columns_match_each_case(self):
+        def flatroof_pressures(case):
+            for result in flatroof_wind_loads(case)['results']:
+                yield result.zone, result.w_net_neg
+                if result.w_net_pos is not None:
+                    yield result.zone, result.w_net_pos
+
+        def duopitch_pressures(case):
+            results_0, results_90 = duopitch_wind_loads(DuopitchCalculation(**case))[:2]
+            for theta, results in ((0, results_0), (90, results_90)):
+                for result in results:
+                    yield f'{result.zone} (θ={theta}°)', result.w_e
+
+        def monopitch_pressures(case):
+            return [(result.zone, result.w_e) for result in monopitch_wind_loads(case)['results']]
+
+        calculators = [
+            ('monopitch', monopitch_pressure_columns, monopitch_pressures, {'h_r': (0.5, 8.0)}),
+            ('flatroof', flatroof_pressure_columns, flatroof_pressures, {}),
+            ('duopitch', duopitch_pressure_columns, duopitch_pressures,
+             {'ridge_height': (0.5, 20.0), 'building_width': (1.0, 40.0)}),
+        ]
+        generator = random.Random(13)
+        for calculator, columns, scalar, varied in calculators:
+            # Wide geometry so every C_pe branch (A <= 1, 1 < A < 10, A >= 10) is taken
+            cases = [
+                dict(case, **{name: generator.uniform(*bounds) for name, bounds in varied.items()})
+                for case in cleaned_corpus(calculator)[:50]
+            ]
+            zones, pressures = columns(cases)
+            for case, row in zip(cases, pressures.tolist()):
+                expected = list(scalar(case))
+                self.assertEqual(zones, tuple(zone for zone, _ in expected))
+                # Bit-identical, not just close
+                self.assertEqual(row, [w_net for _, w_net in expected], calculator)
+
+    def test_monopitch_sweep_matches_each_case(self):
+        base = initial_case(MonopitchForm)
+        axes = {'h_r': {'start': 1, 'stop': 10, 'step': 0.5}, 'terrain_category': ['0', 'II', 'IV']}
+        response = self.client.post(
+            reverse('monopitch:api_sweep'), json.dumps({'base': base, 'axes': axes}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cases'], 19 * 3)
+
+        worst = {}
+        for h_r in axis_values(axes['h_r']):
+            for terrain_category in axes['terrain_category']:
+                case = dict(base, h_r=h_r, terrain_category=terrain_category)
+                for result in monopitch_wind_loads(case)['results']:
+                    if result['w_e'] < worst.get(result['zone'], (0,))[0]:
+                        worst[result['zone']] = (result['w_e'], {'h_r': h_r, 'terrain_category': terrain_category})
+        for zone, (w_net, inputs) in worst.items():
+            self.assertEqual(response.json()['envelope'][zone]['min_negative'], {'w_net': w_net, 'inputs': inputs})
+
+    def test_rejects_unknown_fields_and_invalid_points(self):
+        url = reverse('flatroof_api_sweep')
+        response = self.client.post(url, json.dumps({'axes': {'colour': ['red']}}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, json.dumps({'axes': {'building_height': [-1]}}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['inputs'], {'building_height': -1})
+
+class RunWindBatchTests(SimpleTestCase):
+    def test_results_in_input_order_with_invalid_rows(self):
+        base = initial_case(MonopitchForm)
+        cases = [dict(base, h_r=1 + i) for i in range(7)]
+        cases[3]['vb0'] = 'gale'
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'cases.jsonl')
+            target = os.path.join(tmp, 'results.jsonl')
+            with open(source, 'w') as f:
+                f.writelines(json.dumps(case) + '\n' for case in cases)
+            call_command('run_wind_batch', 'monopitch', source, output=target, workers=2, chunk_size=2, stderr=open(os.devnull, 'w'))
+            with open(target) as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual([line['case'] for line in lines], list(range(7)))
+        self.assertIn('vb0', lines[3]['errors'])
+        expected = json.loads(records.dumps(monopitch_wind_loads(cases[5])))
+        self.assertEqual(lines[5]['results'], expected)
+
+class BenchmarkTests(SimpleTestCase):
+    def test_corpora_are_fixed_and_valid(self):
+        for calculator in corpora.BASE_CASES:
+            self.assertEqual(corpora.corpus(calculator), corpora.corpus(calculator))
+            form_class = endpoint(calculator).form_class
+            for case in corpora.corpus(calculator, size=20):
+                self.assertEqual(clean_case(form_class, case)[1], {}, (calculator, case))
+            self.assertEqual(len(endpoint(calculator).calculate(cleaned_corpus(calculator)[:3])), 3)
+
+    def test_worker_startup_leaves_export_backends_unloaded(self):
+        report = startup.start_worker()
+        self.assertEqual(report['loaded'], {'pdf': False, 'mathml': False})
+        self.assertGreater(report['rss_kib'], 0)
+
+    def test_worker_startup_with_mathml_warm_up(self):
+        report = startup.start_worker(warm_up=True)
+        self.assertEqual(report['loaded'], {'pdf': False, 'mathml': True})
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_regressions(self):
+        def result(name, ops_per_sec, peak_kib):
+            return Measurement(name, 10, ops_per_sec, 1.0, 2.0, peak_kib)
+
+        baseline = {m.name: m for m in [result('a', 100, 10), result('b', 100, 10), result('c', 100, 10)]}
+        found = regressions([result('a', 90, 11), result('b', 80, 20)], baseline, tolerance=0.15)
+        self.assertEqual([(name, metric) for name, metric, *_ in found], [
+            ('c', 'did not run'), ('b', 'ops/sec'), ('b', 'peak KiB'),
+        ])
+
+class TimingTests(TestCase):
+    def setUp(self):
+        timing.reset_metrics()
+        self.addCleanup(timing.reset_metrics)
+
+    def test_nested_steps_are_charged_their_own_time(self):
+        with override_settings(PIPELINE_TIMING=True), timing.collect('scope') as seconds:
+            with timing.step('outer'):
+                with timing.step('inner'):
+                    sum(range(100000))
+        self.assertEqual(list(seconds), ['inner', 'outer', 'total'])
+        self.assertLess(seconds['outer'], seconds['inner'])
+        self.assertGreaterEqual(seconds['total'], seconds['outer'] + seconds['inner'])
+        self.assertEqual(timing.metrics()['scope']['inner']['count'], 1)
+
+    def test_steps_are_no_ops_outside_collection(self):
+        self.assertIs(timing.step('math'), timing.NO_STEP)
+        with timing.collect('scope') as seconds:
+            self.assertIs(timing.step('math'), timing.NO_STEP)
+        self.assertIsNone(seconds)
+        self.assertEqual(timing.metrics(), {})
+
+    @override_settings(PIPELINE_TIMING=True)
+    def test_server_timing_header_and_registry(self):
+        response = self.client.post(reverse('monopitch:monopitch_calculate'), corpora.BASE_CASES['monopitch'])
+        self.assertEqual(response.status_code, 200)
+        header = dict(entry.split(';dur=') for entry in response['Server-Timing'].split(', '))
+        self.assertEqual({'math', 'explain', 'save', 'render', 'total'} - header.keys(), set())
+        self.assertEqual(timing.metrics()['monopitch:monopitch_calculate']['render']['count'], 1)
+
+    def test_no_header_when_disabled(self):
+        response = self.client.post(reverse('monopitch:monopitch_calculate'), corpora.BASE_CASES['monopitch'])
+        self.assertNotIn('Server-Timing', response)
+
+class ElementBalance(HTMLParser):
+    """Fails on an end tag without its start tag; leaves unclosed start tags in ``open``."""
+    VOID = {'br', 'hr', 'img', 'input', 'link', 'meta'}
+
+    def __init__(self):
+        super().__init__()
+        self.open = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in self.VOID:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        if not self.open or self.open.pop() != tag:
+            raise AssertionError(f'</{tag}> closes an element opened outside the fragment')
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        fragments.cache_clear()
+        self.addCleanup(fragments.cache_clear)
+
+    def render(self, case):
+        response = self.client.post(reverse('monopitch:monopitch_calculate'), case)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_cached_fragments_render_like_uncached(self):
+        first, second = corpora.corpus('monopitch', size=2)
+        self.render(first)
+        self.assertTrue(fragments._fragments)
+        cached = self.render(second)
+        fragments.cache_clear()
+        self.assertEqual(cached, self.render(second))
+
+    def test_fragments_hold_whole_elements(self):
+        duopitch = DuopitchCalculation.objects.create(terrain_category='III', ridge_height=6.1)
+        for request in [
+            lambda: self.client.post(reverse('monopitch:monopitch_calculate'), corpora.BASE_CASES['monopitch']),
+            lambda: self.client.post(reverse('flatroof_calculate'), corpora.BASE_CASES['flatroof']),
+            lambda: self.client.post(reverse('wind_load_analysis_on_hipped_roof'), corpora.BASE_CASES['hipped']),
+            lambda: self.client.get(reverse('duopitch:wind_load_detail', args=[duopitch.pk])),
+        ]:
+            self.assertEqual(request().status_code, 200)
+        self.assertEqual(
+            {key[0][1] for key in fragments._fragments},
+            {'step-heading', 'step-formula', 'step-prose', 'step-notes', 'step-figures'}
+        )
+        for key, html in fragments._fragments.items():
+            with self.subTest(fragment=key[0][:2]):
+                parser = ElementBalance()
+                parser.feed(html)
+                parser.close()
+                self.assertEqual(parser.open, [])
+
+    def test_fragments_vary_on_their_values_and_template(self):
+        source = "{% load fragments %}{% fragment 'f' n %}{{ n }}{{ x }}{% endfragment %}"
+        tpl = Template(source)
+        self.assertEqual(tpl.render(Context({'n': 1, 'x': 'a'})), '1a')
+        self.assertEqual(tpl.render(Context({'n': 1, 'x': 'b'})), '1a')
+        self.assertEqual(tpl.render(Context({'n': 2, 'x': 'b'})), '2b')
+        self.assertEqual(Template(source).render(Context({'n': 1, 'x': 'c'})), '1c')
+        self.assertEqual(tpl.render(Context({'n': [1], 'x': 'd'})), '[1]d')
+
+    @override_settings(FRAGMENT_CACHE_SIZE=2)
+    def test_cache_is_bounded(self):
+        tpl = Template("{% load fragments %}{% fragment 'f' n %}{{ n }}{% endfragment %}")
+        for n in range(5):
+            tpl.render(Context({'n': n}))
+        self.assertEqual(len(fragments._fragments), 2)
+
+class TemplateWarmUpTests(SimpleTestCase):
+    def test_results_templates_are_compiled_into_the_cached_loader(self):
+        engine = engines['django'].engine
+        loader = engine.template_loaders[0]
+        loader.reset()
+        compiled = template_cache.warm_up()
+        for name in ['calculator/results.html', 'monopitch/results.html', 'flatroof/results.html',
+                     'duopitch/results.html', 'duopitch/pdf_template.html', 'wind_load_result.html']:
+            self.assertIn(name, compiled)
+        self.assertNotIn('admin/base.html', compiled)
+        self.assertIn('monopitch/results.html', loader.get_template_cache)
+
+class SQLiteTuningTests(SimpleTestCase):
+    def test_file_databases_use_write_ahead_logging(self):
+        from django.db import connections
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**connections['default'].settings_dict, 'NAME': os.path.join(directory, 'db.sqlite3')}
+            connection = connections['default'].__class__(settings_dict, alias='wal')
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone()[0], 'wal')
+            finally:
+                connection.close()
+
+@override_settings(WRITE_BEHIND=True)
+class WriteBehindTests(TestCase):
+    def setUp(self):
+        writebehind._pending.clear()
+        self.addCleanup(writebehind._pending.clear)
+
+    def form(self, **changes):
+        form = MonopitchForm(data=dict(corpora.BASE_CASES['monopitch'], **changes))
+        self.assertTrue(form.is_valid(), form.errors)
+        return form
+
+    def test_records_are_saved_on_flush(self):
+        response = self.client.post(reverse('monopitch:monopitch_calculate'), corpora.BASE_CASES['monopitch'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(MonopitchCalculation.objects.count(), 0)
+        self.assertEqual(writebehind.pending(), 1)
+
+        self.assertEqual(writebehind.flush(), 1)
+        calculation = MonopitchCalculation.objects.get()
+        result = CalculationResult.objects.get(object_id=calculation.pk, model='monopitch.windloadcalculation')
+        self.assertEqual(result.data, json.loads(json.dumps(monopitch_detail_results(calculation))))
+        self.assertEqual(writebehind.pending(), 0)
+
+    def test_rejected_batch_is_retried_row_by_row(self):
+        writebehind.save(self.form(calculation_name='good'))
+        bad = writebehind.save(self.form(calculation_name='bad'))
+        bad.vb0 = None
+        with self.assertLogs('core.writebehind', 'ERROR') as logs:
+            self.assertEqual(writebehind.flush(), 1)
+        self.assertEqual(list(MonopitchCalculation.objects.values_list('calculation_name', flat=True)), ['good'])
+        self.assertIn('record lost', logs.output[-1])
+
+    @override_settings(WRITE_BEHIND_MAX_PENDING=0)
+    def test_full_queue_saves_synchronously(self):
+        calculation = writebehind.save(self.form(), lambda instance: {'ok': True})
+        self.assertIsNotNone(calculation.pk)
+        self.assertEqual(writebehind.pending(), 0)
+        self.assertEqual(CalculationResult.objects.get(object_id=calculation.pk).data, {'ok': True})
+
+class ConditionalDetailTests(TestCase):
+    def setUp(self):
+        self.calculation = MonopitchForm(data=corpora.BASE_CASES['monopitch']).save()
+        self.url = reverse('monopitch:wind_load_detail', args=[self.calculation.pk])
+
+    def test_repeat_view_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            repeat = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.content, b'')
+
+    def test_saving_the_calculation_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.calculation.calculation_name = 'Renamed'
+        self.calculation.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_follows_rendering_settings(self):
+        etag = self.client.get(self.url)['ETag']
+        with override_settings(SERVER_MATHML=not mathml.server_side()):
+            self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+class StaticAssetTests(SimpleTestCase):
+    def setUp(self):
+        source = tempfile.TemporaryDirectory()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(source.cleanup)
+        self.addCleanup(root.cleanup)
+        self.source, self.root = Path(source.name), Path(root.name)
+        (self.source / 'css').mkdir()
+        (self.source / 'img').mkdir()
+        (self.source / 'img' / 'logo.png').write_bytes(b'\x89PNG')
+        (self.source / 'css' / 'site.css').write_text('body { background: url("../img/logo.png"); }\n' * 50)
+        settings = override_settings(
+            STATIC_ROOT=self.root, STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def collect(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        return json.loads((self.root / 'staticfiles.json').read_text())['paths']
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        paths = self.collect()
+        hashed = paths['css/site.css']
+        self.assertNotEqual(hashed, 'css/site.css')
+        self.assertIn(paths['img/logo.png'], (self.root / hashed).read_text())
+        self.assertTrue((self.root / (hashed + '.gz')).is_file())
+        self.assertEqual((self.root / (hashed + '.br')).is_file(), assets.brotli is not None)
+        self.assertFalse((self.root / (paths['img/logo.png'] + '.gz')).exists())
+
+    def test_uncollected_files_link_unhashed(self):
+        self.collect()
+        template = Template("{% load static %}{% static 'css/site.css' %} {% static 'img/missing.png' %}")
+        first, missing = template.render(Context()).split()
+        self.assertNotEqual(first, '/static/css/site.css')
+        self.assertEqual(missing, '/static/img/missing.png')
+
+    def test_hashed_files_are_served_compressed_and_immutable(self):
+        hashed = self.collect()['css/site.css']
+        response = self.client.get('/static/' + hashed, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], assets.IMMUTABLE)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(b''.join(response.streaming_content), (self.root / (hashed + '.gz')).read_bytes())
+
+        plain = self.client.get('/static/css/site.css')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('must-revalidate', plain['Cache-Control'])
+        self.assertEqual(self.client.get('/static/../settings.py').status_code, 404)
+
+    def test_vendor_tag_falls_back_to_cdn(self):
+        path = 'animate.css/4.1.1/animate.min.css'
+        template = Template("{% load assets %}{% vendor '" + path + "' %}")
+        self.assertEqual(template.render(Context()), assets.VENDORED[path])
+        vendored = self.source / 'vendor' / path
+        vendored.parent.mkdir(parents=True)
+        vendored.write_text('.animate { }')
+        with override_settings(STATICFILES_DIRS=[self.source]):
+            self.assertEqual(template.render(Context()), '/static/vendor/' + path)
+
+    def test_build_assets_vendors_files_without_source_maps(self):
+        cdn = tempfile.TemporaryDirectory()
+        self.addCleanup(cdn.cleanup)
+        upstream = Path(cdn.name) / 'upstream.js'
+        upstream.write_text('var a = 1;\n//# sourceMappingURL=upstream.js.map\n')
+        vendor_dir = self.source / 'vendor'
+        with mock.patch.dict(assets.VENDORED, {'lib/1.0/lib.js': upstream.as_uri()}, clear=True), \
+                mock.patch.object(assets, 'VENDOR_DIR', vendor_dir):
+            call_command('build_assets', verbosity=0, stdout=open(os.devnull, 'w'))
+        self.assertEqual((vendor_dir / 'lib/1.0/lib.js').read_text(), 'var a = 1;\n')
+        self.assertIn('vendor/lib/1.0/lib.js', json.loads((self.root / 'staticfiles.json').read_text())['paths'])
+
+class RecordTests(SimpleTestCase):
+    def setUp(self):
+        self.results = monopitch_wind_loads(initial_case(MonopitchForm))['results']
+
+    def test_records_read_like_dicts(self):
+        result = self.results[0]
+        self.assertFalse(hasattr(result, '__dict__'))
+        self.assertEqual(result['w_e'], result.w_e)
+        self.assertIn('C_pe', result)
+        self.assertEqual(dict(result), result.as_dict())
+        self.assertEqual(Template('{{ r.zone }} {{ r.area|floatformat:1 }}').render(Context({'r': result})),
+                         f'{result.zone} {result.area:.1f}')
+        with self.assertRaises(KeyError):
+            result['json']
+
+    def test_tabulated_batch_keeps_columns_and_materialises_rows(self):
+        batch = [{'results': self.results}, {'results': self.results[:2]}]
+        table = tabulate(batch, 'results', MonopitchZoneResult)
+        self.assertEqual(len(table), 5)
+        self.assertIsInstance(table.column('w_e'), array.array)
+        first, second = batch[0]['results'], batch[1]['results']
+        self.assertEqual(list(first), self.results)
+        self.assertEqual(second[-1], self.results[1])
+        self.assertEqual(list(second.value_rows()), [result.values() for result in self.results[:2]])
+        self.assertEqual(list(pickle.loads(pickle.dumps(second))), self.results[:2])
+
+    def test_json_matches_the_equivalent_dicts(self):
+        rows = RecordTable.from_rows(FlatZoneResult, [
+            FlatZoneResult('F', -1.8, None, -0.75, None), FlatZoneResult('I', -0.2, 0.2, 1e-17, float('inf'))
+        ])
+        data = {'results': [{'id': 3, 'zones': rows, 'first': rows[0], 'name': 'Zone é'}], 'valid': True}
+        plain = {'results': [{'id': 3, 'zones': [row.as_dict() for row in rows], 'first': rows[0].as_dict(), 'name': 'Zone é'}], 'valid': True}
+        self.assertEqual(records.dumps(data), json.dumps(plain))
@@ -0,0 +1,179 @@
+"""
+Per-step wall-time instrumentation of the calculation pipelines.
+
+Code marks its phases with ``with timing.step('render'):`` or the ``@timed``
+decorator, so a step is stopped however its block exits. Steps nest and each one is charged its own time only, so
+'explain' around a step sequence does not also count the 'math' and
+'mathml' calls made inside it.
+
+With PIPELINE_TIMING on, ServerTimingMiddleware collects the steps of every
+request, reports them in a Server-Timing header (visible in the browser's
+network panel) and adds them to an in-process registry, read with
+metrics(), keyed by URL name. Work outside a request, such as the PDF
+worker, is collected with collect(scope). With the setting off the
+middleware removes itself and every step is a shared no-op, so
+instrumented code pays for one context variable lookup.
+"""
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Steps of the request (or job) being collected in this context, if any
+_current = ContextVar('timing_steps', default=None)
+
+_lock = threading.Lock()
+_registry = {}
+
+def enabled():
+    return getattr(settings, 'PIPELINE_TIMING', False)
+
+class Steps:
+    """Accumulated seconds per step name, in first-seen order."""
+
+    __slots__ = ('seconds', 'stack')
+
+    def __init__(self):
+        self.seconds = {}
+        self.stack = []
+
+class Step:
+    __slots__ = ('name', 'steps', 'started', 'nested')
+
+    def __init__(self, name, steps):
+        self.name = name
+        self.steps = steps
+
+    def start(self):
+        self.nested = 0.0
+        self.steps.stack.append(self)
+        self.started = perf_counter()
+        return self
+
+    def stop(self):
+        elapsed = perf_counter() - self.started
+        stack = self.steps.stack
+        stack.pop()
+        seconds = self.steps.seconds
+        seconds[self.name] = seconds.get(self.name, 0.0) + elapsed - self.nested
+        if stack:
+            stack[-1].nested += elapsed
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class NoStep:
+    """Stand-in for Step while nothing is being collected."""
+
+    __slots__ = ()
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+NO_STEP = NoStep()
+
+def step(name):
+    """Context manager timing a named step of the current request."""
+    steps = _current.get()
+    return NO_STEP if steps is None else Step(name, steps)
+
+def timed(name):
+    """Decorator timing every call of a function as the named step."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            steps = _current.get()
+            if steps is None:
+                return func(*args, **kwargs)
+            with Step(name, steps):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def collect(scope=None):
+    """
+    Collect the steps run inside the block, plus a 'total', and yield their
+    {name: seconds}. When a scope is given they are added to the registry
+    under it on exit. Yields None, collecting nothing, while timing is off.
+    """
+    if not enabled():
+        yield None
+        return
+    steps = Steps()
+    token = _current.set(steps)
+    started = perf_counter()
+    try:
+        yield steps.seconds
+    finally:
+        steps.seconds['total'] = perf_counter() - started
+        _current.reset(token)
+        if scope is not None:
+            record(scope, steps.seconds)
+
+def record(scope, seconds):
+    """Add one request's (or job's) step times to the registry."""
+    with _lock:
+        entries = _registry.setdefault(scope, {})
+        for name, value in seconds.items():
+            entry = entries.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += value
+            entry[2] = max(entry[2], value)
+
+def metrics():
+    """Snapshot of the registry: {scope: {step: {count, total_ms, mean_ms, max_ms}}}."""
+    with _lock:
+        return {
+            scope: {
+                name: {
+                    'count': count,
+                    'total_ms': total * 1000,
+                    'mean_ms': total * 1000 / count,
+                    'max_ms': peak * 1000,
+                }
+                for name, (count, total, peak) in entries.items()
+            }
+            for scope, entries in _registry.items()
+        }
+
+def reset_metrics():
+    with _lock:
+        _registry.clear()
+
+def server_timing(seconds):
+    """Server-Timing header value for {name: seconds}."""
+    return ', '.join(f'{name};dur={value * 1000:.2f}' for name, value in seconds.items())
+
+class ServerTimingMiddleware:
+    """Collects the steps of each request into the Server-Timing header and the registry."""
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect() as seconds:
+            response = self.get_response(request)
+        if seconds is None:
+            return response
+        match = request.resolver_match
+        record(match.view_name if match else request.path_info, seconds)
+        response['Server-Timing'] = server_timing(seconds)
+        return response
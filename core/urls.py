@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('<uuid:job_id>/', views.report_status, name='report_status'),
+    path('<uuid:job_id>/download/', views.report_download, name='report_download'),
+]
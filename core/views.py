@@ -0,0 +1,40 @@
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from . import report_cache
+from .models import ReportJob
+from .reports import check_timeout, job_payload, wants_html
+
+# Seconds between reloads of the HTML status page
+POLL_INTERVAL = 2
+
+def report_status(request, job_id):
+    """Report the current state of a PDF export job, as JSON or as a page that refreshes until the download starts."""
+    job = check_timeout(get_object_or_404(ReportJob.objects.defer('html', 'pdf'), pk=job_id))
+    payload = job_payload(job)
+    if not wants_html(request):
+        return JsonResponse(payload)
+    failed = job.status == ReportJob.STATUS_FAILED
+    return render(request, 'core/report_status.html', {
+        'job': job,
+        'done': job.status == ReportJob.STATUS_DONE,
+        'failed': failed,
+        'download_url': payload['download_url'],
+        'poll_interval': POLL_INTERVAL
+    }, status=500 if failed else 200)
+
+def report_download(request, job_id):
+    """Serve a finished PDF, or the job state while it is still rendering."""
+    job = check_timeout(get_object_or_404(ReportJob.objects.defer('html'), pk=job_id))
+    if job.status == ReportJob.STATUS_DONE:
+        if job.cache_key:
+            response = report_cache.cached_response(request, job.cache_key, 'pdf', job.filename)
+            if response is not None:
+                return response
+        response = HttpResponse(bytes(job.pdf), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{job.filename}"'
+        return response
+    if wants_html(request):
+        return redirect('core:report_status', job_id=job.pk)
+    if job.status == ReportJob.STATUS_FAILED:
+        return JsonResponse(job_payload(job), status=500)
+    return JsonResponse(job_payload(job), status=202)
@@ -0,0 +1,154 @@
+"""
+Write-behind persistence of calculation records.
+
+Calculator views save the submitted inputs before answering, although the
+user is only waiting for the numbers. With WRITE_BEHIND on, save() builds
+the model instance (and its core.results data) without touching the
+database and queues it. A flusher thread started by CoreConfig.ready writes
+the queue with one bulk_create per model every WRITE_BEHIND_INTERVAL
+seconds, or as soon as WRITE_BEHIND_BATCH_SIZE records are waiting.
+
+Guarantees:
+
+* A queued record is committed within about WRITE_BEHIND_INTERVAL seconds,
+  and appears in history lists and exports only then.
+* No record is dropped for lack of room: once WRITE_BEHIND_MAX_PENDING
+  records are waiting, save() writes synchronously again.
+* A batch the database rejects is retried row by row, so one bad record
+  cannot take the rest of its batch with it. A record that still fails is
+  logged with its field values.
+* shutdown() flushes whatever is queued and runs at interpreter exit, so a
+  normal stop or restart (SIGTERM under gunicorn, Ctrl-C under runserver)
+  loses nothing. Only a hard kill of the process or host loses the records
+  of the last interval; leave WRITE_BEHIND off where that is unacceptable.
+
+Records saved this way are returned without a primary key. They must not be
+linked to (e.g. redirected to a detail page) until they are flushed.
+"""
+import atexit
+import logging
+import threading
+from collections import deque
+from django.conf import settings
+from django.core import serializers
+from django.db import close_old_connections, transaction
+from .results import bulk_store_results, store_results
+
+logger = logging.getLogger(__name__)
+
+# Queued (instance, results data or None) pairs
+_pending = deque()
+_condition = threading.Condition()
+_flusher = None
+_stopping = False
+
+def enabled():
+    return getattr(settings, 'WRITE_BEHIND', False)
+
+def batch_size():
+    return getattr(settings, 'WRITE_BEHIND_BATCH_SIZE', 200)
+
+def interval():
+    return getattr(settings, 'WRITE_BEHIND_INTERVAL', 0.5)
+
+def max_pending():
+    return getattr(settings, 'WRITE_BEHIND_MAX_PENDING', 10000)
+
+def pending():
+    """Number of records queued and not yet flushed."""
+    return len(_pending)
+
+def save(form, compute=None):
+    """
+    Save a calculation ModelForm, and its results through ``compute`` when
+    given, now or in write-behind mode through the queue.
+    """
+    if not enabled() or len(_pending) >= max_pending():
+        instance = form.save()
+        if compute is not None:
+            store_results(instance, compute)
+        return instance
+    instance = form.save(commit=False)
+    data = compute(instance) if compute is not None else None
+    with _condition:
+        _pending.append((instance, data))
+        if len(_pending) >= batch_size():
+            _condition.notify()
+    return instance
+
+def flush():
+    """Write every queued record; returns how many were saved."""
+    saved = 0
+    while True:
+        with _condition:
+            batch = [_pending.popleft() for _ in range(min(batch_size(), len(_pending)))]
+        if not batch:
+            return saved
+        saved += _write(batch)
+
+def _write(batch):
+    by_model = {}
+    for instance, data in batch:
+        by_model.setdefault(type(instance), []).append((instance, data))
+    saved = 0
+    for model, records in by_model.items():
+        try:
+            with transaction.atomic():
+                _insert(model, records)
+            saved += len(records)
+        except Exception as e:
+            logger.error(f"Write-behind batch of {len(records)} {model._meta.label} failed, retrying row by row: {str(e)}")
+            for record in records:
+                record[0].pk = None
+                record[0]._state.adding = True
+                try:
+                    with transaction.atomic():
+                        _insert(model, [record])
+                    saved += 1
+                except Exception as e:
+                    logger.error(f"Write-behind record lost: {str(e)}: {serializers.serialize('json', [record[0]])}")
+    return saved
+
+def _insert(model, records):
+    instances = model.objects.bulk_create([instance for instance, _ in records])
+    with_results = [(instance, data) for instance, (_, data) in zip(instances, records) if data is not None]
+    if with_results:
+        bulk_store_results(*zip(*with_results))
+
+def _run():
+    while True:
+        with _condition:
+            if not _stopping and len(_pending) < batch_size():
+                _condition.wait(interval())
+            stopping = _stopping
+        close_old_connections()
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Write-behind flush failed: {str(e)}")
+        finally:
+            close_old_connections()
+        if stopping:
+            return
+
+def start():
+    """Start the background flusher (once per process)."""
+    global _flusher, _stopping
+    with _condition:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _stopping = False
+        _flusher = threading.Thread(target=_run, name='write-behind', daemon=True)
+        _flusher.start()
+
+def shutdown():
+    """Stop the flusher and write everything still queued."""
+    global _stopping
+    with _condition:
+        _stopping = True
+        _condition.notify()
+    if _flusher is not None:
+        _flusher.join()
+    flush()
+
+atexit.register(shutdown)
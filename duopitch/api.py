@@ -0,0 +1,28 @@
+from core.api import batch_view
+from core.records import tabulate
+from core.sweep import sweep_view
+from .calculations import PurlinLoad, TrussLoad, ZoneResult, calculate_wind_loads, net_pressure_columns, results_data
+from .forms import WindLoadCalculationForm
+from .models import WindLoadCalculation
+
+def calculate_case(case):
+    return calculate_wind_loads(WindLoadCalculation(**case))
+
+def calculate_cases(cases):
+    """Zone, purlin and truss loads per case; the explanation steps are never built."""
+    results = []
+    for case in cases:
+        results_0, results_90, purlin_loads, truss_loads, _ = calculate_case(case)
+        results.append({
+            'results_0': results_0,
+            'results_90': results_90,
+            'purlin_loads': purlin_loads,
+            'truss_loads': truss_loads,
+        })
+    for key, record_type in (('results_0', ZoneResult), ('results_90', ZoneResult),
+                             ('purlin_loads', PurlinLoad), ('truss_loads', TrussLoad)):
+        tabulate(results, key, record_type)
+    return results
+
+calculate = batch_view(WindLoadCalculationForm, calculate_cases, WindLoadCalculation, results_data)
+sweep = sweep_view(WindLoadCalculationForm, net_pressure_columns)
@@ -1,9 +1,14 @@
-import math
-from dataclasses import dataclass
+from collections.abc import Sequence
+from functools import cached_property
 from typing import List, Tuple, Dict, Any
+import numpy as np
+from core.engine import basic_velocity_pressure, peak_velocity_pressure, peak_velocity_pressures
+from core.records import Record, record
+from . import formulas
+from core.timing import timed
 
-@dataclass
-class ZoneResult:
+@record
+class ZoneResult(Record):
     zone: str
     width: float
     length: float
@@ -13,74 +18,60 @@ class ZoneResult:
     C_pe: float
     w_e: float
 
-@dataclass
-class PurlinLoad:
+@record
+class PurlinLoad(Record):
     zone: str
     area: float
     W_e: float
     F_w_purlin: float
 
-@dataclass
-class TrussLoad:
+@record
+class TrussLoad(Record):
     zone: str
     area: float
     F_w_purlin: float
     F_w_truss: float
 
-def calculate_wind_loads(calculation) -> Tuple[List[ZoneResult], List[ZoneResult], List[PurlinLoad], List[TrussLoad], List[Dict[str, Any]]]:
+class Explanation(Sequence):
+    """
+    Calculation steps that are only formatted when first read.
+    Numeric callers (list views, CSV export, API clients) never touch the
+    steps and so skip the LaTeX string formatting entirely.
+    """
+
+    def __init__(self, build, *args):
+        self._build = build
+        self._args = args
+
+    @cached_property
+    def steps(self) -> List[Dict[str, Any]]:
+        return self._build(*self._args)
+
+    def __getitem__(self, index):
+        return self.steps[index]
+
+    def __len__(self):
+        return len(self.steps)
+
+@timed('math')
+def calculate_wind_loads(calculation) -> Tuple[List[ZoneResult], List[ZoneResult], List[PurlinLoad], List[TrussLoad], Explanation]:
     """
     Calculate wind loads for a duopitch roof.
     Returns results for θ=0° and θ=90°, purlin loads, truss loads, and calculation explanation.
+    The explanation is built lazily, the first time its steps are accessed.
     """
-    explanation = []
-    
     # Step 1: Basic Wind Velocity (V_b)
     v_b = calculation.c_direction * calculation.c_season * calculation.vb0
-    explanation.append({
-        'title': 'Basic Wind Velocity V_b',
-        'description': 'The basic wind velocity (V_b) is the fundamental wind speed used for calculating wind loads on the duopitch roof, as defined in EN 1991-1-4 Section 4.2.',
-        'formula': r'\( V_b = C_{\text{direction}} \times C_{\text{season}} \times V_{b,0} \)',
-        'values_latex': f'\( C_{{\\text{{direction}}}} = {calculation.c_direction:.1f}, C_{{\\text{{season}}}} = {calculation.c_season:.1f}, V_{{b,0}} = {calculation.vb0:.1f} \\text{{ m/s}} \)',
-        'result_latex': f'\( V_b = {v_b:.2f} \\text{{ m/s}} \)',
-        'reference': 'EN 1991-1-4:2005, Section 4.2'
-    })
 
     # Step 2: Basic Velocity Pressure (q_b)
-    q_b = 0.5 * calculation.rho * v_b ** 2 / 1000  # kN/m²
-    explanation.append({
-        'title': 'Basic Velocity Pressure q_b',
-        'description': 'The basic velocity pressure (q_b) represents the dynamic pressure exerted by the wind, calculated using air density (ρ) and the square of the basic wind velocity (V_b).',
-        'formula': r'\( q_b = \frac{1}{2} \rho V_b^2 \times 10^{-3} \)',
-        'values_latex': f'\( \\rho = {calculation.rho:.2f} \\text{{ kg/m}}^3, V_b = {v_b:.2f} \\text{{ m/s}} \)',
-        'result_latex': f'\( q_b = {q_b:.4f} \\text{{ kN/m}}^2 \)',
-        'reference': 'EN 1991-1-4:2005, Section 4.5'
-    })
+    q_b = basic_velocity_pressure(v_b, calculation.rho)  # kN/m²
 
     # Step 3: Peak Velocity Pressure (q_p(z))
     z = calculation.ridge_height  # Reference height
-    terrain_params = {
-        '0': (0.003, 1),
-        'I': (0.01, 1),
-        'II': (0.05, 2),
-        'III': (0.3, 5),
-        'IV': (1.0, 10)
-    }
-    z_0, z_min = terrain_params[calculation.terrain_category]
     k_i = 1.0
-    k_r = 0.19 * (z_0 / 0.05) ** 0.07
-    c_r = k_r * math.log(z / z_0) if z >= z_min else k_r * math.log(z_min / z_0)
-    v_m = c_r * v_b
-    l_v = k_i / math.log(z / z_0) if z >= z_min else k_i / math.log(z_min / z_0)
-    q_p = (1 + 7 * l_v) * 0.5 * calculation.rho * v_m ** 2 / 1000
-
-    explanation.append({
-        'title': 'Peak Velocity Pressure q_p(z)',
-        'description': 'The peak velocity pressure (q_p(z)) accounts for wind effects at the reference height, incorporating terrain roughness and turbulence.',
-        'formula': r'\( q_p(z) = \left[1 + 7 I_v(z)\right] \times \frac{1}{2} \rho V_m^2(z) \times 10^{-3} \)',
-        'values_latex': f'\( z = {z:.1f} \\text{{ m}}, z_0 = {z_0:.3f} \\text{{ m}}, z_{{\\text{{min}}}} = {z_min:.1f} \\text{{ m}}, k_i = {k_i:.1f}, k_r = {k_r:.4f}, c_r = {c_r:.4f}, V_m = {v_m:.2f} \\text{{ m/s}}, \\rho = {calculation.rho:.2f} \\text{{ kg/m}}^3 \)',
-        'result_latex': f'\( q_p(z) = {q_p:.3f} \\text{{ kN/m}}^2 \)',
-        'reference': 'EN 1991-1-4:2005, Sections 4.3, 4.4, 4.5'
-    })
+    z_0, z_min, k_r, c_r, v_m, l_v, q_p = peak_velocity_pressure(
+        calculation.terrain_category, z, v_b, calculation.rho, k_i=k_i
+    )
 
     # Step 4: External Pressure Coefficients (C_pe)
     h = calculation.ridge_height
@@ -112,25 +103,8 @@ def calculate_wind_loads(calculation) -> Tuple[List[ZoneResult], List[ZoneResult
         zone['C_pe_pos'] = cpe_pos
         zone['C_pe_neg'] = cpe_neg
 
-    explanation.append({
-        'title': 'External Pressure Coefficients C_pe',
-        'description': 'External pressure coefficients (C_pe) define the wind pressure distribution across the duopitch roof zones.',
-        'formula': r'\( C_{pe} = \begin{cases} C_{pe,1} & \text{if } A \leq 1 \text{ m}^2 \\ C_{pe,10} & \text{if } A \geq 10 \text{ m}^2 \\ \text{Interpolate} & \text{if } 1 \text{ m}^2 < A < 10 \text{ m}^2 \end{cases} \)',
-        'values_latex': f'\( e = {e:.2f} \\text{{ m}} \)',
-        'result_latex': 'See zone table for C_pe values.',
-        'reference': 'EN 1991-1-4:2005, Section 7.2.5'
-    })
-
     # Step 5: Internal Pressure Coefficient (C_pi)
     c_pi = -0.3  # Conservative value for internal pressure
-    explanation.append({
-        'title': 'Internal Pressure Coefficient C_pi',
-        'description': 'The internal pressure coefficient (C_pi) accounts for wind pressure inside the building.',
-        'formula': r'\( C_{pi} = -0.3 \)',
-        'values_latex': '',
-        'result_latex': f'\( C_{{pi}} = {c_pi:.1f} \)',
-        'reference': 'EN 1991-1-4:2005, Section 7.2.9'
-    })
 
     # Step 6: Net Wind Pressure (w)
     results_0 = []
@@ -188,15 +162,6 @@ def calculate_wind_loads(calculation) -> Tuple[List[ZoneResult], List[ZoneResult
             w_e=w_e
         ))
 
-    explanation.append({
-        'title': 'Net Wind Pressure w',
-        'description': 'The net wind pressure (w_e) on each roof zone combines external and internal pressure coefficients with the peak velocity pressure.',
-        'formula': r'\( w_e = q_p(z) (C_{pe} + C_{pi}) \)',
-        'values_latex': f'\( q_p = {q_p:.3f} \\text{{ kN/m}}^2, C_{{pi}} = {c_pi:.1f} \)',
-        'result_latex': 'See results table for w_e values.',
-        'reference': 'EN 1991-1-4:2005, Section 5.2'
-    })
-
     # Calculate purlin loads (using θ = 90° results as they are typically more critical)
     purlin_loads = []
     for result in results_90:
@@ -219,4 +184,136 @@ def calculate_wind_loads(calculation) -> Tuple[List[ZoneResult], List[ZoneResult
             F_w_truss=F_w_truss
         ))
 
-    return results_0, results_90, purlin_loads, truss_loads, explanation 
\ No newline at end of file
+    explanation = Explanation(
+        explain_wind_loads, calculation, v_b, q_b, z, z_0, z_min, k_i, k_r, c_r, v_m, q_p, e, c_pi
+    )
+    return results_0, results_90, purlin_loads, truss_loads, explanation
+
+# C_pe,1 and C_pe,10 (positive, negative) per wind direction, as used by calculate_wind_loads()
+CPE = {
+    0: ((0.8, -2.0), (0.7, -1.5)),
+    90: ((0.7, -1.8), (0.6, -1.3)),
+}
+
+@timed('math')
+def net_pressure_columns(cases):
+    """
+    w_e of every θ=0° and θ=90° zone for many cleaned cases at once: the
+    zone labels and an array with one row per case, equal to
+    calculate_wind_loads() per case.
+    """
+    def column(name):
+        return np.array([case[name] for case in cases], dtype=np.float64)
+
+    v_b = column('c_direction') * column('c_season') * column('vb0')
+    h = column('ridge_height')
+    q_p = peak_velocity_pressures([case['terrain_category'] for case in cases], h, v_b, column('rho'), k_i=1.0).q_p
+    b = column('building_width')
+    e = np.minimum(b, 2 * h)
+    zones = {
+        'F': (e / 10) * (e / 4),
+        'G': (e / 10) * (b - 2 * (e / 4)),
+        'H': (b - 2 * (e / 10)) * b,
+        'I': (e / 10) * (e / 4),
+        'J': (b - 2 * (e / 10)) * b,
+    }
+    c_pi = -0.3
+    labels, pressures = [], []
+    for theta, ((pos_1, neg_1), (pos_10, neg_10)) in CPE.items():
+        for zone, area in zones.items():
+            cpe_pos = np.where(area <= 1, pos_1, np.where(area >= 10, pos_10, pos_1 + (area - 1) * (-0.1) / 9))
+            cpe_neg = np.where(area <= 1, neg_1, np.where(area >= 10, neg_10, neg_1 + (area - 1) * 0.5 / 9))
+            c_pe = np.maximum(np.abs(cpe_pos), np.abs(cpe_neg))
+            c_pe = np.where(cpe_neg < -cpe_pos, -c_pe, c_pe)
+            labels.append(f'{zone} (θ={theta}°)')
+            pressures.append(q_p * (c_pe + c_pi))
+    return tuple(labels), np.column_stack(pressures)
+
+def results_data(calculation, results=None) -> Dict[str, Any]:
+    """calculate_wind_loads() output (computed unless given) as JSON-ready data, for persisting with core.results."""
+    results_0, results_90, purlin_loads, truss_loads, explanation = results or calculate_wind_loads(calculation)
+    return {
+        'results_0': [result.as_dict() for result in results_0],
+        'results_90': [result.as_dict() for result in results_90],
+        'purlin_loads': [load.as_dict() for load in purlin_loads],
+        'truss_loads': [load.as_dict() for load in truss_loads],
+        # Values the explanation is formatted from, minus the calculation itself
+        'explanation_args': list(explanation._args[1:]),
+    }
+
+def results_from_data(calculation, data) -> Tuple[List[ZoneResult], List[ZoneResult], List[PurlinLoad], List[TrussLoad], Explanation]:
+    """Rebuild the calculate_wind_loads() tuple from results_data() output."""
+    return (
+        [ZoneResult(**result) for result in data['results_0']],
+        [ZoneResult(**result) for result in data['results_90']],
+        [PurlinLoad(**load) for load in data['purlin_loads']],
+        [TrussLoad(**load) for load in data['truss_loads']],
+        Explanation(explain_wind_loads, calculation, *data['explanation_args']),
+    )
+
+@timed('explain')
+def explain_wind_loads(calculation, v_b, q_b, z, z_0, z_min, k_i, k_r, c_r, v_m, q_p, e, c_pi) -> List[Dict[str, Any]]:
+    """Format the explanation steps for the values computed by calculate_wind_loads()."""
+    steps = []
+
+    # Step 1: Basic Wind Velocity (V_b)
+    steps.append({
+        'title': 'Basic Wind Velocity V_b',
+        'description': 'The basic wind velocity (V_b) is the fundamental wind speed used for calculating wind loads on the duopitch roof, as defined in EN 1991-1-4 Section 4.2.',
+        'formula': formulas.BASIC_WIND_VELOCITY,
+        'values_latex': f'\( C_{{\\text{{direction}}}} = {calculation.c_direction:.1f}, C_{{\\text{{season}}}} = {calculation.c_season:.1f}, V_{{b,0}} = {calculation.vb0:.1f} \\text{{ m/s}} \)',
+        'result_latex': f'\( V_b = {v_b:.2f} \\text{{ m/s}} \)',
+        'reference': 'EN 1991-1-4:2005, Section 4.2'
+    })
+
+    # Step 2: Basic Velocity Pressure (q_b)
+    steps.append({
+        'title': 'Basic Velocity Pressure q_b',
+        'description': 'The basic velocity pressure (q_b) represents the dynamic pressure exerted by the wind, calculated using air density (ρ) and the square of the basic wind velocity (V_b).',
+        'formula': formulas.BASIC_VELOCITY_PRESSURE,
+        'values_latex': f'\( \\rho = {calculation.rho:.2f} \\text{{ kg/m}}^3, V_b = {v_b:.2f} \\text{{ m/s}} \)',
+        'result_latex': f'\( q_b = {q_b:.4f} \\text{{ kN/m}}^2 \)',
+        'reference': 'EN 1991-1-4:2005, Section 4.5'
+    })
+
+    # Step 3: Peak Velocity Pressure (q_p(z))
+    steps.append({
+        'title': 'Peak Velocity Pressure q_p(z)',
+        'description': 'The peak velocity pressure (q_p(z)) accounts for wind effects at the reference height, incorporating terrain roughness and turbulence.',
+        'formula': formulas.PEAK_VELOCITY_PRESSURE,
+        'values_latex': f'\( z = {z:.1f} \\text{{ m}}, z_0 = {z_0:.3f} \\text{{ m}}, z_{{\\text{{min}}}} = {z_min:.1f} \\text{{ m}}, k_i = {k_i:.1f}, k_r = {k_r:.4f}, c_r = {c_r:.4f}, V_m = {v_m:.2f} \\text{{ m/s}}, \\rho = {calculation.rho:.2f} \\text{{ kg/m}}^3 \)',
+        'result_latex': f'\( q_p(z) = {q_p:.3f} \\text{{ kN/m}}^2 \)',
+        'reference': 'EN 1991-1-4:2005, Sections 4.3, 4.4, 4.5'
+    })
+
+    # Step 4: External Pressure Coefficients (C_pe)
+    steps.append({
+        'title': 'External Pressure Coefficients C_pe',
+        'description': 'External pressure coefficients (C_pe) define the wind pressure distribution across the duopitch roof zones.',
+        'formula': formulas.EXTERNAL_PRESSURE_COEFFICIENT,
+        'values_latex': f'\( e = {e:.2f} \\text{{ m}} \)',
+        'result_latex': 'See zone table for C_pe values.',
+        'reference': 'EN 1991-1-4:2005, Section 7.2.5'
+    })
+
+    # Step 5: Internal Pressure Coefficient (C_pi)
+    steps.append({
+        'title': 'Internal Pressure Coefficient C_pi',
+        'description': 'The internal pressure coefficient (C_pi) accounts for wind pressure inside the building.',
+        'formula': formulas.INTERNAL_PRESSURE_COEFFICIENT,
+        'values_latex': '',
+        'result_latex': f'\( C_{{pi}} = {c_pi:.1f} \)',
+        'reference': 'EN 1991-1-4:2005, Section 7.2.9'
+    })
+
+    # Step 6: Net Wind Pressure (w)
+    steps.append({
+        'title': 'Net Wind Pressure w',
+        'description': 'The net wind pressure (w_e) on each roof zone combines external and internal pressure coefficients with the peak velocity pressure.',
+        'formula': formulas.NET_WIND_PRESSURE,
+        'values_latex': f'\( q_p = {q_p:.3f} \\text{{ kN/m}}^2, C_{{pi}} = {c_pi:.1f} \)',
+        'result_latex': 'See results table for w_e values.',
+        'reference': 'EN 1991-1-4:2005, Section 5.2'
+    })
+
+    return steps
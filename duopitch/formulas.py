@@ -0,0 +1,17 @@
+"""LaTeX formula templates shown in the duopitch calculation steps."""
+
+BASIC_WIND_VELOCITY = '\\( V_b = C_{\\text{direction}} \\times C_{\\text{season}} \\times V_{b,0} \\)'
+BASIC_VELOCITY_PRESSURE = '\\( q_b = \\frac{1}{2} \\rho V_b^2 \\times 10^{-3} \\)'
+PEAK_VELOCITY_PRESSURE = '\\( q_p(z) = \\left[1 + 7 I_v(z)\\right] \\times \\frac{1}{2} \\rho V_m^2(z) \\times 10^{-3} \\)'
+EXTERNAL_PRESSURE_COEFFICIENT = '\\( C_{pe} = \\begin{cases} C_{pe,1} & \\text{if } A \\leq 1 \\text{ m}^2 \\\\ C_{pe,10} & \\text{if } A \\geq 10 \\text{ m}^2 \\\\ \\text{Interpolate} & \\text{if } 1 \\text{ m}^2 < A < 10 \\text{ m}^2 \\end{cases} \\)'
+INTERNAL_PRESSURE_COEFFICIENT = '\\( C_{pi} = -0.3 \\)'
+NET_WIND_PRESSURE = '\\( w_e = q_p(z) (C_{pe} + C_{pi}) \\)'
+
+FORMULAS = (
+    BASIC_WIND_VELOCITY,
+    BASIC_VELOCITY_PRESSURE,
+    PEAK_VELOCITY_PRESSURE,
+    EXTERNAL_PRESSURE_COEFFICIENT,
+    INTERNAL_PRESSURE_COEFFICIENT,
+    NET_WIND_PRESSURE,
+)
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('duopitch', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='windloadcalculation',
+            index=models.Index(fields=['-created_at', '-id'], name='duopitch_created_id_idx'),
+        ),
+    ]
@@ -1,3 +1,93 @@
+from unittest import mock
+import json
+from django.http import HttpResponse
 from django.test import TestCase
+from django.urls import reverse
+from core.models import CalculationResult, ReportJob
+from .calculations import calculate_wind_loads, results_data, results_from_data
+from .forms import WindLoadCalculationForm
+from .models import WindLoadCalculation
 
-# Create your tests here.
+class CalculateWindLoadsTests(TestCase):
+    def setUp(self):
+        self.calculation = WindLoadCalculation(terrain_category='III', ridge_height=6.1)
+
+    def test_explanation_is_built_on_demand(self):
+        """Numeric results do not format the explanation steps."""
+        results_0, results_90, purlin_loads, truss_loads, explanation = calculate_wind_loads(self.calculation)
+        self.assertEqual(len(results_0), 5)
+        self.assertNotIn('steps', explanation.__dict__)
+
+        self.assertEqual(len(explanation), 6)
+        self.assertEqual(explanation[0]['title'], 'Basic Wind Velocity V_b')
+        self.assertIn('steps', explanation.__dict__)
+
+    def test_explanation_matches_results(self):
+        results_0, _, _, _, explanation = calculate_wind_loads(self.calculation)
+        steps = list(explanation)
+        self.assertIn('V_b = 22.00', steps[0]['result_latex'])
+        self.assertEqual(steps[-1]['title'], 'Net Wind Pressure w')
+
+
+class PersistedResultsTests(TestCase):
+    def setUp(self):
+        self.calculation = WindLoadCalculation.objects.create(terrain_category='III', ridge_height=6.1)
+
+    def test_round_trip_matches_fresh_calculation(self):
+        fresh = calculate_wind_loads(self.calculation)
+        stored = results_from_data(self.calculation, results_data(self.calculation))
+        self.assertEqual(stored[:4], fresh[:4])
+        self.assertEqual(list(stored[4]), list(fresh[4]))
+
+    def test_detail_view_reads_stored_results(self):
+        url = reverse('duopitch:wind_load_detail', args=[self.calculation.pk])
+        self.client.get(url)
+        self.assertEqual(CalculationResult.objects.count(), 1)
+
+        with mock.patch('duopitch.calculations.calculate_wind_loads') as calculate:
+            response = self.client.get(url)
+        calculate.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+
+
+class BatchApiTests(TestCase):
+    def test_numeric_results_without_explanation(self):
+        case = {name: field.initial for name, field in WindLoadCalculationForm.base_fields.items()}
+        with mock.patch('duopitch.calculations.explain_wind_loads') as explain:
+            response = self.client.post(
+                reverse('duopitch:api_calculate'), json.dumps({'cases': [case]}), content_type='application/json'
+            )
+        explain.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        result = response.json()['results'][0]
+        self.assertEqual(len(result['results_0']), 5)
+        self.assertEqual(set(result), {'results_0', 'results_90', 'purlin_loads', 'truss_loads'})
+        self.assertFalse(WindLoadCalculation.objects.exists())
+
+class CalculatorViewTests(TestCase):
+    def test_post_stores_results_of_the_saved_calculation(self):
+        case = {name: field.initial for name, field in WindLoadCalculationForm.base_fields.items()}
+        case.update(calculation_name='Shed', terrain_category='III', horizontal_distance=200.0)
+        data = {name: value for name, value in case.items() if value is not None}
+        # Only the save path is under test, not the input template
+        with mock.patch('duopitch.views.render', return_value=HttpResponse()) as render:
+            self.client.post(reverse('duopitch:wind_load_calculator'), data)
+        context = render.call_args.args[2]
+        self.assertTrue(context['show_results'])
+        calculation = WindLoadCalculation.objects.get()
+        self.assertEqual(context['calculation'], calculation)
+        stored = CalculationResult.objects.get(object_id=calculation.pk)
+        self.assertEqual(stored.data, results_data(calculation))
+        self.assertEqual(stored.source_updated_at, calculation.updated_at)
+
+    def test_download_pdf_renders_the_stored_results(self):
+        calculation = WindLoadCalculation.objects.create(terrain_category='III', ridge_height=6.1)
+        session = self.client.session
+        session['last_calculation_id'] = calculation.pk
+        session.save()
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(reverse('duopitch:download_pdf'))
+        self.assertEqual(response.status_code, 202)
+        job = ReportJob.objects.get(pk=response.json()['id'])
+        results_0 = calculate_wind_loads(calculation)[0]
+        self.assertIn(f'<td>{results_0[0].w_e}</td>', job.html)
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'duopitch'
 
@@ -7,6 +7,9 @@ urlpatterns = [
     path('', views.wind_load_calculator, name='wind_load_calculator'),
     path('download-pdf/', views.download_pdf, name='download_pdf'),
     path('list/', views.wind_load_list, name='wind_load_list'),
+    path('list/export.csv', views.wind_load_export, name='wind_load_export'),
     path('detail/<int:pk>/', views.wind_load_detail, name='wind_load_detail'),
     path('delete/<int:pk>/', views.wind_load_delete, name='wind_load_delete'),
+    path('api/calculate/', api.calculate, name='api_calculate'),
+    path('api/sweep/', api.sweep, name='api_sweep'),
 ]
\ No newline at end of file
@@ -1,50 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.conf import settings
-from weasyprint import HTML
+from django.forms.models import model_to_dict
 import tempfile
+from functools import partial
 import os
 from .models import WindLoadCalculation
 from .forms import WindLoadCalculationForm
-from .calculations import calculate_wind_loads
+from .calculations import calculate_wind_loads, results_data, results_from_data
+from core import timing
+from core.conditional import conditional_detail
+from core.exports import history, streaming_csv_response
+from core.pagination import keyset_page
+from core.report_cache import cached_response, report_key, template_version
+from core.reports import accepted_response, submit_pdf
+from core.results import load_results, store_results
+
+# Columns shown in the calculation history
+LIST_FIELDS = (
+    'calculation_name', 'notes', 'created_at', 'ridge_height', 'building_length',
+    'building_width', 'pitch_angle', 'vb0', 'c_direction', 'c_season', 'terrain_category',
+)
 
 def wind_load_calculator(request):
     if request.method == 'POST':
         form = WindLoadCalculationForm(request.POST)
         if form.is_valid():
-            # Get form data
-            data = form.cleaned_data
-            
-            # Calculate wind loads
-            results = calculate_wind_loads(
-                vb0=data['vb0'],
-                c_direction=data['c_direction'],
-                c_season=data['c_season'],
-                rho=data['rho'],
-                terrain_category=data['terrain_category'],
-                ridge_height=data['ridge_height'],
-                building_length=data['building_length'],
-                building_width=data['building_width'],
-                pitch_angle=data['pitch_angle'],
-                site_altitude=data['site_altitude'],
-                upwind_slope=data['upwind_slope'],
-                horizontal_distance=data['horizontal_distance'],
-                effective_height=data['effective_height'],
-                upwind_slope_length=data['upwind_slope_length'],
-                windward_openings_area=data['windward_openings_area'],
-                leeward_openings_area=data['leeward_openings_area'],
-                parallel_openings_area=data['parallel_openings_area'],
-                structural_factor=data['structural_factor'],
-                purlin_spacing=data['purlin_spacing'],
-                truss_spacing=data['truss_spacing']
-            )
+            # Calculate wind loads for the form's unsaved instance
+            calculation = form.save(commit=False)
+            results = calculate_wind_loads(calculation)
             
             # Save calculation to database
-            calculation = form.save(commit=False)
-            calculation.results = results
-            calculation.save()
+            with timing.step('save'):
+                calculation.save()
+                store_results(calculation, partial(results_data, results=results))
             
             # Store calculation ID in session for PDF generation
             request.session['last_calculation_id'] = calculation.id
@@ -57,7 +47,8 @@ def wind_load_calculator(request):
                 'show_results': True
             }
             
-            return render(request, 'duopitch/duopitch_input.html', context)
+            with timing.step('render'):
+                return render(request, 'duopitch/duopitch_input.html', context)
     else:
         form = WindLoadCalculationForm()
     
@@ -75,28 +66,85 @@ def download_pdf(request):
         messages.error(request, 'Calculation not found.')
         return redirect('duopitch:wind_load_calculator')
     
+    filename = f'wind_load_calculation_{calculation.id}.pdf'
+    cache_key = report_key(
+        'pdf', template_version('duopitch/pdf_template.html'), report_inputs(calculation)
+    )
+    response = cached_response(request, cache_key, 'pdf', filename)
+    if response is not None:
+        return response
+
+    results_0, results_90, purlin_loads, truss_loads, explanation = results_from_data(
+        calculation, load_results(calculation, results_data)
+    )
+
     # Render HTML template with calculation results
-    html_string = render_to_string('duopitch/pdf_template.html', {
-        'calculation': calculation,
-        'results': calculation.results
-    })
-    
-    # Create PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="wind_load_calculation_{calculation.id}.pdf"'
-    
-    # Generate PDF using WeasyPrint
-    HTML(string=html_string).write_pdf(response)
+    with timing.step('render'):
+        html_string = render_to_string('duopitch/pdf_template.html', {
+            'calculation': calculation,
+            'results': {
+                'results_0': results_0,
+                'results_90': results_90,
+                'purlin_loads': purlin_loads,
+                'truss_loads': truss_loads,
+                'explanation': explanation,
+            }
+        })
     
-    return response
+    # Queue the PDF for background rendering with WeasyPrint
+    job = submit_pdf(html_string, filename, cache_key=cache_key)
+    return accepted_response(job, request)
+
+def report_inputs(calculation):
+    """Everything a duopitch report renders from, for report cache keys."""
+    inputs = model_to_dict(calculation)
+    inputs['created_at'] = calculation.created_at
+    return inputs
+
+def generate_pdf(request, context, section='all'):
+    """Queue the results page of a saved calculation for PDF rendering."""
+    calculation = context['calculation']
+    filename = f'wind_load_calculation_{calculation.id}.pdf'
+    cache_key = report_key(
+        'pdf', template_version('duopitch/results.html'), [report_inputs(calculation), section]
+    )
+    response = cached_response(request, cache_key, 'pdf', filename)
+    if response is not None:
+        return response
+
+    context = dict(context, section=section)
+    with timing.step('render'):
+        html_string = render_to_string('duopitch/results.html', context, request=request)
+    job = submit_pdf(html_string, filename, cache_key=cache_key)
+    return accepted_response(job, request)
 
 def wind_load_list(request):
-    calculations = WindLoadCalculation.objects.all().order_by('-created_at')
-    return render(request, 'duopitch/list.html', {'calculations': calculations})
+    calculations = WindLoadCalculation.objects.only(*LIST_FIELDS)
+    page = keyset_page(calculations, request.GET.get('cursor'))
+    return render(request, 'duopitch/list.html', {'calculations': page, 'page': page})
+
+def wind_load_export(request):
+    """Stream every saved calculation with its recomputed zone pressures as CSV."""
+    def rows():
+        for calculation in history(WindLoadCalculation.objects.all()):
+            created_at = calculation.created_at.isoformat()
+            results_0, results_90, _, _, _ = calculate_wind_loads(calculation)
+            for direction, results in (('0', results_0), ('90', results_90)):
+                for result in results:
+                    yield [
+                        calculation.pk, calculation.calculation_name, created_at, direction, result.zone,
+                        f'{result.area:.2f}', f'{result.C_pe:.3f}', f'{result.w_e:.3f}'
+                    ]
+
+    header = ['ID', 'Name', 'Created', 'θ (°)', 'Zone', 'Area (m²)', 'C_pe', 'W_e (kN/m²)']
+    return streaming_csv_response('wind_load_duopitch_history.csv', header, rows())
 
+@conditional_detail(WindLoadCalculation, 'duopitch/results.html')
 def wind_load_detail(request, pk):
     calculation = get_object_or_404(WindLoadCalculation, pk=pk)
-    results_0, results_90, purlin_loads, truss_loads, explanation = calculate_wind_loads(calculation)
+    results_0, results_90, purlin_loads, truss_loads, explanation = results_from_data(
+        calculation, load_results(calculation, results_data)
+    )
     
     # Calculate max/min pressures for display
     max_positive_W_net = max((result.w_e for result in results_0), default=0)
@@ -118,7 +166,8 @@ def wind_load_detail(request, pk):
         section = request.GET.get('section', 'all')
         return generate_pdf(request, context, section)
     
-    return render(request, 'duopitch/results.html', context)
+    with timing.step('render'):
+        return render(request, 'duopitch/results.html', context)
 
 def wind_load_delete(request, pk):
     calculation = get_object_or_404(WindLoadCalculation, pk=pk)
@@ -0,0 +1,14 @@
+from core.api import batch_view
+from core.records import tabulate
+from core.sweep import sweep_view
+from .calculations import ZoneResult, calculate_wind_loads, net_pressure_columns
+from .forms import FlatRoofForm
+
+def calculate_cases(cases):
+    """Results per case, with the zone rows of all cases kept in one table."""
+    results = [calculate_wind_loads(case) for case in cases]
+    tabulate(results, 'results', ZoneResult)
+    return results
+
+calculate = batch_view(FlatRoofForm, calculate_cases)
+sweep = sweep_view(FlatRoofForm, net_pressure_columns)
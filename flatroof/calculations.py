@@ -0,0 +1,94 @@
+"""
+Numeric wind load calculations for flat roofs.
+
+Shared by the HTML view and the JSON API, so the numbers can be had without
+building the explanation steps or rendering templates.
+"""
+from typing import Optional
+import numpy as np
+from core.engine import basic_velocity_pressure, peak_velocity_pressure, peak_velocity_pressures
+from core.records import Record, record
+from core.timing import timed
+
+# External pressure coefficients c_pe,10 of EN 1991-1-4 Table 7.2 by h_p/h
+CPE_TABLE = {
+    0: {'F': -1.8, 'G': -1.2, 'H': -0.7, 'I': (-0.2, 0.2)},
+    0.05: {'F': -2.0, 'G': -1.4, 'H': -0.8, 'I': (-0.2, 0.2)},
+    0.1: {'F': -2.5, 'G': -1.6, 'H': -0.9, 'I': (-0.2, 0.2)}
+}
+
+@record
+class ZoneResult(Record):
+    zone: str
+    c_pe_neg: float
+    c_pe_pos: Optional[float]
+    w_net_neg: float
+    w_net_pos: Optional[float]
+
+@timed('math')
+def net_pressures(q_p, cpe_values, c_pi_min, c_pi_max):
+    """Net wind pressure on zones F, G, H and I, taking the most onerous c_pi."""
+    q_p_zi = q_p  # q_p(z_i) = q_p(z_e)
+    results = []
+    for zone in ['F', 'G', 'H', 'I']:
+        c_pe = cpe_values[zone]
+        if zone == 'I':
+            c_pe_neg, c_pe_pos = c_pe
+            w_net_neg = q_p * c_pe_neg - q_p_zi * c_pi_max
+            w_net_pos = q_p * c_pe_pos - q_p_zi * c_pi_min
+            results.append(ZoneResult(zone, c_pe_neg, c_pe_pos, w_net_neg, w_net_pos))
+        else:
+            w_net = q_p * c_pe - q_p_zi * c_pi_max
+            results.append(ZoneResult(zone, c_pe, None, w_net, None))
+    return results
+
+@timed('math')
+def calculate_wind_loads(data):
+    """Numeric results for cleaned flat roof inputs, as flatroof_calculate computes them."""
+    z_e = data['building_height'] + data['parapet_height']
+    v_b = data['basic_wind_velocity']
+    rho = data['air_density']
+    z_0, z_min, k_r, c_r, v_m, I_v, q_p = peak_velocity_pressure(
+        data['terrain_category'], z_e, v_b, rho, c_0=data['orography_factor']
+    )
+    h = data['building_height']
+    return {
+        'z_e': z_e,
+        'q_b': basic_velocity_pressure(v_b, rho),
+        'k_r': k_r,
+        'c_r': c_r,
+        'v_m': v_m,
+        'I_v': I_v,
+        'q_p': q_p,
+        'e': min(data['crosswind_dimension'], 2 * h),
+        'results': net_pressures(q_p, CPE_TABLE[0], data['c_pi_min'], data['c_pi_max']),
+    }
+
+@timed('math')
+def net_pressure_columns(cases):
+    """
+    Net pressures of every zone for many cleaned cases at once: the zone of
+    each column (zone I has a suction and a pressure column) and an array
+    with one row per case, equal to calculate_wind_loads() per case.
+    """
+    def column(name):
+        return np.array([case[name] for case in cases], dtype=np.float64)
+
+    z_e = column('building_height') + column('parapet_height')
+    q_p = peak_velocity_pressures(
+        [case['terrain_category'] for case in cases], z_e, column('basic_wind_velocity'),
+        column('air_density'), c_0=column('orography_factor')
+    ).q_p
+    c_pi_min, c_pi_max = column('c_pi_min'), column('c_pi_max')
+
+    # net_pressures() with q_p(z_i) = q_p(z_e)
+    zones, pressures = [], []
+    for zone, c_pe in CPE_TABLE[0].items():
+        if zone == 'I':
+            c_pe_neg, c_pe_pos = c_pe
+            zones += [zone, zone]
+            pressures += [q_p * c_pe_neg - q_p * c_pi_max, q_p * c_pe_pos - q_p * c_pi_min]
+        else:
+            zones.append(zone)
+            pressures.append(q_p * c_pe - q_p * c_pi_max)
+    return tuple(zones), np.column_stack(pressures)
@@ -0,0 +1,27 @@
+"""LaTeX formula templates shown in the flat roof calculation steps."""
+
+REFERENCE_HEIGHT = '\\( z_e = h + h_p \\)'
+BASIC_WIND_VELOCITY = '\\( v_b = c_{\\text{dir}} \\cdot c_{\\text{season}} \\cdot v_{b,0} \\)'
+ROUGHNESS_FACTOR = '\\( k_r = 0.19 \\cdot \\left( \\frac{z_0}{0.05} \\right)^{0.07}, \\quad c_r(z_e) = k_r \\cdot \\ln \\left( \\frac{\\max(z_e, z_{\\min})}{z_0} \\right) \\)'
+OROGRAPHY_FACTOR = '\\( c_0(z_e) \\)'
+MEAN_WIND_VELOCITY = '\\( v_m(z_e) = c_r(z_e) \\cdot c_0(z_e) \\cdot v_b \\)'
+TURBULENCE_INTENSITY = '\\( I_v(z_e) = \\frac{k_I}{c_0(z_e) \\cdot \\ln \\left( \\frac{\\max(z_e, z_{\\min})}{z_0} \\right)} \\)'
+BASIC_VELOCITY_PRESSURE = '\\( q_b = \\frac{1}{2} \\cdot \\rho \\cdot v_b^2 \\cdot 10^{-3} \\)'
+PEAK_VELOCITY_PRESSURE = '\\( q_p(z_e) = \\left[ 1 + 7 \\cdot I_v(z_e) \\right] \\cdot \\frac{1}{2} \\cdot \\rho \\cdot v_m(z_e)^2 \\cdot 10^{-3} \\)'
+EXTERNAL_PRESSURE_COEFFICIENT = '\\( c_{pe} \\text{ from Table 7.2, based on } \\frac{h_p}{h} \\)'
+INTERNAL_PRESSURE_COEFFICIENT = '\\( c_{pi} \\text{ based on openings or default } \\pm 0.2, -0.3 \\)'
+NET_WIND_PRESSURE = '\\( w_{\\text{net}} = q_p(z_e) \\cdot c_{pe} - q_p(z_i) \\cdot c_{pi} \\)'
+
+FORMULAS = (
+    REFERENCE_HEIGHT,
+    BASIC_WIND_VELOCITY,
+    ROUGHNESS_FACTOR,
+    OROGRAPHY_FACTOR,
+    MEAN_WIND_VELOCITY,
+    TURBULENCE_INTENSITY,
+    BASIC_VELOCITY_PRESSURE,
+    PEAK_VELOCITY_PRESSURE,
+    EXTERNAL_PRESSURE_COEFFICIENT,
+    INTERNAL_PRESSURE_COEFFICIENT,
+    NET_WIND_PRESSURE,
+)
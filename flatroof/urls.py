@@ -1,8 +1,10 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 
 
 urlpatterns = [
     path('', views.flatroof_calculate, name='flatroof_calculate'),
+    path('api/calculate/', api.calculate, name='flatroof_api_calculate'),
+    path('api/sweep/', api.sweep, name='flatroof_api_sweep'),
 ]
\ No newline at end of file
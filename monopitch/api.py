@@ -0,0 +1,16 @@
+from core.api import batch_view
+from core.records import tabulate
+from core.sweep import sweep_view
+from .calculations import ZoneResult, calculate_wind_loads, net_pressure_columns
+from .forms import WindLoadInputForm
+from .models import WindLoadCalculation
+from .views import detail_results
+
+def calculate_cases(cases):
+    """Results per case, with the zone rows of all cases kept in one table."""
+    results = [calculate_wind_loads(case) for case in cases]
+    tabulate(results, 'results', ZoneResult)
+    return results
+
+calculate = batch_view(WindLoadInputForm, calculate_cases, WindLoadCalculation, detail_results)
+sweep = sweep_view(WindLoadInputForm, net_pressure_columns)
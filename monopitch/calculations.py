@@ -0,0 +1,104 @@
+"""
+Numeric wind load calculations for monopitch roofs.
+
+Shared by the HTML/PDF/CSV views and the JSON API, so the numbers can be had
+without building the explanation steps or rendering templates.
+"""
+import numpy as np
+from core.engine import basic_velocity_pressure, peak_velocity_pressure, peak_velocity_pressures
+from core.records import Record, record
+from core.timing import timed
+
+C_PI = -0.3  # Conservative value for internal pressure
+
+@record
+class ZoneResult(Record):
+    zone: str
+    area: float
+    C_pe: float
+    w_e: float
+
+@timed('math')
+def roof_zones(h_r):
+    """
+    Characteristic length e and zones F, G and H with their C_pe, assuming
+    the building is twice as wide as the ridge height.
+    """
+    h = h_r
+    b = 2 * h_r  # Assuming building width is twice the ridge height
+    e = min(b, 2 * h)
+    zones = [
+        {'zone': 'F', 'width': e / 10, 'length': e / 4},
+        {'zone': 'G', 'width': e / 10, 'length': b - 2 * (e / 4)},
+        {'zone': 'H', 'width': b - 2 * (e / 10), 'length': b}
+    ]
+
+    # Calculate C_pe values for each zone
+    for zone in zones:
+        area = zone['width'] * zone['length']
+        if area <= 1:
+            cpe = -2.0  # C_pe,1 for small areas
+        elif area >= 10:
+            cpe = -1.5  # C_pe,10 for large areas
+        else:
+            # Linear interpolation
+            cpe = -2.0 + (area - 1) * 0.5 / 9
+        zone['C_pe'] = cpe
+    return e, zones
+
+@timed('math')
+def net_pressures(q_p, zones, c_pi=C_PI):
+    """Net wind pressure w_e on each zone."""
+    results = []
+    for zone in zones:
+        w_e = q_p * (zone['C_pe'] + c_pi)
+        results.append(ZoneResult(zone['zone'], zone['width'] * zone['length'], zone['C_pe'], w_e))
+    return results
+
+@timed('math')
+def calculate_wind_loads(data):
+    """Numeric results for cleaned monopitch inputs, as wind_load_analysis_on_monopitch_roof computes them."""
+    v_b = data.get('c_direction', 1.0) * data.get('c_season', 1.0) * data['vb0']
+    rho = data.get('rho', 1.25)
+    q_b = basic_velocity_pressure(v_b, rho)
+    z_0, z_min, k_r, c_r, v_m, I_v, q_p = peak_velocity_pressure(data['terrain_category'], data['h_r'], v_b, rho)
+    e, zones = roof_zones(data['h_r'])
+    return {
+        'v_b': v_b,
+        'q_b': q_b,
+        'c_r': c_r,
+        'v_m': v_m,
+        'I_v': I_v,
+        'q_p': q_p,
+        'e': e,
+        'c_pi': C_PI,
+        'results': net_pressures(q_p, zones),
+    }
+
+@timed('math')
+def net_pressure_columns(cases):
+    """
+    w_e of every zone for many cleaned cases at once: the zone names and an
+    array with one row per case, equal to calculate_wind_loads() per case.
+    """
+    def column(name, default=None):
+        return np.array([case.get(name, default) for case in cases], dtype=np.float64)
+
+    v_b = column('c_direction', 1.0) * column('c_season', 1.0) * column('vb0')
+    h_r = column('h_r')
+    q_p = peak_velocity_pressures([case['terrain_category'] for case in cases], h_r, v_b, column('rho', 1.25)).q_p
+
+    # roof_zones()
+    h = h_r
+    b = 2 * h_r
+    e = np.minimum(b, 2 * h)
+    areas = [
+        (e / 10) * (e / 4),
+        (e / 10) * (b - 2 * (e / 4)),
+        (b - 2 * (e / 10)) * b,
+    ]
+    pressures = []
+    for area in areas:
+        cpe = np.where(area <= 1, -2.0, np.where(area >= 10, -1.5, -2.0 + (area - 1) * 0.5 / 9))
+        pressures.append(q_p * (cpe + C_PI))
+    return ('F', 'G', 'H'), np.column_stack(pressures)
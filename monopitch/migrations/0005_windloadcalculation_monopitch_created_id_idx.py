@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monopitch', '0004_windloadcalculation_building_length_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='windloadcalculation',
+            index=models.Index(fields=['-created_at', '-id'], name='monopitch_created_id_idx'),
+        ),
+    ]
@@ -1,3 +1,40 @@
+import csv
 from django.test import TestCase
+from django.urls import reverse
+from core.models import CalculationResult
+from core.results import load_results
+from .models import WindLoadCalculation
+from .views import detail_results
 
-# Create your tests here.
+class HistoryExportTests(TestCase):
+    def test_streams_stored_zone_pressures(self):
+        first = WindLoadCalculation.objects.create(calculation_name='First', vb0=20.0)
+        second = WindLoadCalculation.objects.create(calculation_name='Second', vb0=25.0, h_r=5.0)
+        for calculation in (first, second):
+            load_results(calculation, detail_results)
+
+        # One query for the calculations, one for their stored results
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('monopitch:wind_load_export'))
+            self.assertTrue(response.streaming)
+            content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(content.splitlines()))
+
+        self.assertEqual(rows[0][:4], ['ID', 'Name', 'Created', 'Zone'])
+        self.assertEqual(len(rows), 1 + 3 * 2)
+        # Newest first
+        self.assertEqual({row[1] for row in rows[1:4]}, {'Second'})
+
+        # The same numbers as the detail page
+        expected = detail_results(WindLoadCalculation.objects.get(pk=second.pk))['results']
+        self.assertEqual([row[6] for row in rows[1:4]], [f'{result["w_e"]:.3f}' for result in expected])
+        self.assertEqual(rows[-1][0], str(first.pk))
+
+    def test_computes_and_stores_missing_results(self):
+        calculation = WindLoadCalculation.objects.create(calculation_name='Only', vb0=20.0, h_r=5.0)
+        response = self.client.get(reverse('monopitch:wind_load_export'))
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+        stored = CalculationResult.objects.get(object_id=calculation.pk)
+        self.assertEqual([row[6] for row in rows[1:]], [f'{result["w_e"]:.3f}' for result in stored.data['results']])
+        self.assertEqual(stored.data, detail_results(WindLoadCalculation.objects.get(pk=calculation.pk)))
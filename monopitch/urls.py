@@ -1,10 +1,13 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'monopitch'
 
 urlpatterns = [
     path('calculate/', views.wind_load_analysis_on_monopitch_roof, name='monopitch_calculate'),
     path('list/', views.wind_load_list, name='wind_load_list'),
+    path('list/export.csv', views.wind_load_export, name='wind_load_export'),
     path('detail/<int:pk>/', views.wind_load_detail, name='wind_load_detail'),
+    path('api/calculate/', api.calculate, name='api_calculate'),
+    path('api/sweep/', api.sweep, name='api_sweep'),
 ]
\ No newline at end of file